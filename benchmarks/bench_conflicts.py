@@ -0,0 +1,61 @@
+"""冲突决议基准：多根目录下 N 个技能的单次哈希决议耗时（验证线性）
+
+运行：python -m benchmarks.bench_conflicts [--skills 100000] [--roots 3]
+"""
+import argparse
+import gc
+import random
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import resolve_conflicts
+
+_SOURCES = ["project", "user", "builtin", "team", "org"]
+_LOAD_PRIORITIES = ["high", "normal", "normal", "low"]
+
+
+def _make(
+    count: int, roots: int, dup_ratio: float, rng: random.Random
+) -> List[Tuple[SkillMetadata, int]]:
+    """约 ``dup_ratio`` 比例的技能与其他根目录中的技能同名"""
+    unique = max(1, int(count * (1 - dup_ratio)))
+    out = []
+    for i in range(count):
+        priority = i % roots
+        source = _SOURCES[priority % len(_SOURCES)]
+        name = f"skill-{i if i < unique else rng.randrange(unique)}"
+        version = f"{rng.randint(0, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+        out.append((SkillMetadata(
+            skill_id=SkillMetadata.generate_skill_id(source, name, version),
+            name=name, description="", source=source,
+            path=Path(f"/{source}/{name}-{i}"), version=version,
+            load_priority=rng.choice(_LOAD_PRIORITIES),
+        ), priority))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skills", type=int, default=100_000)
+    parser.add_argument("--roots", type=int, default=3)
+    parser.add_argument("--dup-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    for n in (args.skills // 4, args.skills // 2, args.skills, args.skills * 2):
+        candidates = _make(n, args.roots, args.dup_ratio, rng)
+        gc.collect()
+        start = time.perf_counter()
+        resolution = resolve_conflicts(candidates)
+        elapsed = time.perf_counter() - start
+        print(
+            f"skills={n} winners={len(resolution.winners)} "
+            f"shadowed={len(resolution.shadowed)} total_ms={elapsed * 1000:.1f} "
+            f"per_skill_us={elapsed * 1e6 / n:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
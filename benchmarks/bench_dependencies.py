@@ -0,0 +1,105 @@
+"""依赖解析基准：深链与宽扇出合成依赖图的冷/热解析耗时
+
+运行：python -m benchmarks.bench_dependencies [--depth 10000] [--width 2000]
+
+与“每次选择都重新递归遍历”的朴素实现对比：
+- deep：s0 -> s1 -> ... -> sN 的单链
+- wide：root 依赖 W 个中间技能，每个中间技能依赖同一组 W/10 个叶子
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.skills.dependencies import DependencyResolver
+from src.skills.metadata import SkillMetadata
+
+
+class _Registry:
+    def __init__(self, graph: Dict[str, List[str]]) -> None:
+        self.version = 0
+        self.skills = {
+            name: SkillMetadata(
+                skill_id=f"project:{name}:unversioned", name=name, description="",
+                source="project", path=Path(f"/skills/{name}"), requires=requires,
+            )
+            for name, requires in graph.items()
+        }
+
+    def find_skill(self, name: str, source: Optional[str] = None) -> Optional[SkillMetadata]:
+        return self.skills.get(name)
+
+
+def _naive(registry: _Registry, name: str) -> List[SkillMetadata]:
+    """朴素递归实现（无记忆化），仅用于对比"""
+    ordered: List[SkillMetadata] = []
+    seen = set()
+
+    def visit(n: str) -> None:
+        if n in seen:
+            return
+        seen.add(n)
+        metadata = registry.find_skill(n)
+        for dep in metadata.requires:
+            visit(dep)
+        ordered.append(metadata)
+
+    visit(name)
+    return ordered
+
+
+def _deep(depth: int) -> Dict[str, List[str]]:
+    graph = {f"s{i}": [f"s{i + 1}"] for i in range(depth)}
+    graph[f"s{depth}"] = []
+    return graph
+
+
+def _wide(width: int) -> Dict[str, List[str]]:
+    leaves = [f"leaf{i}" for i in range(max(1, width // 10))]
+    graph: Dict[str, List[str]] = {leaf: [] for leaf in leaves}
+    for i in range(width):
+        graph[f"mid{i}"] = leaves
+    graph["s0"] = [f"mid{i}" for i in range(width)]
+    return graph
+
+
+def _run(label: str, graph: Dict[str, List[str]], turns: int) -> None:
+    registry = _Registry(graph)
+    resolver = DependencyResolver(registry)
+
+    start = time.perf_counter()
+    size = len(resolver.resolve("s0"))
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        resolver.resolve("s0")
+    warm_us = (time.perf_counter() - start) * 1e6 / turns
+
+    naive_ms: Optional[float] = None
+    if label != "deep":  # 深链会超出递归深度限制
+        start = time.perf_counter()
+        for _ in range(turns):
+            _naive(registry, "s0")
+        naive_ms = (time.perf_counter() - start) * 1000 / turns
+
+    print(f"[{label}] closure={size} edges={sum(len(v) for v in graph.values())}")
+    print(f"[{label}] cold_ms={cold_ms:.3f}")
+    print(f"[{label}] warm_us={warm_us:.1f}")
+    if naive_ms is not None:
+        print(f"[{label}] naive_per_turn_ms={naive_ms:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=10_000)
+    parser.add_argument("--width", type=int, default=2_000)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    _run("deep", _deep(args.depth), args.turns)
+    _run("wide", _wide(args.width), args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""脚本执行器负载测试：吞吐随并发上限的变化与内存配额
+
+运行：python -m benchmarks.bench_executor [--jobs 32] [--sleep 0.2]
+
+- 每个任务运行一个 sleep 脚本（分配少量内存），观察吞吐随全局并发上限
+  近似线性增长直到上限
+- 另外并发运行若干试图分配超配额内存的脚本，确认均被 RLIMIT_AS 拦截，
+  且峰值 RSS 不超过配额
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.skills.metadata import ResourceLimits, SkillMetadata
+from src.tools.executor import ScriptExecutor
+
+
+def _skill(root: Path, name: str, code: str, limits: ResourceLimits) -> SkillMetadata:
+    skill_dir = root / name
+    (skill_dir / "scripts").mkdir(parents=True)
+    (skill_dir / "scripts" / "job.py").write_text(code, encoding="utf-8")
+    return SkillMetadata(
+        skill_id=f"project:{name}:unversioned", name=name, description="",
+        source="project", path=skill_dir, resource_limits=limits,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--sleep", type=float, default=0.2)
+    parser.add_argument("--memory-mb", type=int, default=128)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        limits = ResourceLimits(max_concurrent_scripts=64, max_memory_mb=args.memory_mb)
+        sleeper = _skill(
+            root, "sleeper",
+            f"import time\nbuf = bytearray(8 * 1024 * 1024)\ntime.sleep({args.sleep})\n", limits,
+        )
+        hog = _skill(root, "hog", "buf = bytearray(1024 * 1024 * 1024)\n", limits)
+
+        for cap in (1, 2, 4, 8, 16):
+            executor = ScriptExecutor(max_concurrent=cap)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+                results = list(pool.map(
+                    lambda _: executor.run_script(sleeper, "scripts/job.py"), range(args.jobs)
+                ))
+            elapsed = time.perf_counter() - start
+            peak = max(obs.metadata["peak_rss_kb"] for obs in results)
+            print(
+                f"cap={cap:<3} jobs={args.jobs} ok={sum(o.success for o in results)} "
+                f"elapsed_s={elapsed:.2f} throughput={args.jobs / elapsed:.1f}/s "
+                f"peak_rss_mb={peak / 1024:.1f}"
+            )
+
+        executor = ScriptExecutor(max_concurrent=8)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: executor.run_script(hog, "scripts/job.py"), range(8)))
+        blocked = sum("MemoryError" in obs.output["stderr"] for obs in results)
+        peak = max(obs.metadata["peak_rss_kb"] for obs in results)
+        print(f"memory_hogs=8 blocked={blocked} peak_rss_mb={peak / 1024:.1f} "
+              f"limit_mb={args.memory_mb}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""前言解析基准：流式头部读取 vs 全量读取 + 通用 YAML 解析
+
+运行：python -m benchmarks.bench_frontmatter [--files 500] [--body-kb 256]
+
+通用 YAML 解析使用 PyYAML（若未安装则退化为本项目的全量 parse_frontmatter）。
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from src.skills.frontmatter import parse_frontmatter, read_frontmatter, split_frontmatter
+
+try:
+    import yaml
+except ImportError:  # PyYAML 不是项目依赖
+    yaml = None
+
+
+def _write_skills(root: Path, count: int, body_kb: int) -> List[Path]:
+    body = ("## Section\n" + "Lorem ipsum dolor sit amet. " * 36 + "\n") * body_kb
+    files = []
+    for i in range(count):
+        skill_file = root / f"skill-{i}" / "SKILL.md"
+        skill_file.parent.mkdir()
+        skill_file.write_text(
+            f"---\nname: skill-{i}\ndescription: Benchmark skill number {i}\n"
+            "version: 1.0.0\nallowed-tools:\n  - read_file\n  - grep\n---\n" + body,
+            encoding="utf-8",
+        )
+        files.append(skill_file)
+    return files
+
+
+def _full_read(path: Path) -> Any:
+    content = path.read_text(encoding="utf-8")
+    if yaml is None:
+        return parse_frontmatter(content)[0]
+    return yaml.safe_load(split_frontmatter(content)[0])
+
+
+def _head_read(path: Path) -> Any:
+    return read_frontmatter(path).frontmatter
+
+
+def _measure(fn: Callable[[Path], Any], files: List[Path], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for path in files:
+            fn(path)
+    return (time.perf_counter() - start) * 1e6 / (rounds * len(files))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--body-kb", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _write_skills(Path(tmp), args.files, args.body_kb)
+        full_us = _measure(_full_read, files, args.rounds)
+        head_us = _measure(_head_read, files, args.rounds)
+
+    print(f"files={args.files} body_kb={args.body_kb} yaml={'pyyaml' if yaml else 'builtin'}")
+    print(f"full_read_us_per_file={full_us:.1f}")
+    print(f"head_read_us_per_file={head_us:.1f}")
+    print(f"speedup={full_us / head_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
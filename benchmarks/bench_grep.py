@@ -0,0 +1,96 @@
+"""grep 基准：mmap + 字面前缀快速路径 vs 逐行 Python 循环
+
+运行：python -m benchmarks.bench_grep [--size-mb 1024] [--files 64]
+
+- 生成总大小约 ``--size-mb`` 的文本树（少量命中行均匀分布），外加若干二进制文件
+- baseline：逐文件按行读取并对每行执行 ``re.search``（不跳过二进制文件）
+- grep_all：``GrepTool`` 找出全部匹配（上限设为无穷大）
+- grep_cap：``GrepTool`` 默认匹配上限，命中上限后提前结束
+- grep_nolit：无字面前缀的模式（走 regex.search 路径）
+
+正则匹配与 ``mmap.find`` 都持有 GIL，线程池主要在冷缓存时重叠磁盘 I/O；
+热缓存下的加速来自 mmap 零拷贝与字面前缀定位。
+"""
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.tools.grep import GrepTool
+
+_LINE = b"the quick brown fox jumps over the lazy dog 0123456789 lorem ipsum dolor\n"
+
+
+def _build(root: Path, size_mb: int, files: int) -> int:
+    per_file = size_mb * 1024 * 1024 // files
+    block = _LINE * (1024 * 1024 // len(_LINE))
+    hits = 0
+    for i in range(files):
+        with open(root / f"doc{i:04d}.txt", "wb") as f:
+            written = 0
+            while written < per_file:
+                f.write(block)
+                f.write(b"ERROR code=%d at file %d\n" % (written, i))
+                written += len(block)
+                hits += 1
+    for i in range(4):
+        (root / f"blob{i}.bin").write_bytes(b"\0ERROR code=1\n" * 100000)
+    return hits
+
+
+def _baseline(root: Path, pattern: str) -> int:
+    regex = re.compile(pattern)
+    count = 0
+    for path in sorted(root.rglob("*")):
+        if not path.is_file():
+            continue
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if regex.search(line):
+                    count += 1
+    return count
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--files", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        expected = _build(root, args.size_mb, args.files)
+        tool = GrepTool(max_workers=args.workers)
+
+        literal = r"ERROR code=\d+"
+        nolit = r"(?:ERROR|WARN) code=\d+"
+        baselines = {}
+        for pattern in (literal, nolit):
+            count, baselines[pattern] = _timed(lambda: _baseline(root, pattern))
+            print(f"baseline   pattern={pattern!r} size_mb={args.size_mb} matches={count} "
+                  f"elapsed_s={baselines[pattern]:.2f}")
+
+        runs = [
+            ("grep_all", literal, sys.maxsize),
+            ("grep_cap", literal, None),
+            ("grep_nolit", nolit, sys.maxsize),
+        ]
+        for name, pattern, cap in runs:
+            result, elapsed = _timed(lambda: tool.search(root, pattern, max_matches=cap))
+            print(
+                f"{name:<10} matches={len(result.matches)} expected={expected} "
+                f"binary_skipped={result.binary_skipped} files={result.files_scanned} "
+                f"elapsed_s={elapsed:.2f} speedup={baselines[pattern] / elapsed:.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
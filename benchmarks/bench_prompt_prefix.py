@@ -0,0 +1,136 @@
+"""提示词前缀复用基准：PromptBuilder vs 按设计文档分区顺序的朴素拼装
+
+运行：python -m benchmarks.bench_prompt_prefix [--runs 50] [--turns 12] [--skills 200]
+
+- 用固定种子生成若干 run 的逐 turn 状态轨迹（选择技能、加载正文、执行脚本、
+  更新计划），两种拼装方式回放同一组轨迹
+- naive：System → Request → 运行摘要（计划、预算）→ 技能索引 → 技能正文 →
+  observations，``json.dumps`` 默认渲染（键按插入顺序，含时间戳）
+- builder：``PromptBuilder``（稳定性顺序 + 规范化 JSON）
+- reuse：除首轮外各 turn 与上一 turn 的公共前缀字符数之和 / 提示词字符数之和，
+  近似可命中供应商前缀缓存的比例
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import List
+
+from src.agent.plan import Plan, PlanStep, StepStatus
+from src.agent.prompt_builder import PromptBuilder, common_prefix_length
+from src.agent.state import Observation, RunState, ToolBudget
+from src.skills.metadata import LoadedSkill, SkillMetadata
+
+_WORDS = (
+    "pdf form excel report chart sql review code test deploy image audio translate "
+    "summarize markdown table csv json parse extract invoice email calendar git"
+).split()
+_SYSTEM = "You are a skills agent. Output exactly one JSON action per turn.\n" * 40
+
+
+def _skills(rng: random.Random, count: int) -> List[SkillMetadata]:
+    skills = []
+    for i in range(count):
+        name = f"{rng.choice(_WORDS)}-{rng.choice(_WORDS)}-{i}"
+        source = rng.choice(["project", "user", "builtin"])
+        skills.append(SkillMetadata(
+            skill_id=f"{source}:{name}:unversioned", name=name, source=source,
+            description=" ".join(rng.choice(_WORDS) for _ in range(12)),
+            path=Path(f"/skills/{name}"),
+        ))
+    return skills
+
+
+def _trace(rng: random.Random, skills: List[SkillMetadata], turns: int) -> List[RunState]:
+    """一个 run 的逐 turn 状态快照"""
+    state = RunState(run_id=f"run-{rng.random():.6f}", request="process the attached files",
+                     skill_index=list(skills))
+    snapshots = []
+    for turn in range(1, turns + 1):
+        state.current_turn = turn
+        state.budget.consume_turn()
+        roll = rng.random()
+        if turn == 2 or (roll < 0.15 and len(state.loaded_skills) < 3):
+            meta = rng.choice(skills)
+            body = "\n".join(" ".join(rng.choice(_WORDS) for _ in range(10)) for _ in range(40))
+            state.loaded_skills[meta.skill_id] = LoadedSkill(meta, body, turn, len(body) // 4)
+        if turn == 3:
+            steps = [PlanStep(f"s{i}", f"step {i}") for i in range(4)]
+            state.plan = Plan(goal="process", steps=steps)
+        elif state.plan is not None and roll < 0.3:
+            pending = [s for s in state.plan.steps if s.status == StepStatus.PENDING]
+            if pending:
+                pending[0].status = StepStatus.COMPLETED
+        if turn > 2:
+            state.budget.consume_tool_call()
+            output = {"stdout": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(20, 200)))}
+            state.add_observation(
+                Observation("run_script", True, output, metadata={"exit_code": 0}, turn=turn)
+            )
+        snapshots.append(_snapshot(state))
+    return snapshots
+
+
+def _snapshot(state: RunState) -> RunState:
+    copy = RunState(run_id=state.run_id, request=state.request, skill_index=state.skill_index)
+    copy.loaded_skills = dict(state.loaded_skills)
+    copy.plan = Plan.from_dict(state.plan.to_dict()) if state.plan is not None else None
+    copy.budget = ToolBudget.from_dict(state.budget.to_dict())
+    copy.observations = list(state.observations)
+    return copy
+
+
+def _naive(state: RunState) -> str:
+    parts = [_SYSTEM, state.request, json.dumps({
+        "plan": state.plan.to_dict() if state.plan else None,
+        "budget": state.budget.to_dict(),
+        "loaded_skills": list(state.loaded_skills),
+    })]
+    parts.append("\n".join(
+        json.dumps({"name": s.name, "description": s.description, "source": s.source})
+        for s in state.skill_index
+    ))
+    parts.extend(s.body for s in state.loaded_skills.values())
+    parts.extend(json.dumps(o.to_dict()) for o in state.observations)
+    return "\n\n".join(parts)
+
+
+def _reuse(texts: List[str]) -> int:
+    return sum(common_prefix_length(a, b) for a, b in zip(texts, texts[1:]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = _skills(rng, args.skills)
+    traces = [_trace(rng, skills, args.turns) for _ in range(args.runs)]
+
+    results = {}
+    for name in ("naive", "builder"):
+        shared = total = 0
+        start = time.perf_counter()
+        for trace in traces:
+            if name == "naive":
+                texts = [_naive(state) for state in trace]
+            else:
+                builder = PromptBuilder(_SYSTEM)
+                texts = [builder.build(state).text for state in trace]
+            shared += _reuse(texts)
+            total += sum(len(t) for t in texts[1:])
+        elapsed = time.perf_counter() - start
+        results[name] = shared / total
+        print(f"{name:<8} runs={args.runs} turns={args.turns} prompt_chars={total} "
+              f"shared_chars={shared} reuse={results[name]:.3f} "
+              f"cacheable_tokens={shared // 4} elapsed_s={elapsed:.2f}")
+    print(f"reuse_gain={results['builder'] - results['naive']:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
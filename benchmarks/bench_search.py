@@ -0,0 +1,91 @@
+"""SkillSearchIndex 基准：50k 技能的构建、查询与增量更新耗时
+
+运行：python -m benchmarks.bench_search [--skills 50000]
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+
+from src.skills.metadata import SkillMetadata
+from src.skills.search import SkillSearchIndex
+
+_COMMON = (
+    "pdf form filler excel report chart sql database review code python test lint "
+    "deploy docker kubernetes image resize audio transcribe translate summarize "
+    "markdown table csv json yaml parse extract invoice email calendar slack git"
+).split()
+_SYLLABLES = ["ka", "lo", "mi", "zu", "ter", "vex", "dra", "pol", "sin", "qua", "bre", "nox"]
+_CJK = "填写表单生成报告数据库查询代码评审图片压缩翻译摘要提取发票邮件日历部署测试"
+
+
+def _vocabulary(rng: random.Random, size: int) -> list:
+    """常用词 + 合成长尾词，按 Zipf 分布抽样以贴近真实描述文本"""
+    tail = set()
+    while len(tail) < size:
+        tail.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return _COMMON + sorted(tail)
+
+
+def _make_skill(i: int, rng: random.Random, vocab: list, weights: list) -> SkillMetadata:
+    words = rng.choices(vocab, weights=weights, k=12)
+    name = "-".join(words[:2]) + f"-{i}"
+    start = rng.randrange(len(_CJK) - 6)
+    description = " ".join(words[2:]) + " " + _CJK[start:start + 6]
+    return SkillMetadata(
+        skill_id=f"project:{name}:unversioned",
+        name=name,
+        description=description,
+        source="project",
+        path=Path(f"/skills/{name}"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skills", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocab", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocab = _vocabulary(rng, args.vocab)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    skills = [_make_skill(i, rng, vocab, weights) for i in range(args.skills)]
+    index = SkillSearchIndex()
+
+    start = time.perf_counter()
+    for skill in skills:
+        index.add(skill)
+    build = time.perf_counter() - start
+
+    queries = [
+        "fill pdf form", "生成报告", "review python code", "提取发票 invoice",
+        "resize image", "sql 数据库查询", "docker deploy kubernetes", "pdf",
+        "summarize meeting notes into markdown", vocab[-1],
+    ]
+    for query in queries:  # 预热各查询词的影响力列表
+        index.search(query)
+    latencies = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        index.search(queries[i % len(queries)], k=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    start = time.perf_counter()
+    for skill in skills[:1000]:
+        index.remove(skill.skill_id)
+        index.add(skill)
+    update_us = (time.perf_counter() - start) * 1e6 / 1000
+
+    print(f"skills={args.skills}")
+    print(f"build_total_s={build:.3f}")
+    print(f"query_avg_ms={sum(latencies) / len(latencies):.3f}")
+    print(f"query_p50_ms={latencies[len(latencies) // 2]:.3f}")
+    print(f"query_max_ms={latencies[-1]:.3f}")
+    print(f"update_avg_us={update_us:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""离线压测：大量并发 run 通过 OpenAICompatModel 访问本地桩模型服务
+
+运行：python -m benchmarks.bench_stub_load [--runs 200] [--turns 4] [--latency 0.2]
+                                         [--tokens-per-sec 50] [--error-rate 0.01]
+
+- 启动 ``StubModelServer``（脚本化回复为一个 final_answer 动作），每个 run 在独立
+  线程中执行 ``--turns`` 次流式调用，边接收边用 ``StreamingActionParser`` 解析
+- 输出吞吐（请求/秒、token/秒）、首 token 延迟与整体延迟的 p50/p95、错误数，
+  以及服务端观察到的最大并发连接数
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from src.model.adapter import ModelRequest
+from src.model.mock import MockModel
+from src.model.openai_compat import ModelAPIError, OpenAICompatModel
+from src.model.streaming import StreamingActionParser
+from src.model.stub_server import StubModelServer
+
+_ANSWER = {
+    "action": "final_answer",
+    "answer": " ".join(["the report has been generated and saved to output.pdf"] * 8),
+    "completed": True,
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _run(model: OpenAICompatModel, run_id: int, turns: int, samples: Dict[str, List[float]],
+         lock: threading.Lock) -> None:
+    for turn in range(turns):
+        request = ModelRequest(messages=[
+            {"role": "system", "content": "Output exactly one JSON action."},
+            {"role": "user", "content": f"run {run_id} turn {turn}"},
+        ])
+        parser = StreamingActionParser()
+        first: List[float] = []
+        start = time.perf_counter()
+
+        def on_delta(delta: str) -> None:
+            if not first:
+                first.append(time.perf_counter() - start)
+            parser.feed(delta)
+
+        try:
+            response = model.generate_streaming(request, on_delta)
+            parser.finish()
+        except (ModelAPIError, ValueError):
+            with lock:
+                samples["errors"].append(1)
+            continue
+        elapsed = time.perf_counter() - start
+        with lock:
+            samples["ttft"].append(first[0] if first else elapsed)
+            samples["latency"].append(elapsed)
+            samples["tokens"].append(response.usage.get("completion_tokens", 0))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server = StubModelServer(
+        MockModel(responses=[_ANSWER]), latency_sec=args.latency,
+        tokens_per_sec=args.tokens_per_sec, error_rate=args.error_rate, seed=args.seed,
+    )
+    base_url = server.start()
+    model = OpenAICompatModel(base_url, model="stub", timeout_sec=120)
+    samples: Dict[str, List[float]] = {"ttft": [], "latency": [], "tokens": [], "errors": []}
+    lock = threading.Lock()
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.runs) as pool:
+            for run_id in range(args.runs):
+                pool.submit(_run, model, run_id, args.turns, samples, lock)
+        wall = time.perf_counter() - start
+    finally:
+        server.stop()
+
+    done = len(samples["latency"])
+    print(f"runs={args.runs} turns={args.turns} requests_ok={done} errors={len(samples['errors'])} "
+          f"max_concurrent={server.stats()['max_active']} wall_s={wall:.2f}")
+    print(f"throughput_rps={done / wall:.1f} tokens_per_s={sum(samples['tokens']) / wall:.0f}")
+    print(f"ttft_p50_ms={_percentile(samples['ttft'], 0.5) * 1000:.0f} "
+          f"ttft_p95_ms={_percentile(samples['ttft'], 0.95) * 1000:.0f} "
+          f"latency_p50_ms={_percentile(samples['latency'], 0.5) * 1000:.0f} "
+          f"latency_p95_ms={_percentile(samples['latency'], 0.95) * 1000:.0f} "
+          f"latency_mean_ms={statistics.mean(samples['latency'] or [0]) * 1000:.0f}")
+
+
+if __name__ == "__main__":
+    main()
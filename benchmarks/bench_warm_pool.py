@@ -0,0 +1,68 @@
+"""预热解释器池基准：单次调用延迟 vs 冷启动 subprocess.run
+
+运行：python -m benchmarks.bench_warm_pool [--runs 50] [--preload json,csv,decimal]
+
+脚本导入若干标准库模块后输出一行；冷启动每次都需要启动解释器并导入，
+预热池只需 fork 并执行脚本本身。
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from src.skills.metadata import ResourceLimits
+from src.tools.executor import ScriptExecutor
+from src.tools.warm_pool import WarmPythonPool
+
+_SCRIPT = "import json, csv, decimal, email.parser, http.client\nprint(json.dumps({'ok': True}))\n"
+
+
+def _measure(fn: Callable[[], None], runs: int) -> List[float]:
+    fn()  # 预热
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def _report(label: str, samples: List[float]) -> None:
+    print(f"{label:<22} p50_ms={samples[len(samples) // 2]:.2f} "
+          f"p95_ms={samples[int(len(samples) * 0.95)]:.2f} min_ms={samples[0]:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--preload", default="json,csv,decimal,email.parser,http.client")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "job.py"
+        script.write_text(_SCRIPT, encoding="utf-8")
+        limits = ResourceLimits()
+
+        cold = _measure(
+            lambda: subprocess.run([sys.executable, str(script)], capture_output=True, check=True),
+            args.runs,
+        )
+        executor = ScriptExecutor()
+        managed = _measure(lambda: executor.execute("bench", script, [], limits), args.runs)
+
+        pool = WarmPythonPool(preload=[m for m in args.preload.split(",") if m])
+        warm_executor = ScriptExecutor(warm_pool=pool)
+        warm = _measure(lambda: warm_executor.execute("bench", script, [], limits), args.runs)
+        pool.close()
+
+    _report("subprocess.run (cold)", cold)
+    _report("executor subprocess", managed)
+    _report("executor warm pool", warm)
+    print(f"speedup_p50={cold[len(cold) // 2] / warm[len(warm) // 2]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
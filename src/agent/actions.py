@@ -126,6 +126,157 @@ class RunScriptAction(Action):
         )
 
 
+@dataclass
+class ReadFileAction(Action):
+    """读取技能目录内文件（按字节或行范围分页）"""
+    skill: SkillReference
+    relative_path: str
+    offset: Optional[int] = None
+    length: Optional[int] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+
+    def action_type(self) -> str:
+        return "read_file"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": "read_file",
+            "skill": self.skill.to_dict(),
+            "relative_path": self.relative_path,
+            "offset": self.offset,
+            "length": self.length,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+        }
+
+    def validate(self) -> bool:
+        return bool(self.relative_path) and ".." not in self.relative_path
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReadFileAction":
+        return cls(
+            skill=SkillReference.from_dict(data["skill"]),
+            relative_path=data["relative_path"],
+            offset=data.get("offset"),
+            length=data.get("length"),
+            start_line=data.get("start_line"),
+            end_line=data.get("end_line"),
+        )
+
+
+@dataclass
+class ListDirAction(Action):
+    """列举技能目录内容"""
+    skill: SkillReference
+    relative_path: str = "."
+    recursive: bool = False
+    max_depth: Optional[int] = None
+
+    def action_type(self) -> str:
+        return "list_dir"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": "list_dir",
+            "skill": self.skill.to_dict(),
+            "relative_path": self.relative_path,
+            "recursive": self.recursive,
+            "max_depth": self.max_depth,
+        }
+
+    def validate(self) -> bool:
+        return bool(self.relative_path) and ".." not in self.relative_path
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ListDirAction":
+        return cls(
+            skill=SkillReference.from_dict(data["skill"]),
+            relative_path=data.get("relative_path", "."),
+            recursive=data.get("recursive", False),
+            max_depth=data.get("max_depth"),
+        )
+
+
+@dataclass
+class GrepAction(Action):
+    """在技能目录内搜索"""
+    skill: SkillReference
+    pattern: str
+    relative_path: str = "."
+    glob: Optional[str] = None
+    ignore_case: bool = False
+    fixed_string: bool = False
+
+    def action_type(self) -> str:
+        return "grep"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": "grep",
+            "skill": self.skill.to_dict(),
+            "pattern": self.pattern,
+            "relative_path": self.relative_path,
+            "glob": self.glob,
+            "ignore_case": self.ignore_case,
+            "fixed_string": self.fixed_string,
+        }
+
+    def validate(self) -> bool:
+        return bool(self.pattern) and bool(self.relative_path) and ".." not in self.relative_path
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GrepAction":
+        return cls(
+            skill=SkillReference.from_dict(data["skill"]),
+            pattern=data["pattern"],
+            relative_path=data.get("relative_path", "."),
+            glob=data.get("glob"),
+            ignore_case=data.get("ignore_case", False),
+            fixed_string=data.get("fixed_string", False),
+        )
+
+
+# 可以放入批量动作并发执行的只读动作
+READ_ONLY_ACTION_TYPES = frozenset({"load_resource", "read_file", "list_dir", "grep"})
+
+MAX_BATCH_SIZE = 8
+
+
+@dataclass
+class BatchAction(Action):
+    """批量只读动作：同一 turn 内并发执行，按顺序返回观察结果"""
+    actions: List[Action]
+    reason: str = ""
+
+    def action_type(self) -> str:
+        return "batch"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": "batch",
+            "actions": [a.to_dict() for a in self.actions],
+            "reason": self.reason,
+        }
+
+    def validate(self) -> bool:
+        return (
+            0 < len(self.actions) <= MAX_BATCH_SIZE
+            and all(
+                a.action_type() in READ_ONLY_ACTION_TYPES and a.validate() for a in self.actions
+            )
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchAction":
+        actions = []
+        for item in data["actions"]:
+            if item.get("action") not in READ_ONLY_ACTION_TYPES:
+                raise ValueError(f"Action type not allowed in batch: {item.get('action')}")
+            actions.append(parse_action(item))
+        return cls(actions=actions, reason=data.get("reason", ""))
+
+
 @dataclass
 class FinalAnswerAction(Action):
     """最终答复动作"""
@@ -180,6 +331,10 @@ AgentAction = Union[
     SelectSkillsAction,
     LoadResourceAction,
     RunScriptAction,
+    ReadFileAction,
+    ListDirAction,
+    GrepAction,
+    BatchAction,
     FinalAnswerAction,
     PlanUpdateAction,
 ]
@@ -188,6 +343,10 @@ _ACTION_REGISTRY = {
     "select_skills": SelectSkillsAction,
     "load_resource": LoadResourceAction,
     "run_script": RunScriptAction,
+    "read_file": ReadFileAction,
+    "list_dir": ListDirAction,
+    "grep": GrepAction,
+    "batch": BatchAction,
     "final_answer": FinalAnswerAction,
     "plan_update": PlanUpdateAction,
 }
@@ -21,6 +21,8 @@ class EventType(Enum):
     MODEL_REQUEST = "model_request"
     MODEL_RESPONSE = "model_response"
     MODEL_DELTA = "model_delta"
+    MODEL_CACHE_HIT = "model_cache_hit"
+    MODEL_CACHE_MISS = "model_cache_miss"
 
     # 动作级
     ACTION_PLANNED = "action_planned"
@@ -45,6 +47,12 @@ class EventType(Enum):
     # 技能级
     SKILL_LOADED = "skill_loaded"
     RESOURCE_LOADED = "resource_loaded"
+    SKILL_ADDED = "skill_added"
+    SKILL_REMOVED = "skill_removed"
+    SKILL_UPDATED = "skill_updated"
+
+    # 脚本级
+    SCRIPT_OUTPUT = "script_output"
 
 
 @dataclass
@@ -0,0 +1,180 @@
+"""确定性、前缀稳定的提示词拼装（便于供应商侧 KV/提示词缓存复用）"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.agent.state import Observation, RunState
+
+# 分区按稳定性从高到低排列：越靠前的分区在各 turn 之间越不可能变化
+SEGMENT_ORDER = (
+    "system", "skill_index", "request", "skill_bodies", "plan", "observations", "budget",
+)
+
+# 进入 system 消息的分区，其余进入 user 消息
+_SYSTEM_SEGMENTS = frozenset({"system", "skill_index"})
+
+_SEPARATOR = "\n\n"
+_COMPARE_BLOCK = 4096
+
+
+def canonical_json(value: Any) -> str:
+    """规范化 JSON：键排序、紧凑分隔符、保留非 ASCII 字符"""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """两个字符串的公共前缀长度（先按块比较，再在首个不同块内逐字符比较）"""
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos + _COMPARE_BLOCK <= limit:
+        end = pos + _COMPARE_BLOCK
+        if a[pos:end] != b[pos:end]:
+            break
+        pos = end
+    while pos < limit and a[pos] == b[pos]:
+        pos += 1
+    return pos
+
+
+@dataclass
+class PromptSegment:
+    """提示词分区"""
+    kind: str
+    text: str
+
+
+@dataclass
+class BuiltPrompt:
+    """一次拼装的结果"""
+    messages: List[Dict[str, str]]
+    segments: List[PromptSegment]
+    text: str  # 各分区按顺序拼接的完整文本（前缀比较的对象）
+    shared_prefix_chars: int = 0  # 与上一 turn 的公共前缀长度
+    first_changed_segment: Optional[str] = None  # 与上一 turn 相比第一个发生变化的分区
+
+    @property
+    def prefix_reuse(self) -> float:
+        return self.shared_prefix_chars / len(self.text) if self.text else 0.0
+
+    def to_metrics(self) -> Dict[str, Any]:
+        return {
+            "prompt_chars": len(self.text),
+            "shared_prefix_chars": self.shared_prefix_chars,
+            "prefix_reuse": round(self.prefix_reuse, 4),
+            "first_changed_segment": self.first_changed_segment,
+        }
+
+
+@dataclass
+class PromptBuilder:
+    """
+    前缀稳定的提示词构建器
+
+    分区顺序见 ``SEGMENT_ORDER``：system、Level 1 技能索引、用户请求、
+    已加载技能正文、计划、observations、预算。同一 run 内用户请求不变，
+    因此放在技能正文之前；预算每轮变化，放在最后。
+
+    - 技能索引按 (source, name) 排序，只渲染 Level 1 字段
+    - 技能正文按加载顺序（loaded_at_turn, skill_id）排列，新加载的技能追加在末尾
+    - 结构化内容一律用 ``canonical_json`` 渲染；observation 不含时间戳
+    - 每次 ``build`` 与上一次的完整文本比较，报告公共前缀长度
+    """
+    system_prompt: str = ""
+    _previous: Optional[BuiltPrompt] = field(default=None, init=False, repr=False)
+    turns: int = field(default=0, init=False)
+    compared_chars: int = field(default=0, init=False)  # 除首轮外各 turn 的提示词字符数之和
+    shared_chars: int = field(default=0, init=False)
+
+    def build(self, state: RunState) -> BuiltPrompt:
+        """根据运行状态拼装提示词，并把前缀复用指标写入 ``state.metrics["prompt"]``"""
+        segments = [
+            PromptSegment(kind, text)
+            for kind, text in (
+                ("system", self.system_prompt.strip()),
+                ("skill_index", self._render_index(state.skill_index)),
+                ("request", f"# Request\n{state.request.strip()}"),
+                ("skill_bodies", self._render_bodies(state.loaded_skills)),
+                ("plan", self._render_plan(state.plan)),
+                ("observations", self._render_observations(state.observations)),
+                ("budget", f"# Budget\n{canonical_json(state.budget.to_dict())}"),
+            )
+            if text
+        ]
+        system_text = _SEPARATOR.join(s.text for s in segments if s.kind in _SYSTEM_SEGMENTS)
+        user_text = _SEPARATOR.join(s.text for s in segments if s.kind not in _SYSTEM_SEGMENTS)
+        messages = []
+        if system_text:
+            messages.append({"role": "system", "content": system_text})
+        messages.append({"role": "user", "content": user_text})
+        # 完整文本与消息内容一致：system 文本在前，user 文本在后
+        text = _SEPARATOR.join(t for t in (system_text, user_text) if t)
+
+        built = BuiltPrompt(messages=messages, segments=segments, text=text)
+        if self._previous is not None:
+            built.shared_prefix_chars = common_prefix_length(self._previous.text, text)
+            built.first_changed_segment = self._first_changed(self._previous.segments, segments)
+            self.compared_chars += len(text)
+            self.shared_chars += built.shared_prefix_chars
+        self.turns += 1
+        self._previous = built
+
+        metrics = built.to_metrics()
+        metrics["overall_prefix_reuse"] = round(self.overall_reuse, 4)
+        state.update_metrics("prompt", metrics)
+        return built
+
+    @property
+    def overall_reuse(self) -> float:
+        """除首轮外各 turn 的公共前缀字符数之和 / 提示词字符数之和"""
+        return self.shared_chars / self.compared_chars if self.compared_chars else 0.0
+
+    def reset(self) -> None:
+        """开始新的 run"""
+        self._previous = None
+        self.turns = self.compared_chars = self.shared_chars = 0
+
+    @staticmethod
+    def _render_index(skills: List[Any]) -> str:
+        if not skills:
+            return ""
+        rows = sorted(
+            ({"name": s.name, "description": s.description, "source": s.source} for s in skills),
+            key=lambda row: (row["source"], row["name"]),
+        )
+        return "# Skills\n" + "\n".join(canonical_json(row) for row in rows)
+
+    @staticmethod
+    def _render_plan(plan: Any) -> str:
+        return f"# Plan\n{canonical_json(plan.to_dict())}" if plan is not None else ""
+
+    @staticmethod
+    def _render_bodies(loaded: Dict[str, Any]) -> str:
+        if not loaded:
+            return ""
+        skills = sorted(loaded.values(), key=lambda s: (s.loaded_at_turn, s.metadata.skill_id))
+        return "\n\n".join(
+            f"# Skill {s.metadata.source}:{s.metadata.name}\n{s.body.strip()}" for s in skills
+        )
+
+    @staticmethod
+    def _render_observations(observations: List[Observation]) -> str:
+        if not observations:
+            return ""
+        lines = []
+        for obs in observations:
+            data = obs.to_dict()
+            data.pop("timestamp", None)
+            lines.append(canonical_json(data))
+        return "# Observations\n" + "\n".join(lines)
+
+    @staticmethod
+    def _first_changed(
+        previous: List[PromptSegment], current: List[PromptSegment]
+    ) -> Optional[str]:
+        for old, new in zip(previous, current):
+            if old.kind != new.kind or old.text != new.text:
+                return new.kind
+        if len(previous) != len(current):
+            longer = current if len(current) > len(previous) else previous
+            return longer[min(len(previous), len(current))].kind
+        return None
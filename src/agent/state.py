@@ -146,6 +146,9 @@ class RunState:
     # 上下文管理
     context_tokens_estimate: int = 0
 
+    # 运行指标（按子系统分组，例如 {"prefetch": {"hit_rate": 0.5}}）
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
     # 错误信息
     error: Optional[str] = None
     error_trace: Optional[str] = None
@@ -159,6 +162,11 @@ class RunState:
         self.observations.append(observation)
         self.updated_at = datetime.now()
 
+    def update_metrics(self, group: str, values: Dict[str, Any]) -> None:
+        """合并某个子系统的运行指标"""
+        self.metrics.setdefault(group, {}).update(values)
+        self.updated_at = datetime.now()
+
     def estimate_context_tokens(self, text: str) -> int:
         """粗略估算文本的 token 数（字符数 / 4）"""
         return len(text) // 4
@@ -177,4 +185,5 @@ class RunState:
             "updated_at": self.updated_at.isoformat(),
             "loaded_skills": list(self.loaded_skills.keys()),
             "observations_count": len(self.observations),
+            "metrics": self.metrics,
         }
@@ -14,7 +14,30 @@ class Config:
             {"source": "project", "path": ".agent/skills", "priority": 0},
             {"source": "user", "path": "~/.agent/skills", "priority": 1},
         ],
-        "model": {"provider": "mock", "params": {}},
+        "model": {
+            "provider": "mock",
+            "params": {},
+            "cassette": {
+                "mode": "off",
+                "path": ".agent/cassettes/default.json",
+                "realtime": False,
+                "store_prompts": False,
+            },
+            "openai_compat": {
+                "base_url": "http://127.0.0.1:8765/v1",
+                "model": "",
+                "api_key_env": "OPENAI_API_KEY",
+                "timeout_sec": 60,
+            },
+            "response_cache": {
+                "enabled": False,
+                "dir": ".agent/cache/model",
+                "max_memory_entries": 256,
+                "max_bytes": 67108864,
+                "max_entry_bytes": 1048576,
+                "ttl_sec": 86400,
+            },
+        },
         "budget": {
             "max_turns": 12,
             "max_tool_calls": 30,
@@ -24,10 +47,36 @@ class Config:
         "execution": {
             "require_approval_for": ["run_script"],
             "allowed_tools": ["read_file", "list_dir", "grep", "run_script"],
+            "max_parallel_loads": 8,
+            "max_concurrent_scripts": 4,
+            "max_batch_workers": 4,
+            "max_script_output_bytes": 65536,
+            "output_event_interval_sec": 0.25,
+            "grep": {"max_matches": 200, "max_workers": 4},
+            "read_file": {"excerpt_bytes": 8192},
+            "list_dir": {"max_entries": 500, "max_depth": 4},
+            "warm_pool": {"enabled": False, "preload": []},
+            "script_cache": {
+                "enabled": False,
+                "dir": ".agent/cache/scripts",
+                "max_bytes": 67108864,
+                "max_entry_bytes": 1048576,
+                "ttl_sec": 86400,
+                "count_hits": True,
+            },
+            "compaction": {
+                "enabled": True,
+                "dir": ".agent/cache/outputs",
+                "max_chars": 8000,
+                "max_items": 50,
+                "max_string_chars": 2000,
+            },
         },
         "security": {
             "max_skill_body_lines": 500,
             "max_resource_file_bytes": 2000000,
+            "max_frontmatter_bytes": 16384,
+            "max_resource_excerpt_chars": 12000,
         },
         "logging": {"level": "INFO", "format": "text"},
     }
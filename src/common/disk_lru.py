@@ -0,0 +1,107 @@
+"""磁盘 LRU 存储：按 key 保存字节条目，总量超限时按最近使用时间淘汰"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+class DiskLRUStore:
+    """
+    磁盘条目存储
+
+    每个条目存为 ``<root>/<key[:2]>/<key>.json``，通过临时文件 + ``os.replace``
+    原子写入。首次访问时扫描目录，按文件修改时间建立 LRU 索引；写入后总量
+    超过 ``max_bytes`` 时从最久未使用的条目开始删除（至少保留刚写入的条目）。
+
+    不做加锁，由调用方在自己的锁内使用。
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        """
+        Args:
+            root: 存储目录
+            max_bytes: 条目总字节数上限
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> 条目字节数（LRU 顺序）
+        self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        self._load_index()
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._load_index())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._load_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._load_index()))
+
+    def read(self, key: str) -> Optional[bytes]:
+        """读取条目并标记为最近使用（不存在或读取失败时返回 None）"""
+        index = self._load_index()
+        if key not in index:
+            return None
+        try:
+            data = self.path(key).read_bytes()
+        except OSError:
+            self.drop(key)
+            return None
+        index.move_to_end(key)
+        return data
+
+    def write(self, key: str, data: bytes) -> None:
+        """原子写入条目，并按总量上限淘汰旧条目"""
+        index = self._load_index()
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._total_bytes -= index.pop(key, 0)
+        index[key] = len(data)
+        self._total_bytes += len(data)
+        while self._total_bytes > self.max_bytes and len(index) > 1:
+            self.drop(next(iter(index)))
+
+    def touch(self, key: str) -> None:
+        """标记条目为最近使用"""
+        index = self._load_index()
+        if key in index:
+            index.move_to_end(key)
+
+    def drop(self, key: str) -> None:
+        """删除条目（不存在时忽略）"""
+        self._total_bytes -= self._load_index().pop(key, 0)
+        try:
+            self.path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """删除所有条目"""
+        for key in list(self._load_index()):
+            self.drop(key)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.root.is_dir():
+                for path in self.root.glob("*/*.json"):
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, path.stem, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total_bytes = sum(self._index.values())
+        return self._index
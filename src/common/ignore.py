@@ -0,0 +1,19 @@
+"""目录遍历的忽略规则（技能注册表扫描与 list_dir / grep 共用）"""
+
+# 始终忽略的生成目录
+IGNORED_NAMES = frozenset({"__pycache__", "node_modules"})
+
+
+def is_ignored(name: str) -> bool:
+    """
+    判断目录项是否忽略：隐藏文件/目录与常见生成目录
+
+    Examples:
+        >>> is_ignored(".git")
+        True
+        >>> is_ignored("__pycache__")
+        True
+        >>> is_ignored("scripts")
+        False
+    """
+    return name.startswith(".") or name in IGNORED_NAMES
@@ -0,0 +1,128 @@
+"""模型适配器抽象：统一的请求/响应结构与同步、流式生成接口"""
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from src.common.hash_utils import compute_text_hash
+
+# 流式回调：每收到一段新输出文本调用一次
+DeltaCallback = Callable[[str], None]
+
+# 不影响模型输出、不参与请求指纹的参数
+_VOLATILE_PARAMS = frozenset({"stream", "timeout", "request_timeout", "api_key", "user"})
+
+
+def normalize_content(content: Any) -> Any:
+    """规范化消息内容：统一换行符、去掉行尾空白与首尾空行"""
+    if not isinstance(content, str):
+        return content
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+@dataclass
+class ModelRequest:
+    """一次模型调用的输入"""
+    messages: List[Dict[str, Any]]
+    model: str = ""
+    params: Dict[str, Any] = field(default_factory=dict)
+    # 审计关联信息（如 run_id、turn），不参与指纹
+    telemetry: Dict[str, Any] = field(default_factory=dict)
+
+    def canonical(self) -> Dict[str, Any]:
+        """规范化后的请求：用于计算指纹，与空白差异、无关参数无关"""
+        return {
+            "model": self.model,
+            "params": {k: v for k, v in sorted(self.params.items()) if k not in _VOLATILE_PARAMS},
+            "messages": [
+                {key: normalize_content(value) for key, value in sorted(message.items())}
+                for message in self.messages
+            ],
+        }
+
+    def fingerprint(self) -> str:
+        """规范化请求的 SHA256"""
+        return compute_text_hash(json.dumps(
+            self.canonical(), ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        ))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "model": self.model,
+            "params": self.params,
+            "telemetry": self.telemetry,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelRequest":
+        return cls(
+            messages=data["messages"],
+            model=data.get("model", ""),
+            params=data.get("params", {}),
+            telemetry=data.get("telemetry", {}),
+        )
+
+
+@dataclass
+class ModelResponse:
+    """一次模型调用的输出"""
+    text: str
+    model: str = ""
+    finish_reason: str = "stop"
+    usage: Dict[str, int] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "model": self.model,
+            "finish_reason": self.finish_reason,
+            "usage": self.usage,
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelResponse":
+        return cls(
+            text=data["text"],
+            model=data.get("model", ""),
+            finish_reason=data.get("finish_reason", "stop"),
+            usage=data.get("usage", {}),
+            metadata=data.get("metadata", {}),
+        )
+
+
+class ModelAdapter(ABC):
+    """模型适配器抽象基类"""
+
+    def resolve(self, request: ModelRequest) -> ModelRequest:
+        """
+        实际发送的请求
+
+        合并适配器自身配置（如模型名、``model.params``）后的请求，缓存与
+        cassette 按它计算指纹。默认原样返回；包装器应委托给内层适配器。
+        """
+        return request
+
+    @abstractmethod
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        """生成模型响应"""
+        pass
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        """
+        流式生成
+
+        每收到一段输出调用一次 ``callback``，结束时返回完整响应
+        （与非流式调用一致）。默认实现把完整输出作为单个 delta。
+        """
+        response = self.generate(request)
+        if callback is not None and response.text:
+            callback(response.text)
+        return response
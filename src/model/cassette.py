@@ -0,0 +1,212 @@
+"""模型调用录制与回放（cassette）"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.model.adapter import DeltaCallback, ModelAdapter, ModelRequest, ModelResponse
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(LookupError):
+    """cassette 中没有与请求匹配的录制"""
+    pass
+
+
+class Cassette:
+    """
+    录制文件
+
+    按规范化请求指纹（``ModelRequest.fingerprint``，对 ``resolve`` 后的实际请求
+    计算，与线上发送的内容一致）分组保存交互，
+    同一指纹可有多条录制，回放时按录制顺序依次返回，用尽后重复最后一条。
+    默认不保存完整 prompt，只保存指纹与摘要；``store_prompts=True`` 时
+    额外保存 messages 便于调试。
+    """
+
+    def __init__(self, path: Path, store_prompts: bool = False) -> None:
+        self.path = Path(path)
+        self.store_prompts = store_prompts
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {data.get('version')}")
+            self._interactions = data.get("interactions", {})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(items) for items in self._interactions.values())
+
+    def record(
+        self,
+        request: ModelRequest,
+        response: ModelResponse,
+        elapsed_sec: float,
+        chunks: Optional[List[Tuple[float, str]]] = None,
+    ) -> None:
+        """
+        追加一条交互
+
+        Args:
+            elapsed_sec: 请求总耗时
+            chunks: 流式输出的 (相对请求开始的秒数, delta) 序列，非流式调用为 None
+        """
+        summary: Dict[str, Any] = {
+            "hash": request.fingerprint(),
+            "model": request.model,
+            "message_count": len(request.messages),
+            "prompt_chars": sum(len(str(m.get("content", ""))) for m in request.messages),
+        }
+        if self.store_prompts:
+            summary.update(request.to_dict())
+        interaction = {
+            "request": summary,
+            "response": response.to_dict(),
+            "elapsed_sec": round(elapsed_sec, 6),
+            "stream": [[round(t, 6), delta] for t, delta in chunks] if chunks is not None else None,
+        }
+        with self._lock:
+            self._interactions.setdefault(summary["hash"], []).append(interaction)
+
+    def next_interaction(self, request: ModelRequest) -> Dict[str, Any]:
+        """
+        取出与请求匹配的下一条录制
+
+        Raises:
+            CassetteMissError: 没有匹配的录制
+        """
+        key = request.fingerprint()
+        with self._lock:
+            items = self._interactions.get(key)
+            if not items:
+                raise CassetteMissError(
+                    f"No recorded interaction for request {key[:12]} in {self.path}"
+                )
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return items[min(cursor, len(items) - 1)]
+
+    def rewind(self) -> None:
+        """回放游标归零"""
+        with self._lock:
+            self._cursors.clear()
+
+    def save(self) -> None:
+        """原子写入录制文件"""
+        with self._lock:
+            text = json.dumps(
+                {"version": CASSETTE_VERSION, "interactions": self._interactions},
+                ensure_ascii=False, indent=2, sort_keys=True,
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class RecordingModel(ModelAdapter):
+    """录制模式：透传给内层适配器，并把请求→响应（含流式 delta 与时序）写入 cassette"""
+
+    def __init__(self, inner: ModelAdapter, cassette: Cassette, autosave: bool = True) -> None:
+        self.inner = inner
+        self.cassette = cassette
+        self.autosave = autosave
+
+    def resolve(self, request: ModelRequest) -> ModelRequest:
+        return self.inner.resolve(request)
+
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        start = time.perf_counter()
+        response = self.inner.generate(request)
+        self._record(request, response, time.perf_counter() - start, None)
+        return response
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        chunks: List[Tuple[float, str]] = []
+        start = time.perf_counter()
+
+        def on_delta(delta: str) -> None:
+            chunks.append((time.perf_counter() - start, delta))
+            if callback is not None:
+                callback(delta)
+
+        response = self.inner.generate_streaming(request, on_delta)
+        self._record(request, response, time.perf_counter() - start, chunks)
+        return response
+
+    def _record(
+        self,
+        request: ModelRequest,
+        response: ModelResponse,
+        elapsed: float,
+        chunks: Optional[List[Tuple[float, str]]],
+    ) -> None:
+        self.cassette.record(self.resolve(request), response, elapsed, chunks)
+        if self.autosave:
+            self.cassette.save()
+
+
+class ReplayModel(ModelAdapter):
+    """
+    回放模式：完全离线，按请求指纹返回录制的响应
+
+    默认全速回放；``realtime=True`` 时按录制的时序输出 delta（用于复现延迟特征）。
+    ``provider`` 为录制时使用的适配器配置，只用于 ``resolve`` 补全请求、不会被调用；
+    请求已是实际发送内容时（如桩服务收到的请求）省略。
+    未录制的请求抛出 ``CassetteMissError``。
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        realtime: bool = False,
+        provider: Optional[ModelAdapter] = None,
+    ) -> None:
+        self.cassette = cassette
+        self.realtime = realtime
+        self.provider = provider
+
+    def resolve(self, request: ModelRequest) -> ModelRequest:
+        return self.provider.resolve(request) if self.provider is not None else request
+
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        interaction = self.cassette.next_interaction(self.resolve(request))
+        if self.realtime:
+            time.sleep(interaction.get("elapsed_sec", 0))
+        return self._response(interaction)
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        interaction = self.cassette.next_interaction(self.resolve(request))
+        response = self._response(interaction)
+        stream = interaction.get("stream")
+        if stream is None:
+            stream = [[interaction.get("elapsed_sec", 0), response.text]] if response.text else []
+        start = time.perf_counter()
+        for offset, delta in stream:
+            if self.realtime:
+                wait = offset - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+            if callback is not None:
+                callback(delta)
+        return response
+
+    @staticmethod
+    def _response(interaction: Dict[str, Any]) -> ModelResponse:
+        response = ModelResponse.from_dict(interaction["response"])
+        response.metadata = dict(response.metadata, replayed=True)
+        return response
@@ -0,0 +1,65 @@
+"""根据配置创建模型适配器"""
+from pathlib import Path
+from typing import Optional
+
+from src.agent.events import EventStream
+from src.common.config import Config
+from src.model.adapter import ModelAdapter
+from src.model.cassette import Cassette, RecordingModel, ReplayModel
+from src.model.mock import MockModel
+from src.model.openai_compat import OpenAICompatModel
+from src.model.response_cache import CachingModel, ModelResponseCache
+
+
+def create_model_adapter(
+    config: Config,
+    event_stream: Optional[EventStream] = None,
+    run_id: str = "",
+) -> ModelAdapter:
+    """
+    按 ``model.provider`` 创建适配器，并按 ``model.cassette.mode`` 包装录制/回放
+
+    - ``off``：直接使用 provider
+    - ``record``：透传给 provider 并写入 cassette
+    - ``replay``：只从 cassette 回放，不访问 provider（仅用其配置补全请求指纹）
+
+    启用 ``model.response_cache`` 时在最外层加响应缓存（缓存命中的请求
+    不会进入 cassette 录制）。
+
+    Raises:
+        ValueError: 未知的 provider 或 cassette 模式
+    """
+    mode = config.get("model.cassette.mode", "off")
+    if mode not in ("off", "record", "replay"):
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    if mode == "replay":
+        adapter: ModelAdapter = ReplayModel(
+            _cassette(config),
+            realtime=config.get("model.cassette.realtime", False),
+            provider=_provider(config),
+        )
+    else:
+        adapter = _provider(config)
+        if mode == "record":
+            adapter = RecordingModel(adapter, _cassette(config))
+
+    cache = ModelResponseCache.from_config(config)
+    if cache is not None:
+        adapter = CachingModel(adapter, cache, event_stream=event_stream, run_id=run_id)
+    return adapter
+
+
+def _provider(config: Config) -> ModelAdapter:
+    provider = config.get("model.provider", "mock")
+    if provider == "mock":
+        return MockModel.from_config(config)
+    if provider == "openai_compat":
+        return OpenAICompatModel.from_config(config)
+    raise ValueError(f"Unknown model provider: {provider}")
+
+
+def _cassette(config: Config) -> Cassette:
+    return Cassette(
+        Path(config.get("model.cassette.path", ".agent/cassettes/default.json")),
+        store_prompts=config.get("model.cassette.store_prompts", False),
+    )
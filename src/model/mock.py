@@ -0,0 +1,65 @@
+"""MockModel：按脚本返回预设输出，用于离线评估与回归"""
+import json
+import threading
+from typing import Any, List, Optional
+
+from src.common.config import Config
+from src.model.adapter import DeltaCallback, ModelAdapter, ModelRequest, ModelResponse
+
+_DEFAULT_RESPONSE = {"action": "final_answer", "answer": "mock response", "completed": True}
+
+
+class MockModel(ModelAdapter):
+    """
+    脚本化模型
+
+    依次返回 ``responses`` 中的输出（字符串原样返回，其他值序列化为 JSON），
+    用尽后重复最后一个。流式调用按 ``chunk_size`` 个字符切分同一输出，
+    拼接结果与非流式一致。
+    """
+
+    def __init__(
+        self,
+        responses: Optional[List[Any]] = None,
+        chunk_size: int = 16,
+        model: str = "mock",
+    ) -> None:
+        self.responses = [
+            r if isinstance(r, str) else json.dumps(r, ensure_ascii=False)
+            for r in (responses or [_DEFAULT_RESPONSE])
+        ]
+        self.chunk_size = max(1, chunk_size)
+        self.model = model
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "MockModel":
+        params = config.get("model.params", {}) or {}
+        return cls(
+            responses=params.get("responses"),
+            chunk_size=params.get("chunk_size", 16),
+        )
+
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        with self._lock:
+            text = self.responses[min(self.calls, len(self.responses) - 1)]
+            self.calls += 1
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in request.messages)
+        return ModelResponse(
+            text=text,
+            model=request.model or self.model,
+            usage={"prompt_tokens": prompt_chars // 4, "completion_tokens": len(text) // 4},
+        )
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        response = self.generate(request)
+        if callback is not None:
+            text = response.text
+            for i in range(0, len(text), self.chunk_size):
+                callback(text[i:i + self.chunk_size])
+        return response
@@ -0,0 +1,147 @@
+"""OpenAI-compatible chat completions 适配器（标准库 HTTP 客户端）"""
+import json
+import os
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+from src.common.config import Config
+from src.model.adapter import DeltaCallback, ModelAdapter, ModelRequest, ModelResponse
+
+
+class ModelAPIError(Exception):
+    """模型服务返回错误或响应无法解析"""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class OpenAICompatModel(ModelAdapter):
+    """
+    对接 ``POST {base_url}/chat/completions``
+
+    - 非流式：解析 ``choices[0].message.content``
+    - 流式：请求 ``stream: true``，逐行解析 SSE ``data:`` 事件，
+      把 ``choices[0].delta.content`` 交给回调，直到 ``data: [DONE]``
+
+    请求参数为 ``params``（来自 ``model.params``）与 ``ModelRequest.params`` 合并，
+    后者优先。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str = "",
+        api_key: Optional[str] = None,
+        timeout_sec: float = 60.0,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.timeout_sec = timeout_sec
+        self.params = dict(params or {})
+
+    @classmethod
+    def from_config(cls, config: Config) -> "OpenAICompatModel":
+        api_key_env = config.get("model.openai_compat.api_key_env", "OPENAI_API_KEY")
+        return cls(
+            base_url=config.get("model.openai_compat.base_url", "http://127.0.0.1:8765/v1"),
+            model=config.get("model.openai_compat.model", ""),
+            api_key=os.environ.get(api_key_env) if api_key_env else None,
+            timeout_sec=config.get("model.openai_compat.timeout_sec", 60.0),
+            params=config.get("model.params", {}) or {},
+        )
+
+    def resolve(self, request: ModelRequest) -> ModelRequest:
+        params = dict(self.params)
+        params.update(request.params)
+        return ModelRequest(
+            messages=request.messages,
+            model=request.model or self.model,
+            params=params,
+            telemetry=request.telemetry,
+        )
+
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        with self._post(request, stream=False) as resp:
+            try:
+                data = json.loads(resp.read().decode("utf-8"))
+                choice = data["choices"][0]
+                text = choice["message"].get("content") or ""
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise ModelAPIError(f"Malformed completion response: {e}", resp.status) from None
+        return ModelResponse(
+            text=text,
+            model=data.get("model", request.model or self.model),
+            finish_reason=choice.get("finish_reason") or "stop",
+            usage=data.get("usage") or {},
+        )
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        parts = []
+        model = request.model or self.model
+        finish_reason = "stop"
+        usage: Dict[str, int] = {}
+        with self._post(request, stream=True) as resp:
+            for raw in self._lines(resp):
+                line = raw.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(payload)
+                except ValueError:
+                    raise ModelAPIError(
+                        f"Malformed stream chunk: {payload[:200]}", resp.status
+                    ) from None
+                if "error" in chunk:
+                    raise ModelAPIError(str(chunk["error"]), resp.status)
+                model = chunk.get("model", model)
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or ():
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        if callback is not None:
+                            callback(delta)
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+        return ModelResponse(
+            text="".join(parts), model=model, finish_reason=finish_reason, usage=usage
+        )
+
+    @staticmethod
+    def _lines(resp: Any) -> Any:
+        try:
+            yield from resp
+        except OSError as e:
+            raise ModelAPIError(f"Stream interrupted: {e}", resp.status) from None
+
+    def _post(self, request: ModelRequest, stream: bool) -> Any:
+        request = self.resolve(request)
+        body: Dict[str, Any] = dict(request.params)
+        body.update({"model": request.model, "messages": request.messages, "stream": stream})
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        http_request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+            headers=headers,
+            method="POST",
+        )
+        try:
+            return urllib.request.urlopen(http_request, timeout=self.timeout_sec)
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")[:500]
+            raise ModelAPIError(f"HTTP {e.code}: {detail}", e.code) from None
+        except (urllib.error.URLError, OSError) as e:
+            raise ModelAPIError(f"Request failed: {e}") from None
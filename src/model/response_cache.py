@@ -0,0 +1,250 @@
+"""模型响应缓存（内存 LRU + 磁盘存储，按大小与 TTL 淘汰）"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agent.events import Event, EventStream, EventType
+from src.common.config import Config
+from src.common.disk_lru import DiskLRUStore
+from src.model.adapter import DeltaCallback, ModelAdapter, ModelRequest, ModelResponse
+
+# 缓存格式版本，结构变化时递增使旧条目失效
+_FORMAT_VERSION = 1
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应；``deltas`` 为流式调用时的分段（非流式调用为 None）"""
+    response: ModelResponse
+    deltas: Optional[List[str]] = None
+
+
+class ModelResponseCache:
+    """模型响应缓存
+
+    键为 ``ModelRequest.fingerprint()``（规范化的 model、params 与 messages），
+    由 ``CachingModel`` 对内层适配器 ``resolve`` 后的实际请求计算。
+    内存中按 LRU 保留最多 ``max_memory_entries`` 条；配置 ``cache_dir`` 时
+    同时写入 ``<dir>/<key[:2]>/<key>.json``，总量超过 ``max_bytes`` 时按
+    最近使用时间淘汰。超过 ``ttl_sec`` 的条目在读取时丢弃。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_memory_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+        ttl_sec: float = 86400,
+    ) -> None:
+        """
+        Args:
+            cache_dir: 磁盘缓存目录，None 时只用内存
+            max_memory_entries: 内存 LRU 条目上限
+            max_bytes: 磁盘缓存总字节数上限
+            max_entry_bytes: 单个条目字节数上限
+            ttl_sec: 条目有效期（秒）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_memory_entries = max_memory_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_sec = ttl_sec
+        self._memory: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._store = (
+            DiskLRUStore(self.cache_dir, max_bytes) if self.cache_dir is not None else None
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["ModelResponseCache"]:
+        """根据 ``model.response_cache`` 配置创建缓存（未启用时返回 None）"""
+        if not config.get("model.response_cache.enabled", False):
+            return None
+        cache_dir = config.get("model.response_cache.dir", ".agent/cache/model")
+        return cls(
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            max_memory_entries=config.get("model.response_cache.max_memory_entries", 256),
+            max_bytes=config.get("model.response_cache.max_bytes", 64 * 1024 * 1024),
+            max_entry_bytes=config.get("model.response_cache.max_entry_bytes", 1024 * 1024),
+            ttl_sec=config.get("model.response_cache.ttl_sec", 86400),
+        )
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """查询缓存，未命中、过期或损坏时返回 None"""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if now - cached[0] <= self.ttl_sec:
+                    self._memory.move_to_end(key)
+                    if self._store is not None:
+                        self._store.touch(key)
+                    self.hits += 1
+                    return cached[1]
+                del self._memory[key]
+
+            data = self._read_disk(key)
+            if data is None or now - data["created_at"] > self.ttl_sec:
+                if data is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            entry = CachedResponse(ModelResponse.from_dict(data["response"]), data.get("deltas"))
+            self._remember(key, data["created_at"], entry)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, response: ModelResponse, deltas: Optional[List[str]] = None) -> bool:
+        """写入缓存，返回是否写入（出错的响应或超过单项上限时不写入）"""
+        if response.finish_reason == "error":
+            return False
+        created_at = time.time()
+        entry = json.dumps({
+            "v": _FORMAT_VERSION,
+            "created_at": created_at,
+            "response": response.to_dict(),
+            "deltas": deltas,
+        }, ensure_ascii=False).encode("utf-8")
+        if len(entry) > self.max_entry_bytes:
+            return False
+
+        with self._lock:
+            # 保存副本，避免调用方修改返回的响应影响缓存
+            stored = CachedResponse(ModelResponse.from_dict(response.to_dict()), deltas)
+            self._remember(key, created_at, stored)
+            if self._store is not None:
+                self._store.write(key, entry)
+        return True
+
+    def clear(self) -> None:
+        """删除所有缓存条目"""
+        with self._lock:
+            self._memory.clear()
+            if self._store is not None:
+                self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._store) if self._store is not None else 0,
+                "disk_bytes": self._store.total_bytes if self._store is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remember(self, key: str, created_at: float, entry: CachedResponse) -> None:
+        self._memory[key] = (created_at, entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._store is None:
+            return None
+        raw = self._store.read(key)
+        if raw is None:
+            return None
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or data.get("v") != _FORMAT_VERSION:
+            self._drop(key)
+            return None
+        return data
+
+    def _drop(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._store is not None:
+            self._store.drop(key)
+
+
+class CachingModel(ModelAdapter):
+    """
+    带响应缓存的模型适配器
+
+    命中时不调用内层适配器：非流式直接返回缓存响应，流式按缓存的分段
+    依次回调（非流式写入的条目作为单个 delta），下游代码路径不变。
+    每次查询发送 ``MODEL_CACHE_HIT`` / ``MODEL_CACHE_MISS`` 事件。
+    """
+
+    def __init__(
+        self,
+        inner: ModelAdapter,
+        cache: ModelResponseCache,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.event_stream = event_stream
+        self.run_id = run_id
+
+    def resolve(self, request: ModelRequest) -> ModelRequest:
+        return self.inner.resolve(request)
+
+    def generate(self, request: ModelRequest) -> ModelResponse:
+        key = self.resolve(request).fingerprint()
+        cached = self._lookup(request, key)
+        if cached is not None:
+            return self._hit_response(cached)
+        response = self.inner.generate(request)
+        self.cache.put(key, response)
+        return response
+
+    def generate_streaming(
+        self,
+        request: ModelRequest,
+        callback: Optional[DeltaCallback] = None,
+    ) -> ModelResponse:
+        key = self.resolve(request).fingerprint()
+        cached = self._lookup(request, key)
+        if cached is not None:
+            response = self._hit_response(cached)
+            deltas = cached.deltas if cached.deltas is not None else [response.text]
+            if callback is not None:
+                for delta in deltas:
+                    if delta:
+                        callback(delta)
+            return response
+
+        deltas: List[str] = []
+
+        def on_delta(delta: str) -> None:
+            deltas.append(delta)
+            if callback is not None:
+                callback(delta)
+
+        response = self.inner.generate_streaming(request, on_delta)
+        self.cache.put(key, response, deltas)
+        return response
+
+    def _lookup(self, request: ModelRequest, key: str) -> Optional[CachedResponse]:
+        cached = self.cache.get(key)
+        if self.event_stream is not None:
+            self.event_stream.emit(Event(
+                EventType.MODEL_CACHE_HIT if cached is not None else EventType.MODEL_CACHE_MISS,
+                request.telemetry.get("run_id", self.run_id),
+                request.telemetry.get("turn", 0),
+                {"key": key, "hits": self.cache.hits, "misses": self.cache.misses},
+            ))
+        return cached
+
+    @staticmethod
+    def _hit_response(cached: CachedResponse) -> ModelResponse:
+        response = cached.response
+        return ModelResponse(
+            text=response.text,
+            model=response.model,
+            finish_reason=response.finish_reason,
+            usage=dict(response.usage),
+            metadata=dict(response.metadata, cache_hit=True),
+        )
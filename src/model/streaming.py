@@ -0,0 +1,345 @@
+"""流式 JSON 解析器：边接收模型输出边解析结构化动作"""
+import json
+import re
+from typing import Any, Callable, Iterable, List, Optional, Pattern, Tuple
+
+from src.agent.actions import AgentAction, parse_action
+
+# 回调签名：(路径, 值) ；增量回调的值为字符串新增部分
+PathCallback = Callable[[str, Any], None]
+
+_WHITESPACE = " \t\r\n"
+_LITERAL_START = "-0123456789tfn"
+_LITERAL_RUN = re.compile(r"[0-9A-Za-z+\-.]*")
+_STRING_STOP = re.compile(r'["\\]')
+
+# 解析状态
+_PRELUDE = 0      # 跳过前导文本，等待根对象的 "{"
+_VALUE = 1        # 期待一个值
+_VALUE_OR_END = 2  # 数组首元素或 "]"
+_KEY = 3          # 期待属性名
+_KEY_OR_END = 4   # 对象首个属性名或 "}"
+_COLON = 5
+_AFTER = 6        # 值之后：期待 "," 或容器结束
+_STRING = 7
+_ESCAPE = 8
+_LITERAL = 9
+_DONE = 10
+
+
+class StreamingParseError(ValueError):
+    """流式输出不是合法的 JSON 或不是合法的动作"""
+    pass
+
+
+def compile_path(pattern: str) -> Pattern[str]:
+    """
+    编译路径模式
+
+    路径形如 ``action``、``skills[0].name``；``*`` 匹配任意一个属性名或
+    数组下标，例如 ``skills[*].name``。
+    """
+    return re.compile(re.escape(pattern).replace(r"\*", r"[^.\[\]]+") + r"\Z")
+
+
+class _Frame:
+    __slots__ = ("container", "path", "key")
+
+    def __init__(self, container: Any, path: str) -> None:
+        self.container = container
+        self.path = path
+        self.key: Optional[str] = None
+
+
+class StreamingJSONParser:
+    """
+    增量 JSON 解析器
+
+    逐段 ``feed`` 文本，按字符驱动有限状态机，维护容器栈与当前路径；
+    字符串内部用正则跳到下一个引号或反斜杠，整体为 O(总长度)。
+
+    - ``on_value``：值解析完成时回调（标量立即回调，对象/数组在闭合时回调）
+    - ``on_delta``：字符串值每收到一段新内容就回调该段（用于 token 级回显）
+    - ``skip_prelude=True`` 时忽略根对象 ``{`` 之前的文本（说明文字、code fence）
+    - 根值完成后的文本被忽略
+    """
+
+    def __init__(self, skip_prelude: bool = False) -> None:
+        self._value_callbacks: List[Tuple[Pattern[str], PathCallback]] = []
+        self._delta_callbacks: List[Tuple[Pattern[str], PathCallback]] = []
+        self._state = _PRELUDE if skip_prelude else _VALUE
+        self._stack: List[_Frame] = []
+        self._root: Any = None
+        self._buffer: List[str] = []  # 字符串片段或字面量字符
+        self._escape = ""
+        self._string_is_key = False
+        self._string_path = ""
+        self._string_deltas: List[PathCallback] = []
+        self.chars_consumed = 0
+
+    def on_value(self, pattern: str, callback: PathCallback) -> None:
+        self._value_callbacks.append((compile_path(pattern), callback))
+
+    def on_delta(self, pattern: str, callback: PathCallback) -> None:
+        self._delta_callbacks.append((compile_path(pattern), callback))
+
+    @property
+    def done(self) -> bool:
+        """根值是否已解析完成"""
+        return self._state == _DONE
+
+    def feed(self, text: str) -> None:
+        """
+        输入一段文本
+
+        Raises:
+            StreamingParseError: 文本不是合法 JSON
+        """
+        i, n = 0, len(text)
+        while i < n and self._state != _DONE:
+            state = self._state
+            if state == _STRING:
+                i = self._feed_string(text, i)
+                continue
+            if state == _ESCAPE:
+                i = self._feed_escape(text, i)
+                continue
+            if state == _LITERAL:
+                end = _LITERAL_RUN.match(text, i).end()
+                self._buffer.append(text[i:end])
+                i = end
+                if i < n:
+                    self._finish_literal()
+                continue
+
+            ch = text[i]
+            if state == _PRELUDE:
+                brace = text.find("{", i)
+                if brace < 0:
+                    i = n
+                    continue
+                i = brace
+                self._state = _VALUE
+                continue
+            if ch in _WHITESPACE:
+                i += 1
+                continue
+
+            if state == _VALUE or state == _VALUE_OR_END:
+                if ch == "]" and state == _VALUE_OR_END:
+                    self._close_container()
+                else:
+                    self._start_value(ch)
+            elif state == _KEY or state == _KEY_OR_END:
+                if ch == '"':
+                    self._start_string(is_key=True)
+                elif ch == "}" and state == _KEY_OR_END:
+                    self._close_container()
+                else:
+                    raise self._error(f"Expected property name, got {ch!r}")
+            elif state == _COLON:
+                if ch != ":":
+                    raise self._error(f"Expected ':', got {ch!r}")
+                self._state = _VALUE
+            elif state == _AFTER:
+                frame = self._stack[-1]
+                is_dict = isinstance(frame.container, dict)
+                if ch == ",":
+                    self._state = _KEY if is_dict else _VALUE
+                elif ch == ("}" if is_dict else "]"):
+                    self._close_container()
+                else:
+                    raise self._error(f"Expected ',' or container end, got {ch!r}")
+            i += 1
+        self.chars_consumed += i
+
+    def close(self) -> Any:
+        """
+        结束输入并返回根值
+
+        Raises:
+            StreamingParseError: JSON 未完整闭合
+        """
+        if self._state == _LITERAL and not self._stack:
+            self._finish_literal()
+        if self._state != _DONE:
+            raise self._error("Incomplete JSON")
+        return self._root
+
+    # ── 内部实现 ──
+
+    def _error(self, message: str) -> StreamingParseError:
+        return StreamingParseError(f"{message} (at char {self.chars_consumed})")
+
+    def _child_path(self) -> str:
+        if not self._stack:
+            return ""
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            return f"{frame.path}.{frame.key}" if frame.path else frame.key  # type: ignore[return-value]
+        return f"{frame.path}[{len(frame.container)}]"
+
+    def _start_value(self, ch: str) -> None:
+        if ch == "{":
+            self._stack.append(_Frame({}, self._child_path()))
+            self._state = _KEY_OR_END
+        elif ch == "[":
+            self._stack.append(_Frame([], self._child_path()))
+            self._state = _VALUE_OR_END
+        elif ch == '"':
+            self._start_string(is_key=False)
+        elif ch in _LITERAL_START:
+            self._buffer = [ch]
+            self._state = _LITERAL
+        else:
+            raise self._error(f"Unexpected character {ch!r}")
+
+    def _start_string(self, is_key: bool) -> None:
+        self._buffer = []
+        self._string_is_key = is_key
+        if is_key:
+            self._string_deltas = []
+        else:
+            self._string_path = self._child_path()
+            self._string_deltas = [
+                cb for pattern, cb in self._delta_callbacks if pattern.match(self._string_path)
+            ]
+        self._state = _STRING
+
+    def _string_chunk(self, chunk: str) -> None:
+        self._buffer.append(chunk)
+        for callback in self._string_deltas:
+            callback(self._string_path, chunk)
+
+    def _feed_string(self, text: str, i: int) -> int:
+        match = _STRING_STOP.search(text, i)
+        end = match.start() if match else len(text)
+        if end > i:
+            self._string_chunk(text[i:end])
+        if match is None:
+            return end
+        if text[end] == "\\":
+            self._escape = "\\"
+            self._state = _ESCAPE
+            return end + 1
+        value = "".join(self._buffer)
+        if self._string_is_key:
+            self._stack[-1].key = value
+            self._state = _COLON
+        else:
+            self._complete(value, self._string_path)
+        return end + 1
+
+    def _feed_escape(self, text: str, i: int) -> int:
+        self._escape += text[i]
+        escape = self._escape
+        if escape[1] == "u":
+            if len(escape) < 6:
+                return i + 1
+            # 高代理项需要与随后的 \uXXXX 低代理项一起解码
+            if "\\ud800" <= escape[:6].lower() <= "\\udbff":
+                if len(escape) == 7 and escape[6] != "\\" or len(escape) == 8 and escape[7] != "u":
+                    # 后面不是低代理项：先解码高代理项，再重新处理当前字符
+                    self._string_chunk(self._decode_escape(escape[:6]))
+                    if len(escape) == 7:
+                        self._state = _STRING
+                    else:
+                        self._escape = "\\"
+                    return i
+                if len(escape) < 12:
+                    return i + 1
+        self._string_chunk(self._decode_escape(escape))
+        self._state = _STRING
+        return i + 1
+
+    def _decode_escape(self, escape: str) -> str:
+        try:
+            return json.loads(f'"{escape}"')
+        except ValueError:
+            raise self._error(f"Invalid escape sequence {escape!r}") from None
+
+    def _finish_literal(self) -> None:
+        token = "".join(self._buffer)
+        try:
+            value = json.loads(token)
+        except ValueError:
+            raise self._error(f"Invalid literal {token!r}") from None
+        self._complete(value, self._child_path())
+
+    def _close_container(self) -> None:
+        frame = self._stack.pop()
+        self._complete(frame.container, frame.path)
+
+    def _complete(self, value: Any, path: str) -> None:
+        for pattern, callback in self._value_callbacks:
+            if pattern.match(path):
+                callback(path, value)
+        if not self._stack:
+            self._root = value
+            self._state = _DONE
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+        self._state = _AFTER
+
+
+class StreamingActionParser:
+    """
+    流式动作解析器
+
+    在 ``StreamingJSONParser`` 之上容忍模型输出中的前导说明文字与
+    code fence，流结束时用 ``parse_action`` 构建动作并完成校验。
+    回调只用于提前回显/预取（例如 ``skills[*].name`` 选定后即可预取技能），
+    最终以校验通过的动作为准。
+    """
+
+    def __init__(self) -> None:
+        self._parser = StreamingJSONParser(skip_prelude=True)
+
+    def on_value(self, pattern: str, callback: PathCallback) -> None:
+        self._parser.on_value(pattern, callback)
+
+    def on_delta(self, pattern: str, callback: PathCallback) -> None:
+        self._parser.on_delta(pattern, callback)
+
+    @property
+    def done(self) -> bool:
+        return self._parser.done
+
+    def feed(self, delta: str) -> None:
+        self._parser.feed(delta)
+
+    def finish(self) -> AgentAction:
+        """
+        结束输入并返回校验通过的动作
+
+        Raises:
+            StreamingParseError: JSON 不完整、动作类型未知、缺少字段或校验失败
+        """
+        data = self._parser.close()
+        if not isinstance(data, dict):
+            raise StreamingParseError("Action must be a JSON object")
+        try:
+            action = parse_action(data)
+        except KeyError as e:
+            raise StreamingParseError(
+                f"Missing field {e} for action {data.get('action')}"
+            ) from None
+        except (TypeError, AttributeError) as e:
+            raise StreamingParseError(f"Malformed action {data.get('action')}: {e}") from None
+        except ValueError as e:
+            raise StreamingParseError(str(e)) from None
+        if not action.validate():
+            raise StreamingParseError(f"Invalid action: {action.action_type()}")
+        return action
+
+    @classmethod
+    def parse(cls, chunks: Iterable[str]) -> AgentAction:
+        """一次性解析一个 chunk 序列"""
+        parser = cls()
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.finish()
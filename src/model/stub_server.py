@@ -0,0 +1,331 @@
+"""本地 OpenAI-compatible 桩模型服务（仅标准库 asyncio），用于离线压测
+
+运行：python -m src.model.stub_server [--port 8765] [--responses file.json | --cassette run.json]
+                                      [--latency 0.2] [--tokens-per-sec 50] [--error-rate 0.01]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.model.adapter import ModelAdapter, ModelRequest
+from src.model.cassette import Cassette, ReplayModel
+from src.model.mock import MockModel
+
+# 按“单词 + 后随空白”切分输出，近似 token 粒度
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+_MAX_BODY_BYTES = 16 * 1024 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class StubModelServer:
+    """
+    chat completions 协议的桩服务
+
+    - ``POST /v1/chat/completions``：由 ``adapter`` 生成回复（``MockModel`` 脚本化回复，
+      或 ``ReplayModel`` 回放 cassette），支持 ``stream: true`` 的 SSE 流式输出
+    - ``GET /v1/models``、``GET /health``
+    - ``latency_sec``：首个 token 之前的延迟；``tokens_per_sec``：输出速率（0 表示不限速）
+    - ``error_rate``：按概率返回 ``error_status`` 错误（``seed`` 固定时可复现）
+
+    每个连接只处理一个请求（``Connection: close``）。适配器在线程池中调用，
+    阻塞的适配器不会拖慢其他连接。``start`` 在后台线程中运行事件循环，便于
+    在同步测试与压测中使用。
+    """
+
+    def __init__(
+        self,
+        adapter: ModelAdapter,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_sec: float = 0.0,
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = None,
+        model: str = "stub",
+    ) -> None:
+        self.adapter = adapter
+        self.host = host
+        self.port = port
+        self.latency_sec = latency_sec
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.model = model
+        self._rng = random.Random(seed)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.streamed = 0
+        self.errors = 0
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "streamed": self.streamed,
+            "errors": self.errors,
+            "active": self.active,
+            "max_active": self.max_active,
+        }
+
+    # ── 生命周期 ──
+
+    def start(self) -> str:
+        """在后台线程启动服务，返回 base_url"""
+        ready = threading.Event()
+        failure: List[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                server = loop.run_until_complete(self._start_server())
+            except BaseException as e:  # 端口占用等启动错误交给调用方
+                failure.append(e)
+                ready.set()
+                loop.close()
+                return
+            self._loop = loop
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                server.close()
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                loop.run_until_complete(server.wait_closed())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="stub-model-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self) -> "StubModelServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    async def serve_forever(self) -> None:
+        server = await self._start_server()
+        async with server:
+            await server.serve_forever()
+
+    async def _start_server(self) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    # ── 请求处理 ──
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            method, path, body = await self._read_request(reader)
+            if method == "GET" and path == "/health":
+                await self._send_json(writer, 200, {"status": "ok"})
+            elif method == "GET" and path == "/v1/models":
+                models = [{"id": self.model, "object": "model"}]
+                await self._send_json(writer, 200, {"object": "list", "data": models})
+            elif method == "POST" and path == "/v1/chat/completions":
+                self.requests += 1
+                await self._complete(writer, body)
+            else:
+                await self._send_error(writer, 404, f"No route for {method} {path}", "not_found")
+        except (ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            await self._send_error(writer, 400, "Malformed HTTP request", "invalid_request_error")
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        lines = head.split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0"))
+        if length < 0 or length > _MAX_BODY_BYTES:
+            raise ValueError(f"Invalid content length: {length}")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], body
+
+    async def _complete(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        try:
+            payload = json.loads(body.decode("utf-8"))
+            messages = payload["messages"]
+            if not isinstance(messages, list):
+                raise TypeError("messages must be a list")
+        except (ValueError, KeyError, TypeError) as e:
+            await self._send_error(
+                writer, 400, f"Invalid request body: {e}", "invalid_request_error"
+            )
+            return
+
+        if self.latency_sec > 0:
+            await asyncio.sleep(self.latency_sec)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            await self._send_error(writer, self.error_status, "Injected error", "server_error")
+            return
+
+        # 请求原样交给适配器，使指纹与录制时一致
+        params = {k: v for k, v in payload.items() if k not in ("model", "messages", "stream")}
+        request = ModelRequest(messages=messages, model=payload.get("model") or "", params=params)
+        model = request.model or self.model
+        try:
+            # 适配器可能阻塞（如 realtime 回放），放到线程中执行，不阻塞其他连接
+            response = await asyncio.to_thread(self.adapter.generate, request)
+        except Exception as e:  # 适配器错误（如 cassette 未录制）以 500 返回
+            await self._send_error(writer, 500, f"{type(e).__name__}: {e}", "server_error")
+            return
+
+        tokens = _TOKEN_RE.findall(response.text)
+        usage = {
+            "prompt_tokens": sum(len(str(m.get("content", ""))) for m in messages) // 4,
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not payload.get("stream"):
+            if self.tokens_per_sec > 0:
+                await asyncio.sleep(len(tokens) / self.tokens_per_sec)
+            await self._send_json(writer, 200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": response.text},
+                    "finish_reason": response.finish_reason,
+                }],
+                "usage": usage,
+            })
+            return
+
+        self.streamed += 1
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+
+        def event(
+            delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any
+        ) -> bytes:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            chunk.update(extra)
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8")
+
+        writer.write(event({"role": "assistant"}))
+        start = time.perf_counter()
+        for i, token in enumerate(tokens):
+            if self.tokens_per_sec > 0:
+                # 按绝对时间表输出，避免 sleep 误差累积
+                wait = start + i / self.tokens_per_sec - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            writer.write(event({"content": token}))
+            await writer.drain()
+        writer.write(event({}, response.finish_reason, usage=usage))
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+
+    async def _send_error(
+        self, writer: asyncio.StreamWriter, status: int, message: str, kind: str
+    ) -> None:
+        self.errors += 1
+        error = {"message": message, "type": kind, "code": status}
+        await self._send_json(writer, status, {"error": error})
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--responses", type=Path, help="JSON list of scripted responses")
+    source.add_argument("--cassette", type=Path, help="cassette file to replay")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="0 = unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.cassette:
+        adapter: ModelAdapter = ReplayModel(Cassette(args.cassette))
+    else:
+        responses = None
+        if args.responses:
+            responses = json.loads(args.responses.read_text(encoding="utf-8"))
+        adapter = MockModel(responses=responses)
+    server = StubModelServer(
+        adapter, host=args.host, port=args.port, latency_sec=args.latency,
+        tokens_per_sec=args.tokens_per_sec, error_rate=args.error_rate,
+        error_status=args.error_status, seed=args.seed,
+    )
+    print(f"stub model server listening on http://{args.host}:{args.port}/v1", flush=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
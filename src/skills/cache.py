@@ -0,0 +1,158 @@
+"""进程级技能正文缓存（LRU，按字节 / token 限额）"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# (path, mtime_ns, size, max_lines)
+BodyKey = Tuple[str, int, int, int]
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """缓存的技能正文（不可变，可在多个 run 之间共享）"""
+    body: str
+    token_estimate: int
+    body_hash: str
+    size_bytes: int
+    truncated: bool = False
+
+
+class SkillBodyCache:
+    """技能正文 LRU 缓存
+
+    - 键包含文件 mtime 与大小，文件变化后旧条目自动失效
+    - 同一路径只保留最新版本
+    - 总量受 ``max_bytes`` / ``max_tokens`` 限制，超出时按 LRU 淘汰
+    """
+
+    def __init__(
+        self, max_bytes: Optional[int] = 64 * 1024 * 1024, max_tokens: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            max_bytes: 缓存正文总字节数上限（None 表示不限制）
+            max_tokens: 缓存正文总 token 估算上限（None 表示不限制）
+        """
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self._entries: "OrderedDict[BodyKey, CachedBody]" = OrderedDict()
+        self._path_keys: Dict[str, BodyKey] = {}
+        self._total_bytes = 0
+        self._total_tokens = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: BodyKey) -> Optional[CachedBody]:
+        """查询缓存，命中时将条目移到最近使用端"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: BodyKey, entry: CachedBody) -> CachedBody:
+        """写入缓存
+
+        若同一键已由其他线程写入，返回已有条目，保证调用方共享同一对象。
+        超过单项限额的条目不缓存。
+        """
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            if not self._fits(entry.size_bytes, entry.token_estimate):
+                return entry
+
+            stale = self._path_keys.get(key[0])
+            if stale is not None:
+                self._drop(stale)
+            self._entries[key] = entry
+            self._path_keys[key[0]] = key
+            self._total_bytes += entry.size_bytes
+            self._total_tokens += entry.token_estimate
+            self._evict()
+            return entry
+
+    def invalidate(self, path: str) -> bool:
+        """移除某路径的缓存条目"""
+        with self._lock:
+            key = self._path_keys.get(path)
+            if key is None:
+                return False
+            self._drop(key)
+            return True
+
+    def clear(self) -> None:
+        """清空缓存（不重置统计）"""
+        with self._lock:
+            self._entries.clear()
+            self._path_keys.clear()
+            self._total_bytes = 0
+            self._total_tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "tokens": self._total_tokens,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _fits(self, size_bytes: int, tokens: int) -> bool:
+        if self.max_bytes is not None and size_bytes > self.max_bytes:
+            return False
+        if self.max_tokens is not None and tokens > self.max_tokens:
+            return False
+        return True
+
+    def _over_limit(self) -> bool:
+        if self.max_bytes is not None and self._total_bytes > self.max_bytes:
+            return True
+        if self.max_tokens is not None and self._total_tokens > self.max_tokens:
+            return True
+        return False
+
+    def _evict(self) -> None:
+        while self._entries and self._over_limit():
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def _drop(self, key: BodyKey) -> None:
+        entry = self._entries.pop(key)
+        if self._path_keys.get(key[0]) == key:
+            del self._path_keys[key[0]]
+        self._total_bytes -= entry.size_bytes
+        self._total_tokens -= entry.token_estimate
+
+
+_shared_cache: Optional[SkillBodyCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_body_cache() -> SkillBodyCache:
+    """获取进程级共享的技能正文缓存"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SkillBodyCache()
+        return _shared_cache
@@ -0,0 +1,188 @@
+"""技能依赖解析：按拓扑顺序展开 SkillMetadata.requires 的传递闭包"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Protocol, Set
+
+from src.common.logging_config import get_logger
+from src.skills.loader import SkillLoader
+from src.skills.metadata import LoadedSkill, SkillMetadata
+
+logger = get_logger(__name__)
+
+
+class DependencyError(Exception):
+    """技能依赖解析错误"""
+    pass
+
+
+class MissingDependencyError(DependencyError):
+    """依赖的技能不存在"""
+
+    def __init__(self, skill: str, missing: str) -> None:
+        super().__init__(f"Skill {skill!r} requires unknown skill {missing!r}")
+        self.skill = skill
+        self.missing = missing
+
+
+class DependencyCycleError(DependencyError):
+    """依赖图中存在环"""
+
+    def __init__(self, cycle: List[str]) -> None:
+        super().__init__("Dependency cycle: " + " -> ".join(cycle))
+        self.cycle = cycle
+
+
+class SkillLookup(Protocol):
+    """解析器所需的注册表接口（SkillRegistry 满足该协议）"""
+    version: int
+
+    def find_skill(self, name: str, source: Optional[str] = None) -> Optional[SkillMetadata]:
+        ...
+
+
+class DependencyResolver:
+    """技能依赖解析器
+
+    - 每个被请求技能的闭包只计算一次，按注册表 ``version`` 失效
+    - 深度优先遍历使用显式栈，深依赖链不受递归深度限制
+    - 可选地在后台线程中预取依赖技能正文，预热加载器缓存
+    """
+
+    def __init__(
+        self,
+        registry: SkillLookup,
+        loader: Optional[SkillLoader] = None,
+        prefetch_workers: int = 2,
+    ) -> None:
+        """
+        Args:
+            registry: 技能注册表
+            loader: 用于预取正文的加载器（None 时不预取）
+            prefetch_workers: 预取线程数
+        """
+        self.registry = registry
+        self.loader = loader
+        self.prefetch_workers = prefetch_workers
+        self._memo: Dict[str, List[SkillMetadata]] = {}
+        self._memo_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def resolve(self, name: str) -> List[SkillMetadata]:
+        """
+        解析技能的传递依赖
+
+        Returns:
+            拓扑顺序的技能列表：依赖在前，``name`` 本身在最后
+
+        Raises:
+            MissingDependencyError: 技能或其依赖不存在
+            DependencyCycleError: 依赖成环
+        """
+        with self._lock:
+            self._check_version()
+            return list(self._closure(name))
+
+    def resolve_many(self, names: Iterable[str]) -> List[SkillMetadata]:
+        """解析多个技能的依赖并合并（去重，保持拓扑顺序）"""
+        with self._lock:
+            self._check_version()
+            ordered: List[SkillMetadata] = []
+            emitted: Set[str] = set()
+            for name in names:
+                _merge(ordered, emitted, self._closure(name))
+            return ordered
+
+    def prefetch(self, name: str) -> Optional["Future[List[LoadedSkill]]"]:
+        """在后台预取 ``name`` 所依赖技能的正文（不含其本身）
+
+        解析错误会同步抛出；加载错误只记录日志。未配置加载器或无依赖时返回 None。
+        """
+        if self.loader is None:
+            return None
+        required = self.resolve(name)[:-1]
+        if not required:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers, thread_name_prefix="skill-prefetch"
+                )
+            future = self._pool.submit(self.loader.load_skills, required)
+        future.add_done_callback(_log_prefetch_error)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭预取线程池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def _check_version(self) -> None:
+        version = self.registry.version
+        if version != self._memo_version:
+            self._memo.clear()
+            self._memo_version = version
+
+    def _lookup(self, name: str, parent: str) -> SkillMetadata:
+        metadata = self.registry.find_skill(name)
+        if metadata is None:
+            raise MissingDependencyError(parent, name)
+        return metadata
+
+    def _closure(self, name: str) -> List[SkillMetadata]:
+        """迭代式后序遍历计算 ``name`` 的闭包并记忆
+
+        只记忆被请求的技能；遍历遇到已记忆的闭包时直接拼接，
+        因此单次解析为 O(V + E)。
+        """
+        memo = self._memo
+        cached = memo.get(name)
+        if cached is not None:
+            return cached
+
+        ordered: List[SkillMetadata] = []
+        emitted: Set[str] = set()
+        root = self._lookup(name, name)
+        # 栈帧：(技能, 未访问依赖的迭代器)
+        stack = [(root, iter(root.requires))]
+        on_path = {name: 0}
+        while stack:
+            metadata, pending = stack[-1]
+            for dep in pending:
+                if dep in emitted:
+                    continue
+                if dep in on_path:
+                    path = [frame[0].name for frame in stack[on_path[dep]:]]
+                    raise DependencyCycleError(path + [dep])
+                sub = memo.get(dep)
+                if sub is not None:
+                    _merge(ordered, emitted, sub)
+                    continue
+                child = self._lookup(dep, metadata.name)
+                on_path[dep] = len(stack)
+                stack.append((child, iter(child.requires)))
+                break
+            else:
+                ordered.append(metadata)
+                emitted.add(metadata.name)
+                del on_path[metadata.name]
+                stack.pop()
+
+        memo[name] = ordered
+        return ordered
+
+
+def _merge(ordered: List[SkillMetadata], emitted: Set[str], sub: List[SkillMetadata]) -> None:
+    """将子闭包追加到当前闭包（子闭包自身已是拓扑序，跳过已收录项）"""
+    for metadata in sub:
+        if metadata.name not in emitted:
+            emitted.add(metadata.name)
+            ordered.append(metadata)
+
+
+def _log_prefetch_error(future: "Future[List[LoadedSkill]]") -> None:
+    error = future.exception()
+    if error is not None:
+        logger.warning("Dependency prefetch failed: %s", error)
@@ -0,0 +1,321 @@
+"""YAML 前言解析器（安全子集）"""
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from src.common.security import sanitize_frontmatter
+from src.skills.metadata import SkillMetadata
+
+
+class FrontmatterParseError(Exception):
+    """前言解析错误"""
+    pass
+
+
+_FRONTMATTER_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*(?:\n(.*))?$", re.DOTALL)
+
+REQUIRED_FIELDS = ("name", "description")
+
+# 前言大小上限（字节 / 行）
+MAX_FRONTMATTER_BYTES = 16 * 1024
+MAX_FRONTMATTER_LINES = 200
+
+# 流式读取的缓冲区大小：只需覆盖前言，避免预读大段正文
+_HEAD_READ_BUFFER = 4096
+
+
+@dataclass
+class FrontmatterHead:
+    """流式读取 SKILL.md 头部的结果"""
+    frontmatter: Dict[str, Any]
+    frontmatter_hash: str
+    body_offset: int  # 正文起始字节偏移
+
+
+def split_frontmatter(content: str) -> Tuple[str, str]:
+    """
+    拆分 SKILL.md 的前言与正文
+
+    Args:
+        content: SKILL.md 完整内容
+
+    Returns:
+        (前言原文, 正文内容)
+
+    Raises:
+        FrontmatterParseError: 未找到前言
+    """
+    match = _FRONTMATTER_PATTERN.match(content)
+    if not match:
+        raise FrontmatterParseError("No frontmatter found")
+    return match.group(1), match.group(2) or ""
+
+
+def parse_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
+    """
+    解析 SKILL.md 的 YAML 前言
+
+    Args:
+        content: SKILL.md 完整内容
+
+    Returns:
+        (前言字典, 正文内容)
+
+    Raises:
+        FrontmatterParseError: 解析失败
+    """
+    yaml_text, body = split_frontmatter(content)
+
+    # 安全检查
+    if "<" in yaml_text or ">" in yaml_text:
+        raise FrontmatterParseError("Angle brackets not allowed in frontmatter")
+
+    frontmatter = _parse_simple_yaml(yaml_text)
+
+    for key in REQUIRED_FIELDS:
+        if key not in frontmatter:
+            raise FrontmatterParseError(f"Missing required field: {key}")
+
+    return frontmatter, body
+
+
+def _parse_scalar(value: str) -> Any:
+    """解析标量值（布尔 / 整数 / 字符串）"""
+    if value.lower() == "true":
+        return True
+    if value.lower() == "false":
+        return False
+    if value.isdigit():
+        return int(value)
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+class _SimpleYamlParser:
+    """逐行解析简单 YAML（仅支持标量和列表）"""
+
+    def __init__(self) -> None:
+        self.result: Dict[str, Any] = {}
+        self._current_key: Optional[str] = None
+        self._current_list: List[Any] = []
+
+    def feed(self, line: str) -> None:
+        """解析一行前言"""
+        line = line.rstrip()
+
+        if not line or line.lstrip().startswith("#"):
+            return
+
+        # 列表项
+        stripped = line.lstrip()
+        if stripped.startswith("- ") or stripped == "-":
+            if self._current_key is None:
+                raise FrontmatterParseError(f"List item without key: {line}")
+            self._current_list.append(_parse_scalar(stripped[1:].strip()))
+            return
+
+        if ":" not in line:
+            raise FrontmatterParseError(f"Unsupported frontmatter line: {line}")
+
+        # 保存之前的列表
+        self._flush_list()
+
+        key, value = line.split(":", 1)
+        self._current_key = key.strip()
+        value = value.strip()
+
+        # 值为空，可能是列表开始
+        if not value:
+            return
+
+        if value.startswith("[") and value.endswith("]"):
+            inner = value[1:-1].strip()
+            self.result[self._current_key] = (
+                [_parse_scalar(v.strip()) for v in inner.split(",")] if inner else []
+            )
+        else:
+            self.result[self._current_key] = _parse_scalar(value)
+
+    def close(self) -> Dict[str, Any]:
+        """结束解析并返回结果"""
+        self._flush_list()
+        return self.result
+
+    def _flush_list(self) -> None:
+        if self._current_key and self._current_list:
+            self.result[self._current_key] = self._current_list
+            self._current_list = []
+
+
+def _parse_simple_yaml(yaml_text: str) -> Dict[str, Any]:
+    """
+    解析简单 YAML（仅支持标量和列表）
+    """
+    parser = _SimpleYamlParser()
+    for line in yaml_text.split("\n"):
+        parser.feed(line)
+    return parser.close()
+
+
+def _as_list(value: Any) -> Optional[List[str]]:
+    """将列表或逗号分隔字符串规整为字符串列表"""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def build_metadata(
+    frontmatter: Dict[str, Any],
+    source: str,
+    skill_dir: Path,
+    frontmatter_hash: Optional[str] = None,
+) -> SkillMetadata:
+    """
+    根据前言字典构建 SkillMetadata
+
+    Args:
+        frontmatter: parse_frontmatter 返回的前言字典
+        source: 技能来源（project/user/builtin）
+        skill_dir: 技能目录
+        frontmatter_hash: 前言原文哈希
+
+    Returns:
+        SkillMetadata 实例
+    """
+    name = str(frontmatter["name"])
+    version = frontmatter.get("version")
+    version = str(version) if version is not None else None
+    return SkillMetadata(
+        skill_id=SkillMetadata.generate_skill_id(source, name, version),
+        name=name,
+        description=str(frontmatter["description"]),
+        source=source,
+        path=skill_dir,
+        version=version,
+        author=frontmatter.get("author"),
+        allowed_tools=_as_list(frontmatter.get("allowed-tools")),
+        disable_model_invocation=bool(frontmatter.get("disable-model-invocation", False)),
+        user_invocable=bool(frontmatter.get("user-invocable", True)),
+        requires=_as_list(frontmatter.get("requires")) or [],
+        load_priority=str(frontmatter.get("load-priority", "normal")),
+        cacheable_scripts=_as_list(frontmatter.get("cacheable-scripts")) or [],
+        script_inputs=_as_list(frontmatter.get("script-inputs")) or [],
+        frontmatter_hash=frontmatter_hash,
+        scanned_at=datetime.now().isoformat(),
+    )
+
+
+def read_frontmatter(
+    skill_file: Path,
+    max_bytes: int = MAX_FRONTMATTER_BYTES,
+    max_lines: int = MAX_FRONTMATTER_LINES,
+    strict: bool = True,
+) -> FrontmatterHead:
+    """
+    流式读取 SKILL.md 前言（只读到结束标记 ``---``，不读取正文）
+
+    逐行读取、校验、解析并计算哈希，一次遍历完成。哈希与
+    ``compute_text_hash(split_frontmatter(content)[0])`` 一致。
+
+    Args:
+        skill_file: SKILL.md 路径
+        max_bytes: 前言最大字节数（不含首尾标记行）
+        max_lines: 前言最大行数
+        strict: 严格模式下出现尖括号直接拒绝；宽松模式下逐行净化
+
+    Returns:
+        FrontmatterHead
+
+    Raises:
+        FrontmatterParseError: 前言缺失、未闭合、超限或解析失败
+        OSError: 文件读取失败
+        UnicodeDecodeError: 前言不是合法 UTF-8
+    """
+    with open(skill_file, "rb", buffering=_HEAD_READ_BUFFER) as f:
+        return read_frontmatter_stream(f, max_bytes, max_lines, strict)
+
+
+def read_frontmatter_stream(
+    stream: BinaryIO,
+    max_bytes: int = MAX_FRONTMATTER_BYTES,
+    max_lines: int = MAX_FRONTMATTER_LINES,
+    strict: bool = True,
+) -> FrontmatterHead:
+    """
+    从已打开的二进制流读取前言，语义同 ``read_frontmatter``
+
+    读取完成后流停留在正文起始位置。
+    """
+    sha256 = hashlib.sha256()
+    parser = _SimpleYamlParser()
+    start = stream.tell()
+    if stream.readline(_HEAD_READ_BUFFER).rstrip() != b"---":
+        raise FrontmatterParseError("No frontmatter found")
+
+    consumed = 0
+    lines = 0
+    while True:
+        # 多读一个缓冲区：恰好在上限处结束的前言仍能读到完整的结束分隔行
+        raw = stream.readline(max_bytes - consumed + _HEAD_READ_BUFFER)
+        if not raw:
+            raise FrontmatterParseError("Unterminated frontmatter")
+        if raw.rstrip() == b"---":
+            break
+        consumed += len(raw)
+        lines += 1
+        if consumed > max_bytes:
+            raise FrontmatterParseError(f"Frontmatter exceeds {max_bytes} bytes")
+        if lines > max_lines:
+            raise FrontmatterParseError(f"Frontmatter exceeds {max_lines} lines")
+
+        if raw.endswith(b"\n"):
+            raw = raw[:-1]
+        if lines > 1:
+            sha256.update(b"\n")
+        sha256.update(raw)
+
+        line = raw.decode("utf-8")
+        if "<" in line or ">" in line:
+            if strict:
+                raise FrontmatterParseError("Angle brackets not allowed in frontmatter")
+            line = sanitize_frontmatter(line)
+        parser.feed(line)
+    body_offset = stream.tell() - start
+
+    frontmatter = parser.close()
+    for key in REQUIRED_FIELDS:
+        if key not in frontmatter:
+            raise FrontmatterParseError(f"Missing required field: {key}")
+    return FrontmatterHead(frontmatter, sha256.hexdigest(), body_offset)
+
+
+def load_skill_metadata(
+    skill_file: Path,
+    source: str,
+    max_bytes: int = MAX_FRONTMATTER_BYTES,
+) -> SkillMetadata:
+    """
+    读取 SKILL.md 前言并解析为 SkillMetadata（不读取正文）
+
+    Args:
+        skill_file: SKILL.md 路径
+        source: 技能来源
+        max_bytes: 前言最大字节数
+
+    Returns:
+        SkillMetadata 实例
+
+    Raises:
+        FrontmatterParseError: 前言解析失败
+        OSError: 文件读取失败
+    """
+    head = read_frontmatter(skill_file, max_bytes=max_bytes)
+    return build_metadata(
+        head.frontmatter, source, skill_file.parent, head.frontmatter_hash
+    )
@@ -0,0 +1,313 @@
+"""技能加载器：按需加载 SKILL.md 正文（Level 2）"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.agent.actions import SkillReference
+from src.agent.events import Event, EventStream, EventType
+from src.common.config import Config
+from src.common.hash_utils import compute_text_hash
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+from src.skills.cache import CachedBody, SkillBodyCache, get_shared_body_cache
+from src.skills.frontmatter import (
+    MAX_FRONTMATTER_BYTES,
+    FrontmatterParseError,
+    read_frontmatter_stream,
+)
+from src.skills.metadata import LoadedSkill, SkillMetadata
+from src.skills.registry import SKILL_FILE, SkillRegistry
+from src.skills.sections import SectionIndexCache, get_shared_section_cache
+
+
+class SkillLoadError(Exception):
+    """技能加载错误"""
+    pass
+
+
+class SkillNotFoundError(SkillLoadError):
+    """技能目录不存在或 SKILL.md 缺失"""
+    pass
+
+
+@dataclass
+class ResourceExcerpt:
+    """资源片段（Level 3）及加载报告"""
+    text: str
+    relative_path: str
+    file_sha256: str
+    file_bytes: int
+    bytes_read: int
+    section: Optional[str] = None
+    section_found: bool = False
+    truncated: bool = False
+    available_sections: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_path": self.relative_path,
+            "sha256": self.file_sha256,
+            "file_bytes": self.file_bytes,
+            "bytes_read": self.bytes_read,
+            "chars_returned": len(self.text),
+            "section": self.section,
+            "section_found": self.section_found,
+            "truncated": self.truncated,
+            "available_sections": self.available_sections,
+        }
+
+
+class SkillLoader:
+    """技能加载器
+
+    正文按 (路径, mtime, 大小, 行数上限) 缓存在进程级 ``SkillBodyCache`` 中，
+    多个 run 选择同一技能时共享同一个不可变正文字符串。
+    """
+
+    def __init__(
+        self,
+        max_body_lines: int = 500,
+        cache: Optional[SkillBodyCache] = None,
+        max_excerpt_chars: int = 12000,
+        section_cache: Optional[SectionIndexCache] = None,
+        max_workers: int = 8,
+        max_frontmatter_bytes: int = MAX_FRONTMATTER_BYTES,
+    ) -> None:
+        """
+        Args:
+            max_body_lines: 正文最大行数，超出部分裁剪
+            cache: 正文缓存，默认使用进程级共享缓存
+            max_excerpt_chars: 资源片段最大字符数
+            section_cache: 资源章节索引缓存，默认使用进程级共享缓存
+            max_workers: 并发加载多个技能时的线程数上限
+            max_frontmatter_bytes: SKILL.md 前言的最大字节数
+        """
+        self.max_body_lines = max_body_lines
+        self.max_workers = max(1, max_workers)
+        self.max_frontmatter_bytes = max_frontmatter_bytes
+        self.cache = cache if cache is not None else get_shared_body_cache()
+        self.max_excerpt_chars = max_excerpt_chars
+        self.section_cache = (
+            section_cache if section_cache is not None else get_shared_section_cache()
+        )
+
+    @classmethod
+    def from_config(cls, config: Config, cache: Optional[SkillBodyCache] = None) -> "SkillLoader":
+        """根据配置创建加载器"""
+        return cls(
+            max_body_lines=config.get("security.max_skill_body_lines", 500),
+            cache=cache,
+            max_excerpt_chars=config.get("security.max_resource_excerpt_chars", 12000),
+            max_workers=config.get("execution.max_parallel_loads", 8),
+            max_frontmatter_bytes=config.get(
+                "security.max_frontmatter_bytes", MAX_FRONTMATTER_BYTES
+            ),
+        )
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """估算 token 数（粗略：字符数/4）"""
+        return len(text) // 4
+
+    def load_body(self, skill_path: Path) -> Tuple[str, int]:
+        """加载技能正文，返回 (正文, token估算)"""
+        cached = self._load_cached(skill_path)
+        return cached.body, cached.token_estimate
+
+    def load_skill(self, metadata: SkillMetadata, turn: int = 0) -> LoadedSkill:
+        """加载技能正文并构建 LoadedSkill
+
+        Args:
+            metadata: 技能元数据
+            turn: 加载发生的轮次
+        """
+        cached = self._load_cached(metadata.path)
+        return LoadedSkill(
+            metadata=metadata,
+            body=cached.body,
+            loaded_at_turn=turn,
+            token_estimate=cached.token_estimate,
+            body_hash=cached.body_hash,
+        )
+
+    def load_skills(
+        self,
+        skills: Sequence[SkillMetadata],
+        turn: int = 0,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+    ) -> List[LoadedSkill]:
+        """并发加载多个技能正文
+
+        读取、裁剪、哈希与 token 估算在有界线程池中并行执行；结果顺序与
+        输入顺序一致，``SKILL_LOADED`` 事件也按输入顺序逐个发出。
+        任一技能加载失败时，等待其余任务结束后抛出输入顺序中的第一个错误。
+
+        Args:
+            skills: 待加载技能元数据
+            turn: 加载发生的轮次
+            event_stream: 可选事件流
+            run_id: 事件中的 run ID
+        """
+        workers = min(self.max_workers, len(skills))
+        if workers <= 1:
+            results = [self._try_load(metadata, turn) for metadata in skills]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="skill-loader") as pool:
+                results = list(pool.map(lambda m: self._try_load(m, turn), skills))
+
+        loaded: List[LoadedSkill] = []
+        for result in results:
+            if isinstance(result, SkillLoadError):
+                raise result
+            loaded.append(result)
+            if event_stream is not None:
+                event_stream.emit(Event(
+                    type=EventType.SKILL_LOADED,
+                    run_id=run_id,
+                    turn=turn,
+                    data={
+                        "skill_id": result.metadata.skill_id,
+                        "name": result.metadata.name,
+                        "source": result.metadata.source,
+                        "token_estimate": result.token_estimate,
+                        "body_hash": result.body_hash,
+                    },
+                ))
+        return loaded
+
+    def load_selection(
+        self,
+        references: Sequence[SkillReference],
+        registry: SkillRegistry,
+        turn: int = 0,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+    ) -> List[LoadedSkill]:
+        """解析 ``SelectSkillsAction`` 中的技能引用并并发加载
+
+        Raises:
+            SkillNotFoundError: 注册表中不存在被引用的技能
+        """
+        skills: List[SkillMetadata] = []
+        for ref in references:
+            metadata = registry.find_skill(ref.name, ref.source)
+            if metadata is None:
+                raise SkillNotFoundError(f"Skill not found: {ref.name}")
+            skills.append(metadata)
+        return self.load_skills(skills, turn, event_stream, run_id)
+
+    def _try_load(self, metadata: SkillMetadata, turn: int) -> Any:
+        """在工作线程中加载，错误作为返回值带回调用线程"""
+        try:
+            return self.load_skill(metadata, turn)
+        except SkillLoadError as e:
+            return e
+
+    def _load_cached(self, skill_path: Path) -> CachedBody:
+        """读取（或命中缓存）技能正文"""
+        skill_file = skill_path / SKILL_FILE
+        try:
+            f = open(skill_file, "rb")
+        except FileNotFoundError as e:
+            raise SkillNotFoundError(f"SKILL.md not found in {skill_path}") from e
+        except OSError as e:
+            raise SkillLoadError(f"Cannot read {skill_file}: {e}") from e
+
+        with f:
+            st = os.fstat(f.fileno())
+            key = (str(skill_file), st.st_mtime_ns, st.st_size, self.max_body_lines)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            try:
+                read_frontmatter_stream(f, self.max_frontmatter_bytes)
+            except (FrontmatterParseError, UnicodeDecodeError) as e:
+                raise SkillLoadError(f"Invalid frontmatter in {skill_file}: {e}") from e
+            data = f.read()
+
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise SkillLoadError(f"SKILL.md body is not valid UTF-8: {skill_file}") from e
+        body, truncated = self._truncate(text)
+        entry = CachedBody(
+            body=body,
+            token_estimate=self.estimate_tokens(body),
+            body_hash=compute_text_hash(body),
+            size_bytes=len(body.encode("utf-8")) if truncated else len(data),
+            truncated=truncated,
+        )
+        return self.cache.put(key, entry)
+
+    def _truncate(self, text: str) -> Tuple[str, bool]:
+        """按行数上限裁剪正文"""
+        lines = text.splitlines(keepends=True)
+        if len(lines) <= self.max_body_lines:
+            return text, False
+        return "".join(lines[:self.max_body_lines]), True
+
+    def load_resource(
+        self,
+        skill_path: Path,
+        relative_path: str,
+        section_hint: Optional[str] = None,
+        max_chars: Optional[int] = None,
+    ) -> ResourceExcerpt:
+        """
+        加载资源文件片段
+
+        通过章节索引定位 ``section_hint`` 对应的字节区间，只 seek 读取该区间；
+        未提供或未命中章节时退化为文件开头片段。读取量始终受
+        ``max_chars`` 限制（按 UTF-8 最多 4 字节/字符估算读取字节数）。
+
+        Args:
+            skill_path: 技能目录
+            relative_path: 资源相对路径
+            section_hint: 可选章节提示（例如 ``"## 指标定义"``）
+            max_chars: 最大返回字符数，默认使用 ``max_excerpt_chars``
+
+        Raises:
+            PathTraversalError: 路径越界
+            SkillLoadError: 资源不存在或读取失败
+        """
+        if not validate_relative_path(relative_path):
+            raise PathTraversalError(f"Invalid relative path: {relative_path}")
+        resource = validate_path_in_root(skill_path / relative_path, skill_path)
+        if not resource.is_file():
+            raise SkillLoadError(f"Resource not found: {relative_path}")
+
+        limit = max_chars if max_chars is not None else self.max_excerpt_chars
+        try:
+            index = self.section_cache.get_index(resource)
+        except OSError as e:
+            raise SkillLoadError(f"Cannot read {relative_path}: {e}") from e
+
+        section = index.find(section_hint) if section_hint else None
+        start, end = (section.start, section.end) if section else (0, index.size)
+        to_read = min(end - start, limit * 4)
+        try:
+            with open(resource, "rb") as f:
+                f.seek(start)
+                data = f.read(to_read)
+        except OSError as e:
+            raise SkillLoadError(f"Cannot read {relative_path}: {e}") from e
+
+        text = data.decode("utf-8", errors="replace")
+        truncated = to_read < end - start
+        if len(text) > limit:
+            text = text[:limit]
+            truncated = True
+        return ResourceExcerpt(
+            text=text,
+            relative_path=relative_path,
+            file_sha256=index.sha256,
+            file_bytes=index.size,
+            bytes_read=len(data),
+            section=section.title if section else None,
+            section_found=section is not None,
+            truncated=truncated,
+            available_sections=index.titles() if section_hint and section is None else [],
+        )
@@ -47,6 +47,8 @@ class SkillMetadata:
     requires: List[str] = field(default_factory=list)
     load_priority: str = "normal"  # high/normal/low
     resource_limits: ResourceLimits = field(default_factory=ResourceLimits)
+    cacheable_scripts: List[str] = field(default_factory=list)  # 结果可缓存的脚本相对路径
+    script_inputs: List[str] = field(default_factory=list)  # 可缓存脚本的输入文件相对路径
 
     # 元信息
     frontmatter_hash: Optional[str] = None
@@ -67,6 +69,11 @@ class SkillMetadata:
         priority_map = {"high": 0, "normal": 1, "low": 2}
         return priority_map.get(self.load_priority, 1)
 
+    def is_cacheable_script(self, relative_path: str) -> bool:
+        """脚本是否在前言中声明为结果可缓存"""
+        target = Path(relative_path).as_posix()
+        return any(Path(p).as_posix() == target for p in self.cacheable_scripts)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "skill_id": self.skill_id,
@@ -82,6 +89,8 @@ class SkillMetadata:
             "requires": self.requires,
             "load_priority": self.load_priority,
             "resource_limits": self.resource_limits.to_dict(),
+            "cacheable_scripts": self.cacheable_scripts,
+            "script_inputs": self.script_inputs,
             "frontmatter_hash": self.frontmatter_hash,
             "scanned_at": self.scanned_at,
         }
@@ -102,6 +111,8 @@ class SkillMetadata:
             requires=data.get("requires", []),
             load_priority=data.get("load_priority", "normal"),
             resource_limits=ResourceLimits.from_dict(data.get("resource_limits", {})),
+            cacheable_scripts=data.get("cacheable_scripts", []),
+            script_inputs=data.get("script_inputs", []),
             frontmatter_hash=data.get("frontmatter_hash"),
             scanned_at=data.get("scanned_at"),
         )
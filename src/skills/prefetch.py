@@ -0,0 +1,285 @@
+"""推测式预取：在模型生成期间预热可能用到的技能正文与资源"""
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.agent.events import EventStream, EventType
+from src.agent.state import RunState
+from src.common.logging_config import get_logger
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+from src.skills.loader import SkillLoadError, SkillLoader
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import SKILL_FILE, SkillRegistry
+from src.skills.search import SkillSearchIndex
+
+logger = get_logger(__name__)
+
+
+class CooccurrenceStats:
+    """历史 run 中技能共同加载与资源加载的统计"""
+
+    def __init__(self) -> None:
+        self._pairs: Dict[str, Counter] = defaultdict(Counter)
+        self._resources: Dict[str, Counter] = defaultdict(Counter)
+        self.runs = 0
+
+    def add_run(self, skills: Iterable[str], resources: Iterable[Tuple[str, str]] = ()) -> None:
+        """记录一次 run 加载过的技能与 (技能, 资源相对路径)"""
+        names = sorted(set(skills))
+        for name in names:
+            for other in names:
+                if other != name:
+                    self._pairs[name][other] += 1
+        for skill, relative_path in resources:
+            self._resources[skill][relative_path] += 1
+        self.runs += 1
+
+    @classmethod
+    def from_run_logs(cls, paths: Iterable[Path]) -> "CooccurrenceStats":
+        """从 run 事件日志（JSONL）构建统计
+
+        使用 ``SKILL_LOADED`` 的 ``name`` 与 ``RESOURCE_LOADED`` 的
+        ``skill``/``relative_path`` 字段，按 run_id 分组。
+        """
+        stats = cls()
+        for path in paths:
+            skills: Dict[str, Set[str]] = defaultdict(set)
+            resources: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+            for event in EventStream.replay(path):
+                data = event.data
+                if event.type == EventType.SKILL_LOADED and data.get("name"):
+                    skills[event.run_id].add(data["name"])
+                elif (event.type == EventType.RESOURCE_LOADED
+                        and data.get("skill") and data.get("relative_path")):
+                    resources[event.run_id].add((data["skill"], data["relative_path"]))
+            for run_id in skills.keys() | resources.keys():
+                stats.add_run(skills.get(run_id, ()), resources.get(run_id, ()))
+        return stats
+
+    def related(self, names: Iterable[str], k: int = 3) -> List[str]:
+        """与给定技能最常共同出现的技能（不含给定技能本身）"""
+        names = set(names)
+        total: Counter = Counter()
+        for name in names:
+            total.update(self._pairs.get(name, {}))
+        ranked = sorted(
+            (item for item in total.items() if item[0] not in names),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return [name for name, _ in ranked[:k]]
+
+    def resources(self, name: str, k: int = 2) -> List[str]:
+        """技能最常加载的资源相对路径"""
+        ranked = sorted(self._resources.get(name, {}).items(), key=lambda item: (-item[1], item[0]))
+        return [path for path, _ in ranked[:k]]
+
+
+class PrefetchTask:
+    """一次预取任务（可取消）"""
+
+    def __init__(self) -> None:
+        self._cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """取消预取：尚未开始则直接取消，进行中则在下一个条目前停止"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """等待任务结束（取消的任务立即返回）"""
+        if self.future is not None and not self.future.cancelled():
+            self.future.result(timeout=timeout)
+
+
+class SkillPrefetcher:
+    """推测式预取器
+
+    候选来源（按顺序去重）：
+    1. 计划步骤标题的检索结果（每个标题取前 ``top_k`` 个）
+    2. 与已选技能历史共现最多的技能
+
+    对每个候选预热正文缓存，并预读其历史常用资源（构建章节索引、
+    预热页缓存）。总读取量受 ``max_bytes`` 限制；新的预取会取消上一个。
+    命中率通过 ``record_skill_use`` / ``record_resource_use`` 统计。
+    """
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        loader: SkillLoader,
+        search_index: Optional[SkillSearchIndex] = None,
+        cooccurrence: Optional[CooccurrenceStats] = None,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_skills: int = 6,
+        top_k: int = 3,
+        max_resources_per_skill: int = 2,
+    ) -> None:
+        """
+        Args:
+            registry: 技能注册表
+            loader: 技能加载器（预热其正文缓存与章节索引缓存）
+            search_index: 技能检索索引（None 时不按步骤标题预取）
+            cooccurrence: 历史共现统计（None 时不按共现预取）
+            max_bytes: 单次预取读取的最大字节数
+            max_skills: 单次预取的最大技能数
+            top_k: 每个步骤标题取的检索结果数
+            max_resources_per_skill: 每个技能预读的资源数
+        """
+        self.registry = registry
+        self.loader = loader
+        self.search_index = search_index
+        self.cooccurrence = cooccurrence or CooccurrenceStats()
+        self.max_bytes = max_bytes
+        self.max_skills = max_skills
+        self.top_k = top_k
+        self.max_resources_per_skill = max_resources_per_skill
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="skill-prefetch")
+        self._current: Optional[PrefetchTask] = None
+        self._prefetched: Set[Tuple[str, ...]] = set()
+        self._lock = threading.Lock()
+        self._stats = {"prefetched": 0, "bytes": 0, "hits": 0, "misses": 0, "cancelled": 0}
+
+    def candidates(
+        self, step_titles: Sequence[str], selected: Sequence[str] = ()
+    ) -> List[SkillMetadata]:
+        """计算预取候选（不含已选技能）"""
+        chosen: Dict[str, SkillMetadata] = {}
+        skip = set(selected)
+
+        def add(metadata: Optional[SkillMetadata]) -> None:
+            if (metadata is not None and metadata.name not in skip
+                    and metadata.name not in chosen and len(chosen) < self.max_skills):
+                chosen[metadata.name] = metadata
+
+        if self.search_index is not None:
+            for title in step_titles:
+                for metadata, _ in self.search_index.search(title, k=self.top_k):
+                    add(self.registry.find_skill(metadata.name))
+        for name in self.cooccurrence.related(selected, k=self.max_skills):
+            add(self.registry.find_skill(name))
+        return list(chosen.values())
+
+    def start(self, step_titles: Sequence[str], selected: Sequence[str] = ()) -> PrefetchTask:
+        """在后台开始预取（取消尚未完成的上一次预取）"""
+        targets = self.candidates(step_titles, selected)
+        resources = {
+            m.name: self.cooccurrence.resources(m.name, self.max_resources_per_skill)
+            for m in targets
+        }
+        # 已选技能的常用资源同样值得预读
+        for name in selected:
+            metadata = self.registry.find_skill(name)
+            if metadata is not None:
+                targets.append(metadata)
+                resources[name] = self.cooccurrence.resources(name, self.max_resources_per_skill)
+
+        task = PrefetchTask()
+        with self._lock:
+            if self._current is not None and not self._current.future.done():
+                self._current.cancel()
+                self._stats["cancelled"] += 1
+            self._current = task
+            task.future = self._pool.submit(self._run, task, targets, set(selected), resources)
+        return task
+
+    def cancel(self) -> None:
+        """取消当前预取"""
+        with self._lock:
+            if self._current is not None and not self._current.future.done():
+                self._current.cancel()
+                self._stats["cancelled"] += 1
+
+    def record_skill_use(self, name: str) -> bool:
+        """记录技能正文被实际加载，返回是否命中预取"""
+        return self._record(("skill", name))
+
+    def record_resource_use(self, skill: str, relative_path: str) -> bool:
+        """记录资源被实际加载，返回是否命中预取"""
+        return self._record(("resource", skill, relative_path))
+
+    def stats(self) -> Dict[str, Any]:
+        """预取统计（命中率 = 命中 / 实际加载次数）"""
+        with self._lock:
+            stats = dict(self._stats)
+        uses = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / uses, 4) if uses else 0.0
+        return stats
+
+    def report(self, state: RunState) -> None:
+        """将预取统计写入 run 指标"""
+        state.update_metrics("prefetch", self.stats())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """取消当前预取并关闭线程池"""
+        self.cancel()
+        self._pool.shutdown(wait=wait)
+
+    def _record(self, key: Tuple[str, ...]) -> bool:
+        with self._lock:
+            hit = key in self._prefetched
+            if hit:
+                self._prefetched.discard(key)
+            self._stats["hits" if hit else "misses"] += 1
+            return hit
+
+    def _prefetch(self, key: Tuple[str, ...], size: int, used: int, load: Callable[[], Any]) -> int:
+        """在字节预算内执行 ``load``，成功后才登记为已预取
+
+        Returns:
+            本次占用的字节数（超出预算时为 0）；``load`` 抛出的异常原样传出，
+            不计入预算与统计
+        """
+        if used + size > self.max_bytes:
+            return 0
+        load()
+        with self._lock:
+            self._prefetched.add(key)
+            self._stats["prefetched"] += 1
+            self._stats["bytes"] += size
+        return size
+
+    def _run(
+        self,
+        task: PrefetchTask,
+        targets: List[SkillMetadata],
+        selected: Set[str],
+        resources: Dict[str, List[str]],
+    ) -> None:
+        used = 0
+        for metadata in targets:
+            if task.cancelled:
+                return
+            if metadata.name not in selected:
+                try:
+                    size = os.stat(metadata.path / SKILL_FILE).st_size
+                    used += self._prefetch(
+                        ("skill", metadata.name), size, used,
+                        lambda: self.loader.load_body(metadata.path),
+                    )
+                except (SkillLoadError, OSError) as e:
+                    logger.debug("Prefetch of %s failed: %s", metadata.name, e)
+            for relative_path in resources.get(metadata.name, ()):
+                if task.cancelled:
+                    return
+                try:
+                    if not validate_relative_path(relative_path):
+                        raise PathTraversalError(f"Invalid relative path: {relative_path}")
+                    resource = validate_path_in_root(metadata.path / relative_path, metadata.path)
+                    size = os.stat(resource).st_size
+                    used += self._prefetch(
+                        ("resource", metadata.name, relative_path), size, used,
+                        lambda: self.loader.load_resource(
+                            metadata.path, relative_path, max_chars=0
+                        ),
+                    )
+                except (SkillLoadError, PathTraversalError, OSError) as e:
+                    logger.debug("Prefetch of %s/%s failed: %s", metadata.name, relative_path, e)
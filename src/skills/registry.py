@@ -0,0 +1,501 @@
+"""技能注册表：多根目录扫描、冲突解决与增量刷新"""
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.common.ignore import is_ignored
+from src.common.logging_config import get_logger
+from src.skills.frontmatter import (
+    MAX_FRONTMATTER_BYTES,
+    FrontmatterParseError,
+    load_skill_metadata,
+)
+from src.skills.metadata import SkillMetadata
+
+logger = get_logger(__name__)
+
+SKILL_FILE = "SKILL.md"
+
+# (mtime_ns, size, inode)
+Fingerprint = Tuple[int, int, int]
+
+
+@dataclass
+class SkillRoot:
+    """技能根目录"""
+    source: str
+    path: Path
+    priority: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SkillRoot":
+        return cls(
+            source=data["source"],
+            path=Path(data["path"]).expanduser(),
+            priority=data.get("priority", 0),
+        )
+
+
+@dataclass
+class SkillChanges:
+    """一次增量刷新得到的索引差异
+
+    ``added``/``removed``/``modified`` 为技能条目（含被覆盖的同名条目）的变化，
+    ``previous`` 与 ``modified`` 一一对应、为修改前的元数据；``resolved`` 为
+    受影响名称重新决议后的胜出条目（名称已无条目时为 None）。
+    """
+    added: List[SkillMetadata] = field(default_factory=list)
+    removed: List[SkillMetadata] = field(default_factory=list)
+    modified: List[SkillMetadata] = field(default_factory=list)
+    previous: List[SkillMetadata] = field(default_factory=list)
+    resolved: Dict[str, Optional[SkillMetadata]] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": [m.skill_id for m in self.added],
+            "removed": [m.skill_id for m in self.removed],
+            "modified": [m.skill_id for m in self.modified],
+        }
+
+
+@dataclass(frozen=True)
+class IndexFragment:
+    """渲染好的 Level 1 技能索引片段（注入模型上下文）"""
+    text: str
+    token_estimate: int
+    version: int
+    skill_count: int
+
+
+# (version, source, user_invocable, disable_model_invocation)
+_FragmentKey = Tuple[int, Optional[str], Optional[bool], Optional[bool]]
+
+INDEX_HEADER = "Available Skills:"
+
+
+@dataclass
+class ConflictResolution:
+    """同名冲突决议结果"""
+    winners: Dict[str, SkillMetadata] = field(default_factory=dict)
+    shadowed: List[Dict[str, Any]] = field(default_factory=list)
+
+
+# 排名各字段对应的覆盖原因
+_RANK_REASONS = ("root_priority", "load_priority", "version", "path")
+
+
+@lru_cache(maxsize=4096)
+def version_rank(version: Optional[str]) -> Tuple[Any, ...]:
+    """版本号排名键：数值越小版本越新
+
+    按 ``.``/``-``/``+`` 切分。开头的数字段为发布号，比较时忽略末尾的 0
+    （``1.0`` 与 ``1.0.0`` 等价，``1.0.1`` 更新）；其后的段为预发布标记，
+    正式版优于同发布号的预发布版（``1.0.0`` 优于 ``1.0.0-rc1``）；无版本排在最后。
+    """
+    if not version:
+        return (1,)
+    parts = re.split(r"[.\-+]", version.lstrip("vV"))
+    split = next((i for i, part in enumerate(parts) if not part.isdigit()), len(parts))
+    release = [int(part) for part in parts[:split]]
+    while release and release[-1] == 0:
+        release.pop()
+    # 数字倒序；结尾的 1 大于任何倒序后的段，使较短（更旧）的发布号排在后面
+    release_key = tuple(-n for n in release) + (1,)
+    pre = parts[split:]
+    pre_key = (1, tuple((0, -int(p)) if p.isdigit() else (1, p) for p in pre)) if pre else (0,)
+    return (0, release_key, pre_key)
+
+
+def candidate_rank(metadata: SkillMetadata, root_priority: int) -> Tuple[Any, ...]:
+    """候选排名键（越小越优）：根目录优先级 → load-priority → 版本 → 路径"""
+    return (
+        root_priority,
+        metadata.get_priority_score(),
+        version_rank(metadata.version),
+        str(metadata.path),
+    )
+
+
+def resolve_conflicts(candidates: Iterable[Tuple[SkillMetadata, int]]) -> ConflictResolution:
+    """
+    单次遍历解决同名冲突
+
+    用 名称 → 当前最优候选 的哈希表逐个比较，整体 O(n)；排名键只在
+    名称冲突时计算，只有被覆盖的条目需要排序以生成稳定的报告。
+
+    Args:
+        candidates: (技能元数据, 所在根目录优先级) 序列
+
+    Returns:
+        胜出技能与被覆盖技能报告（含覆盖原因）
+    """
+    best: Dict[str, Tuple[SkillMetadata, int]] = {}
+    # 只有出现冲突的名称才计算排名键
+    best_rank: Dict[str, Tuple[Any, ...]] = {}
+    losers: List[Tuple[Tuple[Any, ...], SkillMetadata]] = []
+    for candidate in candidates:
+        name = candidate[0].name
+        current = best.setdefault(name, candidate)
+        if current is candidate:
+            continue
+        rank = candidate_rank(*candidate)
+        current_rank = best_rank.get(name)
+        if current_rank is None:
+            current_rank = best_rank[name] = candidate_rank(*current)
+        if rank < current_rank:
+            losers.append((current_rank, current[0]))
+            best[name] = candidate
+            best_rank[name] = rank
+        else:
+            losers.append((rank, candidate[0]))
+
+    losers.sort(key=lambda item: (item[1].name, item[0]))
+    shadowed = []
+    for rank, metadata in losers:
+        winner = best[metadata.name][0]
+        winner_rank = best_rank[metadata.name]
+        reason = next(
+            (r for r, a, b in zip(_RANK_REASONS, winner_rank, rank) if a != b), "path"
+        )
+        shadowed.append({
+            "name": metadata.name,
+            "winner": winner.skill_id,
+            "shadowed": metadata.skill_id,
+            "shadowed_path": str(metadata.path),
+            "reason": reason,
+        })
+    return ConflictResolution(
+        winners={name: metadata for name, (metadata, _) in best.items()},
+        shadowed=shadowed,
+    )
+
+
+def stat_fingerprint(path: Path) -> Optional[Fingerprint]:
+    """获取文件的 stat 指纹，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class SkillRegistry:
+    """技能注册表
+
+    维护两层数据：
+    - entries：每个技能目录解析得到的元数据（含被覆盖的同名技能）
+    - skills：按名称冲突解决后的最终索引
+
+    每次索引内容变化时 ``version`` 自增，供下游缓存失效使用。
+    """
+
+    def __init__(
+        self,
+        skill_roots: List[Dict[str, Any]],
+        max_frontmatter_bytes: int = MAX_FRONTMATTER_BYTES,
+    ) -> None:
+        """
+        Args:
+            skill_roots: 技能根目录配置列表（source/path/priority），
+                         priority 数值越小优先级越高
+            max_frontmatter_bytes: 单个 SKILL.md 前言的最大字节数
+        """
+        self.max_frontmatter_bytes = max_frontmatter_bytes
+        self.roots = sorted(
+            (SkillRoot.from_dict(r) for r in skill_roots), key=lambda r: r.priority
+        )
+        self.version = 0
+        self._entries: Dict[Path, SkillMetadata] = {}
+        self._entry_roots: Dict[Path, SkillRoot] = {}
+        # 名称 → {技能目录: 元数据}，用于增量决议时 O(同名数) 取候选
+        self._by_name: Dict[str, Dict[Path, SkillMetadata]] = {}
+        self._shadowed: Dict[str, List[Dict[str, Any]]] = {}
+        self._fingerprints: Dict[Path, Fingerprint] = {}
+        self._skills: Dict[str, SkillMetadata] = {}
+        self._report: Dict[str, Any] = {}
+        self._fragments: Dict[_FragmentKey, IndexFragment] = {}
+        # 监视线程与查询方可能并发访问
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 扫描
+    # ------------------------------------------------------------------
+
+    def scan_all(self) -> List[SkillMetadata]:
+        """全量扫描所有技能根目录"""
+        with self._lock:
+            return self._scan_all()
+
+    def _scan_all(self) -> List[SkillMetadata]:
+        start = time.perf_counter()
+        ignored: List[Dict[str, str]] = []
+
+        self._entries.clear()
+        self._entry_roots.clear()
+        self._by_name.clear()
+        self._fingerprints.clear()
+
+        for root, skill_dir, fingerprint in self._iter_skill_dirs():
+            self._fingerprints[skill_dir] = fingerprint
+            metadata = self._load_entry(skill_dir, root, ignored)
+            if metadata is not None:
+                self._add_entry(skill_dir, metadata, root)
+
+        conflicts = self._resolve_all()
+        self.version += 1
+        self._report = {
+            "roots": [str(r.path) for r in self.roots],
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            "discovered": len(self._fingerprints),
+            "valid": len(self._entries),
+            "ignored": ignored,
+            "conflicts": conflicts,
+            "version": self.version,
+        }
+        return self.list_skills()
+
+    def refresh(self) -> List[SkillMetadata]:
+        """刷新技能索引（全量重扫）"""
+        return self.scan_all()
+
+    def refresh_changes(self) -> SkillChanges:
+        """增量刷新：基于 SKILL.md 的 stat 指纹检测新增/删除/修改
+
+        只对指纹发生变化的技能目录重新解析前言，并只对受影响的名称重新做
+        冲突解决。
+
+        Returns:
+            本次刷新检测到的变化
+        """
+        with self._lock:
+            return self._refresh_changes()
+
+    def _refresh_changes(self) -> SkillChanges:
+        current: Dict[Path, Fingerprint] = {}
+        current_roots: Dict[Path, SkillRoot] = {}
+        for root, skill_dir, fingerprint in self._iter_skill_dirs():
+            current[skill_dir] = fingerprint
+            current_roots[skill_dir] = root
+
+        changes = SkillChanges()
+        ignored: List[Dict[str, str]] = []
+        touched_names = set()
+
+        for skill_dir in self._fingerprints.keys() - current.keys():
+            del self._fingerprints[skill_dir]
+            old = self._drop_entry(skill_dir)
+            if old is not None:
+                changes.removed.append(old)
+                touched_names.add(old.name)
+
+        for skill_dir, fingerprint in current.items():
+            previous = self._fingerprints.get(skill_dir)
+            if previous == fingerprint:
+                continue
+            self._fingerprints[skill_dir] = fingerprint
+            old = self._drop_entry(skill_dir)
+            root = current_roots[skill_dir]
+            metadata = self._load_entry(skill_dir, root, ignored)
+            if old is not None:
+                touched_names.add(old.name)
+            if metadata is not None:
+                self._add_entry(skill_dir, metadata, root)
+                touched_names.add(metadata.name)
+                if old is None:
+                    changes.added.append(metadata)
+                else:
+                    changes.modified.append(metadata)
+                    changes.previous.append(old)
+            elif old is not None:
+                changes.removed.append(old)
+
+        if not changes.is_empty():
+            for name in touched_names:
+                self._resolve_name(name)
+                changes.resolved[name] = self._skills.get(name)
+            self.version += 1
+            self._report["version"] = self.version
+            self._report["valid"] = len(self._entries)
+            self._report["discovered"] = len(self._fingerprints)
+            self._report.setdefault("ignored", []).extend(ignored)
+        return changes
+
+    def _iter_skill_dirs(self) -> Iterator[Tuple[SkillRoot, Path, Fingerprint]]:
+        """遍历所有根目录下包含 SKILL.md 的技能目录，产出 (root, dir, 指纹)"""
+        for root in self.roots:
+            try:
+                it = os.scandir(root.path)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if is_ignored(entry.name) or not entry.is_dir():
+                        continue
+                    skill_dir = Path(entry.path)
+                    fingerprint = stat_fingerprint(skill_dir / SKILL_FILE)
+                    if fingerprint is not None:
+                        yield root, skill_dir, fingerprint
+
+    def _load_entry(
+        self, skill_dir: Path, root: SkillRoot, ignored: List[Dict[str, str]]
+    ) -> Optional[SkillMetadata]:
+        """解析单个技能目录，失败时记录忽略原因"""
+        try:
+            return load_skill_metadata(
+                skill_dir / SKILL_FILE, root.source, self.max_frontmatter_bytes
+            )
+        except (FrontmatterParseError, OSError, UnicodeDecodeError) as e:
+            logger.warning("Skip skill %s: %s", skill_dir, e)
+            ignored.append({"path": str(skill_dir), "reason": str(e)})
+            return None
+
+    # ------------------------------------------------------------------
+    # 冲突解决
+    # ------------------------------------------------------------------
+
+    def _add_entry(self, skill_dir: Path, metadata: SkillMetadata, root: SkillRoot) -> None:
+        self._entries[skill_dir] = metadata
+        self._entry_roots[skill_dir] = root
+        self._by_name.setdefault(metadata.name, {})[skill_dir] = metadata
+
+    def _drop_entry(self, skill_dir: Path) -> Optional[SkillMetadata]:
+        old = self._entries.pop(skill_dir, None)
+        self._entry_roots.pop(skill_dir, None)
+        if old is not None:
+            bucket = self._by_name[old.name]
+            del bucket[skill_dir]
+            if not bucket:
+                del self._by_name[old.name]
+        return old
+
+    def _ranked_entries(
+        self, entries: Iterable[SkillMetadata]
+    ) -> Iterator[Tuple[SkillMetadata, int]]:
+        for metadata in entries:
+            yield metadata, self._entry_roots[metadata.path].priority
+
+    def _candidates(self, name: str) -> List[SkillMetadata]:
+        """返回同名候选，按决议顺序排列"""
+        return [
+            m for m, _ in sorted(
+                self._ranked_entries(self._by_name.get(name, {}).values()),
+                key=lambda item: candidate_rank(*item),
+            )
+        ]
+
+    def _resolve_name(self, name: str) -> None:
+        """重新决议单个名称的胜出条目"""
+        resolution = resolve_conflicts(
+            self._ranked_entries(self._by_name.get(name, {}).values())
+        )
+        winner = resolution.winners.get(name)
+        if winner is not None:
+            self._skills[name] = winner
+        else:
+            self._skills.pop(name, None)
+        if resolution.shadowed:
+            self._shadowed[name] = resolution.shadowed
+        else:
+            self._shadowed.pop(name, None)
+
+    def _resolve_all(self) -> List[Dict[str, Any]]:
+        """全量冲突解决，返回被覆盖技能报告"""
+        resolution = resolve_conflicts(self._ranked_entries(self._entries.values()))
+        self._skills = resolution.winners
+        self._shadowed = {}
+        for item in resolution.shadowed:
+            self._shadowed.setdefault(item["name"], []).append(item)
+        return resolution.shadowed
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def list_skills(self) -> List[SkillMetadata]:
+        """返回冲突解决后的技能索引（按名称排序）"""
+        with self._lock:
+            return [self._skills[name] for name in sorted(self._skills)]
+
+    def find_skill(
+        self, name: str, source: Optional[str] = None
+    ) -> Optional[SkillMetadata]:
+        """查找技能
+
+        Args:
+            name: 技能名称
+            source: 可选来源过滤；指定时可命中被覆盖的同名技能
+        """
+        with self._lock:
+            if source is None:
+                return self._skills.get(name)
+            for metadata in self._candidates(name):
+                if metadata.source == source:
+                    return metadata
+            return None
+
+    def render_index(
+        self,
+        source: Optional[str] = None,
+        user_invocable: Optional[bool] = None,
+        disable_model_invocation: Optional[bool] = False,
+    ) -> IndexFragment:
+        """渲染 Level 1 技能索引片段
+
+        结果按 (索引版本, 过滤条件) 缓存：索引未变化时各轮次、各 run 复用
+        同一个字符串对象，保证提示词前缀逐字节稳定。过滤参数为 None 表示不过滤；
+        默认排除 ``disable_model_invocation`` 的技能。
+
+        Args:
+            source: 仅包含指定来源
+            user_invocable: 仅包含 user_invocable 等于该值的技能
+            disable_model_invocation: 仅包含 disable_model_invocation 等于该值的技能
+        """
+        with self._lock:
+            key = (self.version, source, user_invocable, disable_model_invocation)
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                return fragment
+            if any(k[0] != self.version for k in self._fragments):
+                self._fragments.clear()
+
+            lines = [INDEX_HEADER]
+            for name in sorted(self._skills):
+                m = self._skills[name]
+                if source is not None and m.source != source:
+                    continue
+                if user_invocable is not None and m.user_invocable != user_invocable:
+                    continue
+                if (disable_model_invocation is not None
+                        and m.disable_model_invocation != disable_model_invocation):
+                    continue
+                lines.append(f"- name={m.name} | source={m.source} | description={m.description}")
+            text = "\n".join(lines) + "\n"
+            fragment = IndexFragment(
+                text=text,
+                token_estimate=len(text) // 4,  # 与 SkillLoader.estimate_tokens 一致
+                version=self.version,
+                skill_count=len(lines) - 1,
+            )
+            self._fragments[key] = fragment
+            return fragment
+
+    def get_shadowed(self) -> List[Dict[str, Any]]:
+        """返回当前被覆盖的同名技能报告（按名称排序）"""
+        with self._lock:
+            return [item for name in sorted(self._shadowed) for item in self._shadowed[name]]
+
+    def get_scan_report(self) -> Dict[str, Any]:
+        """获取扫描报告（conflicts 反映增量刷新后的最新决议）"""
+        with self._lock:
+            report = dict(self._report)
+            if report:
+                report["conflicts"] = self.get_shadowed()
+            return report
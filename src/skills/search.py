@@ -0,0 +1,366 @@
+"""技能检索：基于倒排索引的 BM25 排序（中英文混合分词）"""
+import heapq
+import math
+import re
+import threading
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import SkillChanges
+
+# 英文/数字词（连字符、下划线视为分隔符）与连续 CJK 字符段
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[㐀-䶿一-鿿豈-﫿]+")
+
+# (按权重降序的权重列表, 对应文档 id 列表, 文档 id -> 权重, 文档位图)
+_ImpactList = Tuple[List[float], List[int], Dict[int, float], int]
+# (idf, 降序权重, 文档 id, 文档 id -> 权重)
+_QueryList = Tuple[float, List[float], List[int], Dict[int, float]]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    中英文混合分词
+
+    英文按词切分并转小写；中文连续字符段切分为字符二元组（单字段保留单字）。
+
+    Examples:
+        >>> tokenize("PDF-Form filler")
+        ['pdf', 'form', 'filler']
+        >>> tokenize("填写表单")
+        ['填写', '写表', '表单']
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        piece = match.group()
+        if piece[0].isascii() or len(piece) == 1:
+            tokens.append(piece)
+        else:
+            tokens.extend(piece[i:i + 2] for i in range(len(piece) - 1))
+    return tokens
+
+
+class SkillSearchIndex:
+    """技能名称/描述的 BM25 倒排索引
+
+    - 名称命中的词频按 ``name_weight`` 加权
+    - 每个词的倒排链按需物化为“按 BM25 权重降序”的影响力列表并缓存，
+      仅在该词的倒排链变化时失效
+    - 多词查询先用位图计数按“命中查询词个数”分层，从命中最多的层开始
+      精确打分；当第 k 名得分不低于下一层的得分上界时提前结束
+    - 剩余的单词命中层使用阈值算法（TA）：并行下探各词的影响力列表，
+      当第 k 名得分不低于未见文档的得分上界时结束
+    - 长度归一化使用 avgdl 快照，偏离超过 ``avgdl_tolerance`` 时才整体重算
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        name_weight: int = 2,
+        avgdl_tolerance: float = 0.05,
+        tier_budget: int = 512,
+    ) -> None:
+        """
+        Args:
+            k1: BM25 词频饱和参数
+            b: BM25 长度归一化参数
+            name_weight: 名称中词频的加权倍数
+            avgdl_tolerance: avgdl 快照允许的相对偏差
+            tier_budget: 分层打分阶段最多逐个打分的文档数
+        """
+        self.k1 = k1
+        self.b = b
+        self.name_weight = name_weight
+        self.avgdl_tolerance = avgdl_tolerance
+        self.tier_budget = tier_budget
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._docs: Dict[int, SkillMetadata] = {}
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[str, Set[str]] = {}  # 技能名称 -> skill_id
+        self._next_id = 0
+        self._total_len = 0
+        self._avgdl = 0.0
+        self._norm: Dict[int, float] = {}
+        self._impacts: Dict[str, _ImpactList] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, skill_id: object) -> bool:
+        return skill_id in self._ids
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+
+    def add(self, metadata: SkillMetadata) -> None:
+        """添加（或替换）一个技能"""
+        with self._lock:
+            if metadata.skill_id in self._ids:
+                self._remove(metadata.skill_id)
+
+            terms: Dict[str, int] = {}
+            for token in tokenize(metadata.name):
+                terms[token] = terms.get(token, 0) + self.name_weight
+            for token in tokenize(metadata.description):
+                terms[token] = terms.get(token, 0) + 1
+
+            doc_id = self._next_id
+            self._next_id += 1
+            self._ids[metadata.skill_id] = doc_id
+            self._names.setdefault(metadata.name, set()).add(metadata.skill_id)
+            self._docs[doc_id] = metadata
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            if self._avgdl == 0.0:
+                self._avgdl = float(length or 1)
+            self._norm[doc_id] = self._doc_norm(length)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+                self._impacts.pop(term, None)
+
+    def remove(self, skill_id: str) -> bool:
+        """移除技能，返回是否存在"""
+        with self._lock:
+            return self._remove(skill_id)
+
+    def _remove(self, skill_id: str) -> bool:
+        doc_id = self._ids.pop(skill_id, None)
+        if doc_id is None:
+            return False
+        name = self._docs.pop(doc_id).name
+        self._names[name].discard(skill_id)
+        if not self._names[name]:
+            del self._names[name]
+        for term in self._doc_terms.pop(doc_id):
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+            self._impacts.pop(term, None)
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._norm[doc_id]
+        return True
+
+    def apply_changes(self, changes: SkillChanges) -> None:
+        """
+        应用注册表的增量变化（可作为 SkillWatcher 监听器）
+
+        有 ``resolved`` 时每个受影响名称只保留决议胜出的条目，被覆盖的同名
+        条目不进入索引；修改前的条目按 ``previous`` 移除（版本号变化时
+        skill_id 也会变化）。
+        """
+        with self._lock:
+            for metadata in changes.removed + changes.previous:
+                self._remove(metadata.skill_id)
+            if not changes.resolved:
+                for metadata in changes.added + changes.modified:
+                    self.add(metadata)
+                return
+            for name, winner in changes.resolved.items():
+                for skill_id in list(self._names.get(name, ())):
+                    if winner is None or skill_id != winner.skill_id:
+                        self._remove(skill_id)
+                if winner is not None:
+                    self.add(winner)
+
+    # ------------------------------------------------------------------
+    # 打分
+    # ------------------------------------------------------------------
+
+    def _doc_norm(self, length: int) -> float:
+        """长度归一化因子 k1 * (1 - b + b * dl / avgdl)"""
+        return self.k1 * (1 - self.b + self.b * length / self._avgdl)
+
+    def _check_avgdl(self) -> None:
+        """avgdl 偏离快照过多时重算全部归一化因子"""
+        n = len(self._doc_len)
+        if n == 0:
+            return
+        avgdl = self._total_len / n
+        if abs(avgdl - self._avgdl) <= self._avgdl * self.avgdl_tolerance:
+            return
+        self._avgdl = avgdl or 1.0
+        self._norm = {d: self._doc_norm(length) for d, length in self._doc_len.items()}
+        self._impacts.clear()
+
+    def _impact_list(self, term: str) -> Optional[_ImpactList]:
+        """获取词的影响力列表（不含 idf 的 BM25 词权重，降序）"""
+        cached = self._impacts.get(term)
+        if cached is not None:
+            return cached
+        posting = self._postings.get(term)
+        if not posting:
+            return None
+        k1_plus_1 = self.k1 + 1
+        norm = self._norm
+        weights = {d: tf * k1_plus_1 / (tf + norm[d]) for d, tf in posting.items()}
+        ordered = sorted(weights.items(), key=lambda item: (-item[1], item[0]))
+        buf = bytearray((max(posting) >> 3) + 1)
+        for d in posting:
+            buf[d >> 3] |= 1 << (d & 7)
+        bitset = int.from_bytes(buf, "little")
+        impact = ([w for _, w in ordered], [d for d, _ in ordered], weights, bitset)
+        self._impacts[term] = impact
+        return impact
+
+    def search(
+        self, query: str, k: int = 10, source: Optional[str] = None
+    ) -> List[Tuple[SkillMetadata, float]]:
+        """
+        检索与查询最相关的 top-k 技能
+
+        Args:
+            query: 查询文本（通常为用户请求或计划步骤标题）
+            k: 返回数量上限
+            source: 可选来源过滤
+
+        Returns:
+            按分数降序排列的 (SkillMetadata, score) 列表
+        """
+        with self._lock:
+            n = len(self._docs)
+            if n == 0 or k <= 0:
+                return []
+            self._check_avgdl()
+
+            lists: List[_QueryList] = []
+            bitsets: List[int] = []
+            for term in set(tokenize(query)):
+                impact = self._impact_list(term)
+                if impact is None:
+                    continue
+                df = len(impact[1])
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                lists.append((idf, impact[0], impact[1], impact[2]))
+                bitsets.append(impact[3])
+            if not lists:
+                return []
+
+            docs = self._docs
+            heap: List[Tuple[float, int]] = []  # (score, -doc_id) 最小堆
+            seen: Set[int] = set()
+            # 各层（命中查询词个数）尚未打分的文档数
+            remaining = [0] * (len(lists) + 1)
+
+            def score_doc(doc_id: int) -> int:
+                seen.add(doc_id)
+                score = 0.0
+                hits = 0
+                for idf, _, _, wmap in lists:
+                    weight = wmap.get(doc_id)
+                    if weight is not None:
+                        score += idf * weight
+                        hits += 1
+                if source is None or docs[doc_id].source == source:
+                    entry = (score, -doc_id)
+                    if len(heap) < k:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+                return hits
+
+            # 阶段一：命中词数多且规模小的层直接逐个打分
+            # 命中 m 个词的文档得分上界为前 m 大的 idf * max_weight 之和
+            max_contrib = sorted((idf * weights[0] for idf, weights, _, _ in lists), reverse=True)
+            upper_bounds = [0.0]
+            for contrib in max_contrib:
+                upper_bounds.append(upper_bounds[-1] + contrib)
+            budget = self.tier_budget
+            tiers = list(self._tiers(bitsets))
+            scored_tiers = 0
+            for m, tier in tiers:
+                if len(heap) == k and heap[0][0] >= upper_bounds[m]:
+                    return self._ranked(heap)
+                size = tier.bit_count()
+                if size > budget:
+                    break
+                budget -= size
+                scored_tiers += 1
+                for doc_id in _iter_bits(tier):
+                    if doc_id not in seen:
+                        score_doc(doc_id)
+            for m, tier in tiers[scored_tiers:]:
+                remaining[m] = tier.bit_count()
+
+            # 阶段二：阈值算法。未见文档最多命中 open_tier 个词（多词层都已
+            # 打分完毕时为 1），其得分上界为当前各链表头中前 open_tier 大的贡献之和
+            depth = 0
+            while True:
+                active = False
+                for _, _, doc_ids, _ in lists:
+                    if depth >= len(doc_ids):
+                        continue
+                    active = True
+                    doc_id = doc_ids[depth]
+                    if doc_id not in seen:
+                        hits = score_doc(doc_id)
+                        if hits > 1:
+                            remaining[hits] -= 1
+                if not active:
+                    break
+                depth += 1
+                if len(heap) == k:
+                    open_tier = next(
+                        (m for m in range(len(lists), 1, -1) if remaining[m] > 0), 1
+                    )
+                    heads = sorted(
+                        (idf * weights[depth] for idf, weights, _, _ in lists
+                         if depth < len(weights)),
+                        reverse=True,
+                    )
+                    if heap[0][0] >= sum(heads[:open_tier]):
+                        break
+
+            return self._ranked(heap)
+
+    def _ranked(self, heap: List[Tuple[float, int]]) -> List[Tuple[SkillMetadata, float]]:
+        """堆转为按分数降序（同分按文档 id 升序）的结果列表"""
+        ranked = sorted(heap, reverse=True)
+        return [(self._docs[-neg_id], score) for score, neg_id in ranked]
+
+    @staticmethod
+    def _tiers(bitsets: List[int]) -> Iterator[Tuple[int, int]]:
+        """按命中词数从多到少产出 (m, 位图)，仅包含 m >= 2 的非空层
+
+        用位切片计数器对各词位图做加法，每层用各计数位平面的与/异或求出。
+        """
+        if len(bitsets) < 2:
+            return
+        planes: List[int] = []
+        full = 0
+        for bits in bitsets:
+            full |= bits
+            carry = bits
+            for i, plane in enumerate(planes):
+                planes[i] = plane ^ carry
+                carry &= plane
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+        for m in range(len(bitsets), 1, -1):
+            if m >> len(planes):
+                # m 超出计数位平面能表示的范围，没有文档命中这么多词
+                continue
+            tier = full
+            for i, plane in enumerate(planes):
+                tier &= plane if (m >> i) & 1 else full ^ plane
+                if not tier:
+                    break
+            if tier:
+                yield m, tier
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """按位置升序遍历位图中置位的下标"""
+    text = bin(bits)[:1:-1]
+    pos = text.find("1")
+    while pos != -1:
+        yield pos
+        pos = text.find("1", pos + 1)
@@ -0,0 +1,196 @@
+"""资源文件章节索引：按字节偏移定位章节，支持只读取指定片段"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_MD_HEADING = re.compile(rb"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+_MD_FENCE = re.compile(rb"^[ \t]*(```|~~~)")
+_INI_SECTION = re.compile(rb"^\[+([^\]]+)\]+[ \t]*$")
+_YAML_KEY = re.compile(rb"^([A-Za-z0-9_][\w .-]*):(?:[ \t]|$)")
+_PY_DEF = re.compile(rb"^(?:async[ \t]+)?(?:def|class)[ \t]+(\w+)")
+
+_MARKDOWN_SUFFIXES = {".md", ".markdown", ".mdx"}
+_INI_SUFFIXES = {".toml", ".ini", ".cfg"}
+_YAML_SUFFIXES = {".yaml", ".yml"}
+_PY_SUFFIXES = {".py"}
+
+
+@dataclass(frozen=True)
+class Section:
+    """章节锚点（字节偏移区间 [start, end)，start 指向标题行）"""
+    title: str
+    level: int
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"title": self.title, "level": self.level, "start": self.start, "end": self.end}
+
+
+@dataclass
+class SectionIndex:
+    """单个文件的章节索引"""
+    sha256: str
+    size: int
+    sections: List[Section] = field(default_factory=list)
+
+    def titles(self) -> List[str]:
+        return [s.title for s in self.sections]
+
+    def find(self, hint: str) -> Optional[Section]:
+        """
+        按章节提示查找章节
+
+        依次尝试：完全匹配（忽略大小写与前导 ``#``）、前缀匹配、包含匹配。
+
+        Args:
+            hint: 章节提示，例如 ``"## 指标定义"`` 或 ``"指标定义"``
+        """
+        wanted = _normalize_title(hint)
+        if not wanted:
+            return None
+        normalized = [(_normalize_title(s.title), s) for s in self.sections]
+        for match in (
+            lambda title: title == wanted,
+            lambda title: title.startswith(wanted),
+            lambda title: wanted in title,
+        ):
+            for title, section in normalized:
+                if match(title):
+                    return section
+        return None
+
+
+def _normalize_title(title: str) -> str:
+    return title.strip().lstrip("#").strip().casefold()
+
+
+def _anchor_kind(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in _INI_SUFFIXES:
+        return "ini"
+    if suffix in _YAML_SUFFIXES:
+        return "yaml"
+    if suffix in _PY_SUFFIXES:
+        return "python"
+    # markdown 及其他文本文件按 markdown 标题识别
+    return "markdown"
+
+
+def build_section_index(path: Path) -> SectionIndex:
+    """
+    单次顺序扫描文件，同时计算 SHA256 与章节锚点
+
+    - markdown：ATX 标题（``#`` ~ ``######``），忽略围栏代码块中的行
+    - toml/ini：``[section]``
+    - yaml：顶层键
+    - python：顶层 ``def`` / ``class``
+
+    章节结束于下一个同级或更高级标题（非 markdown 格式均视为同级）。
+    """
+    kind = _anchor_kind(path)
+    sha256 = hashlib.sha256()
+    anchors: List[Tuple[str, int, int]] = []  # (title, level, start)
+    offset = 0
+    in_fence = False
+
+    with open(path, "rb") as f:
+        for line in f:
+            sha256.update(line)
+            stripped = line.rstrip(b"\r\n")
+            anchor: Optional[Tuple[bytes, int]] = None
+            if kind == "markdown":
+                if _MD_FENCE.match(stripped):
+                    in_fence = not in_fence
+                elif not in_fence:
+                    m = _MD_HEADING.match(stripped)
+                    if m:
+                        anchor = (m.group(2), len(m.group(1)))
+            else:
+                pattern = {"ini": _INI_SECTION, "yaml": _YAML_KEY, "python": _PY_DEF}[kind]
+                m = pattern.match(stripped)
+                if m:
+                    anchor = (m.group(1), 1)
+            if anchor is not None:
+                title = anchor[0].decode("utf-8", errors="replace").strip()
+                anchors.append((title, anchor[1], offset))
+            offset += len(line)
+
+    ends = [offset] * len(anchors)
+    open_anchors: List[int] = []  # 尚未闭合的锚点下标（级别单调递增）
+    for i, (_, level, start) in enumerate(anchors):
+        while open_anchors and anchors[open_anchors[-1]][1] >= level:
+            ends[open_anchors.pop()] = start
+        open_anchors.append(i)
+    sections = [
+        Section(title=title, level=level, start=start, end=end)
+        for (title, level, start), end in zip(anchors, ends)
+    ]
+    return SectionIndex(sha256=sha256.hexdigest(), size=offset, sections=sections)
+
+
+class SectionIndexCache:
+    """章节索引缓存
+
+    索引按 (锚点类型, 文件内容哈希) 缓存：锚点识别规则取决于文件后缀，
+    内容相同但锚点类型不同的文件（如 ``.md`` 与 ``.yaml``）不能共享索引。
+    另维护 (路径, mtime, 大小) → 缓存键的映射，文件未变化时只需一次 ``stat``。
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._by_hash: "OrderedDict[Tuple[str, str], SectionIndex]" = OrderedDict()
+        self._hash_by_stat: "OrderedDict[Tuple[str, int, int], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_index(self, path: Path) -> SectionIndex:
+        """获取（必要时构建）文件的章节索引"""
+        st = os.stat(path)
+        stat_key = (str(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            key = self._hash_by_stat.get(stat_key)
+            if key is not None:
+                index = self._by_hash.get(key)
+                if index is not None:
+                    self._by_hash.move_to_end(key)
+                    self._hash_by_stat.move_to_end(stat_key)
+                    self.hits += 1
+                    return index
+            self.misses += 1
+
+        index = build_section_index(path)
+        key = (_anchor_kind(path), index.sha256)
+        with self._lock:
+            self._by_hash[key] = index
+            self._by_hash.move_to_end(key)
+            self._hash_by_stat[stat_key] = key
+            self._hash_by_stat.move_to_end(stat_key)
+            while len(self._by_hash) > self.max_entries:
+                self._by_hash.popitem(last=False)
+            while len(self._hash_by_stat) > self.max_entries:
+                self._hash_by_stat.popitem(last=False)
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._by_hash), "hits": self.hits, "misses": self.misses}
+
+
+_shared_cache: Optional[SectionIndexCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_section_cache() -> SectionIndexCache:
+    """获取进程级共享的章节索引缓存"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SectionIndexCache()
+        return _shared_cache
@@ -0,0 +1,97 @@
+"""技能目录轮询监视器（无需 inotify）"""
+import threading
+from typing import Callable, List, Optional
+
+from src.agent.events import Event, EventStream, EventType
+from src.common.logging_config import get_logger
+from src.skills.registry import SkillChanges, SkillRegistry
+
+logger = get_logger(__name__)
+
+
+class SkillWatcher:
+    """轮询 skill roots，将增量变化应用到注册表并发出事件
+
+    每次轮询只做一次 ``scandir``（每个根目录）加每个技能一次 ``stat``，
+    仅对指纹变化的技能重新解析前言，适合长驻服务端进程。
+    """
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        interval: float = 1.0,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "registry",
+    ) -> None:
+        """
+        Args:
+            registry: 要维护的技能注册表
+            interval: 轮询间隔（秒）
+            event_stream: 可选事件流，用于发出 skill_added/removed/updated 事件
+            run_id: 事件中使用的 run_id
+        """
+        self.registry = registry
+        self.interval = interval
+        self.event_stream = event_stream
+        self.run_id = run_id
+        self._listeners: List[Callable[[SkillChanges], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[SkillChanges], None]) -> None:
+        """注册变化监听器（仅在检测到非空变化时调用）"""
+        self._listeners.append(listener)
+
+    def poll(self) -> SkillChanges:
+        """执行一次轮询并应用变化"""
+        changes = self.registry.refresh_changes()
+        if changes.is_empty():
+            return changes
+
+        if self.event_stream is not None:
+            for event_type, items in (
+                (EventType.SKILL_ADDED, changes.added),
+                (EventType.SKILL_REMOVED, changes.removed),
+                (EventType.SKILL_UPDATED, changes.modified),
+            ):
+                for metadata in items:
+                    self.event_stream.emit(Event(
+                        type=event_type,
+                        run_id=self.run_id,
+                        turn=0,
+                        data={
+                            "skill_id": metadata.skill_id,
+                            "name": metadata.name,
+                            "source": metadata.source,
+                            "path": str(metadata.path),
+                            "index_version": self.registry.version,
+                        },
+                    ))
+
+        for listener in self._listeners:
+            listener(changes)
+        return changes
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="skill-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止后台轮询线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:  # 轮询失败不应终止监视线程
+                logger.exception("Skill watcher poll failed")
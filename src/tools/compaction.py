@@ -0,0 +1,265 @@
+"""工具输出压缩：在写入 RunState 前按工具类型精简 Observation.output"""
+import json
+import os
+import re
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.agent.state import Observation, RunState
+from src.common.config import Config
+from src.common.hash_utils import compute_text_hash
+
+_TRAILING_WS = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def dedupe_lines(text: str, min_repeats: int = 3) -> str:
+    """把连续重复 ``min_repeats`` 次及以上的行折叠为一行加重复次数"""
+    lines = text.split("\n")
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        j = i + 1
+        while j < len(lines) and lines[j] == lines[i]:
+            j += 1
+        count = j - i
+        if count >= min_repeats:
+            out.append(lines[i])
+            out.append(f"[previous line repeated {count - 1} more times]")
+        else:
+            out.extend(lines[i:j])
+        i = j
+    return "\n".join(out)
+
+
+def collapse_whitespace(text: str) -> str:
+    """去掉行尾空白，把连续空行合并为一个"""
+    return _BLANK_RUNS.sub("\n\n", _TRAILING_WS.sub("", text))
+
+
+def truncate_middle(text: str, max_chars: int) -> str:
+    """超过 ``max_chars`` 时保留首尾各一半，中间替换为省略标记"""
+    if len(text) <= max_chars:
+        return text
+    head = max_chars // 2
+    tail = max_chars - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n...[{omitted} chars omitted]...\n{text[-tail:]}"
+
+
+def truncate_tail(text: str, max_chars: int) -> str:
+    """超过 ``max_chars`` 时只保留开头部分，尽量在最后一个完整行处截断"""
+    if len(text) <= max_chars:
+        return text
+    newline = text.rfind("\n", 0, max_chars)
+    return text[:newline + 1] if newline >= 0 else text[:max_chars]
+
+
+def prune_json(value: Any, max_items: int, max_string_chars: int) -> Any:
+    """结构化裁剪：列表只保留前 ``max_items`` 项，长字符串截断"""
+    if isinstance(value, str):
+        return truncate_middle(value, max_string_chars)
+    if isinstance(value, list):
+        pruned = [prune_json(item, max_items, max_string_chars) for item in value[:max_items]]
+        if len(value) > max_items:
+            pruned.append(f"...[{len(value) - max_items} more items omitted]")
+        return pruned
+    if isinstance(value, dict):
+        return {k: prune_json(v, max_items, max_string_chars) for k, v in value.items()}
+    return value
+
+
+def _file_cursor(metadata: Dict[str, Any], content: str) -> Dict[str, Any]:
+    """read_file 内容被截尾后，按保留部分重新计算分页游标"""
+    offset = metadata.get("offset", 0)
+    kept = len(content.encode("utf-8"))
+    cursor: Dict[str, Any] = {
+        "end_offset": offset + kept,
+        "bytes_returned": kept,
+        "eof": False,
+        "next_offset": offset + kept,
+    }
+    if metadata.get("start_line") is not None:
+        # 单行超长时在行中间截断，next_offset 续读该行剩余部分
+        end_line = metadata["start_line"] + max(content.count("\n"), 1) - 1
+        cursor.update({"end_line": end_line, "next_line": end_line + 1})
+    return cursor
+
+
+def _serialized(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class OutputCompactor:
+    """工具输出压缩层
+
+    位于工具运行时与 ``RunState.add_observation`` 之间，按动作类型应用策略：
+
+    - ``run_script``：stdout/stderr 折叠重复行、合并空白、首尾截断
+    - ``load_resource``：合并空白、首尾截断
+    - ``read_file``：只截掉尾部并改写分页游标（``next_offset`` 等指向保留内容
+      之后），文件内容保持原样；首尾摘录页不做处理
+    - ``grep`` / ``list_dir`` 及其他：结构化 JSON 裁剪
+
+    发生压缩时，完整原始输出按内容哈希存到 ``store_dir``，引用写入
+    ``metadata["compaction"]["original_ref"]``，可用 ``load_original`` 取回。
+    """
+
+    def __init__(
+        self,
+        store_dir: Optional[Path] = None,
+        max_chars: int = 8000,
+        max_items: int = 50,
+        max_string_chars: int = 2000,
+    ) -> None:
+        """
+        Args:
+            store_dir: 原始输出的存放目录，None 时不落盘（无法取回）
+            max_chars: 单个文本字段压缩后的最大字符数
+            max_items: JSON 列表保留的最大项数
+            max_string_chars: JSON 中单个字符串的最大字符数
+        """
+        self.store_dir = Path(store_dir) if store_dir is not None else None
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.max_string_chars = max_string_chars
+        self._strategies: Dict[str, Callable[[Any], Tuple[Any, List[str]]]] = {
+            "run_script": self._compact_script,
+            "load_resource": self._compact_resource,
+            "read_file": self._compact_file,
+        }
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["OutputCompactor"]:
+        """根据 ``execution.compaction`` 配置创建（未启用时返回 None）"""
+        if not config.get("execution.compaction.enabled", True):
+            return None
+        return cls(
+            store_dir=Path(config.get("execution.compaction.dir", ".agent/cache/outputs")),
+            max_chars=config.get("execution.compaction.max_chars", 8000),
+            max_items=config.get("execution.compaction.max_items", 50),
+            max_string_chars=config.get("execution.compaction.max_string_chars", 2000),
+        )
+
+    def compact(self, observation: Observation) -> Observation:
+        """返回压缩后的 Observation（无可压缩内容时原样返回）"""
+        if observation.output is None:
+            return observation
+        if observation.action_type == "read_file" and observation.metadata.get("excerpt"):
+            # 首尾摘录页本身已有大小上限，且字节偏移无法与截断后的内容对应
+            return observation
+        strategy = self._strategies.get(observation.action_type, self._compact_json)
+        output, applied = strategy(observation.output)
+        original_text = _serialized(observation.output)
+        compacted_text = _serialized(output)
+        if compacted_text == original_text:
+            return observation
+
+        original_bytes = len(original_text.encode("utf-8"))
+        compacted_bytes = len(compacted_text.encode("utf-8"))
+        metadata = dict(observation.metadata)
+        if observation.action_type == "read_file" and isinstance(output, dict):
+            metadata.update(_file_cursor(metadata, output["content"]))
+        metadata["compaction"] = {
+            "strategies": applied,
+            "original_ref": self._store(original_text),
+            "original_bytes": original_bytes,
+            "compacted_bytes": compacted_bytes,
+            "bytes_saved": original_bytes - compacted_bytes,
+            "tokens_saved": (len(original_text) - len(compacted_text)) // 4,
+        }
+        return replace(observation, output=output, metadata=metadata)
+
+    def record(self, state: RunState, observation: Observation) -> Observation:
+        """压缩后加入 RunState，并累计本 run 的 ``compaction`` 指标"""
+        compacted = self.compact(observation)
+        state.add_observation(compacted)
+        info = compacted.metadata.get("compaction") if compacted is not observation else None
+        totals = state.metrics.get("compaction", {})
+        state.update_metrics("compaction", {
+            "observations": totals.get("observations", 0) + 1,
+            "compacted": totals.get("compacted", 0) + (1 if info else 0),
+            "bytes_saved": totals.get("bytes_saved", 0) + (info["bytes_saved"] if info else 0),
+            "tokens_saved": totals.get("tokens_saved", 0) + (info["tokens_saved"] if info else 0),
+        })
+        return compacted
+
+    def load_original(self, ref: str) -> Any:
+        """按引用取回压缩前的完整输出
+
+        Raises:
+            KeyError: 引用不存在或未配置存放目录
+        """
+        path = self._ref_path(ref)
+        if path is None or not path.is_file():
+            raise KeyError(ref)
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _store(self, text: str) -> Optional[str]:
+        if self.store_dir is None:
+            return None
+        ref = compute_text_hash(text)
+        path = self._ref_path(ref)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        return ref
+
+    def _ref_path(self, ref: str) -> Optional[Path]:
+        if self.store_dir is None or not re.fullmatch(r"[0-9a-f]{64}", ref or ""):
+            return None
+        return self.store_dir / ref[:2] / f"{ref}.json"
+
+    def _compact_text(
+        self, text: str, steps: List[Tuple[str, Callable[[str], str]]]
+    ) -> Tuple[str, List[str]]:
+        applied = []
+        for name, step in steps:
+            result = step(text)
+            if result != text:
+                applied.append(name)
+                text = result
+        return text, applied
+
+    def _compact_fields(
+        self, output: Any, fields: Tuple[str, ...], steps: List[Tuple[str, Callable[[str], str]]]
+    ) -> Tuple[Any, List[str]]:
+        if not isinstance(output, dict):
+            return self._compact_json(output)
+        compacted = dict(output)
+        applied: List[str] = []
+        for key in fields:
+            if isinstance(compacted.get(key), str):
+                compacted[key], names = self._compact_text(compacted[key], steps)
+                applied.extend(n for n in names if n not in applied)
+        return compacted, applied
+
+    def _compact_script(self, output: Any) -> Tuple[Any, List[str]]:
+        return self._compact_fields(output, ("stdout", "stderr"), [
+            ("dedupe_lines", dedupe_lines),
+            ("collapse_whitespace", collapse_whitespace),
+            ("truncate", lambda t: truncate_middle(t, self.max_chars)),
+        ])
+
+    def _compact_resource(self, output: Any) -> Tuple[Any, List[str]]:
+        return self._compact_fields(output, ("text",), [
+            ("collapse_whitespace", collapse_whitespace),
+            ("truncate", lambda t: truncate_middle(t, self.max_chars)),
+        ])
+
+    def _compact_file(self, output: Any) -> Tuple[Any, List[str]]:
+        return self._compact_fields(output, ("content",), [
+            ("truncate_tail", lambda t: truncate_tail(t, self.max_chars)),
+        ])
+
+    def _compact_json(self, output: Any) -> Tuple[Any, List[str]]:
+        if isinstance(output, str):
+            return self._compact_text(
+                output, [("truncate", lambda t: truncate_middle(t, self.max_chars))]
+            )
+        pruned = prune_json(output, self.max_items, self.max_string_chars)
+        return pruned, ["prune_json"] if pruned != output else []
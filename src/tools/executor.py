@@ -0,0 +1,847 @@
+"""脚本执行器：有界并发、资源配额与进程组超时清理"""
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.agent.events import Event, EventStream, EventType
+from src.agent.state import Observation, ToolBudget
+from src.common.config import Config
+from src.common.logging_config import get_logger
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+from src.skills.metadata import ResourceLimits, SkillMetadata
+
+try:
+    import resource
+except ImportError:  # 非 POSIX 平台不支持 rlimit
+    resource = None
+
+if TYPE_CHECKING:
+    from src.tools.result_cache import ScriptResultCache
+    from src.tools.warm_pool import WarmPythonPool
+
+logger = get_logger(__name__)
+
+# 默认保留的环境变量（其余一律清除）
+DEFAULT_ENV_ALLOWLIST = ("PATH", "LANG", "LC_ALL", "LC_CTYPE", "TZ", "TMPDIR")
+
+MAX_ARG_CHARS = 4096
+
+# (全局信号量, 技能级信号量)
+_AsyncSlots = Tuple[asyncio.Semaphore, Dict[str, asyncio.Semaphore]]
+
+_INTERPRETERS = {
+    ".py": (sys.executable,),
+    ".sh": ("/bin/sh",),
+}
+
+
+class ScriptExecutionError(Exception):
+    """脚本无法启动（参数、路径或权限问题）"""
+    pass
+
+
+@dataclass
+class ScriptResult:
+    """单次脚本执行结果"""
+    exit_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    wall_time_sec: float = 0.0
+    cpu_time_sec: float = 0.0
+    peak_rss_kb: int = 0
+    queue_time_sec: float = 0.0
+    stdout_dropped_bytes: int = 0
+    stderr_dropped_bytes: int = 0
+    stdout_path: Optional[str] = None
+    stderr_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """作为 Observation.metadata 的执行指标"""
+        return {
+            "exit_code": self.exit_code,
+            "timed_out": self.timed_out,
+            "wall_time_sec": round(self.wall_time_sec, 4),
+            "cpu_time_sec": round(self.cpu_time_sec, 4),
+            "peak_rss_kb": self.peak_rss_kb,
+            "queue_time_sec": round(self.queue_time_sec, 4),
+            "stdout_dropped_bytes": self.stdout_dropped_bytes,
+            "stderr_dropped_bytes": self.stderr_dropped_bytes,
+            "stdout_path": self.stdout_path,
+            "stderr_path": self.stderr_path,
+        }
+
+
+class _Capture:
+    """读取线程的有界输出缓冲
+
+    保留开头 ``limit // 2`` 与结尾 ``limit - limit // 2`` 字节，中间部分只计数，
+    内存占用与输出总量无关。可选地将完整输出写入 ``spill`` 文件，并把每个
+    数据块交给 ``on_chunk`` 回调。
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        spill: Optional[IO[bytes]] = None,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        self.head_limit = max(0, limit) // 2
+        self.tail_limit = max(0, limit) - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.spill = spill
+        self.on_chunk = on_chunk
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        return self.spill.name if self.spill is not None else None
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        if self.spill is not None:
+            self.spill.write(data)
+        if self.on_chunk is not None:
+            self.on_chunk(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data or self.tail_limit == 0:
+            return
+        if len(data) >= self.tail_limit:
+            self.tail[:] = data[-self.tail_limit:]
+        else:
+            self.tail += data
+            # bytearray 从头部删除是 O(1) 摊还，相当于环形缓冲
+            del self.tail[:len(self.tail) - self.tail_limit]
+
+    def close(self) -> None:
+        if self.spill is not None:
+            self.spill.close()
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        dropped = self.dropped
+        if not dropped:
+            return head + self.tail.decode("utf-8", errors="replace")
+        # 跳过被截断的多字节字符的续字节
+        tail = bytes(self.tail)
+        skip = 0
+        while skip < min(3, len(tail)) and tail[skip] & 0xC0 == 0x80:
+            skip += 1
+        marker = f"\n...[{dropped} bytes truncated]...\n"
+        return head + marker + tail[skip:].decode("utf-8", errors="replace")
+
+
+def _drain(stream: IO[bytes], capture: _Capture) -> None:
+    # read1 读到已有数据即返回，输出可以边产生边上报
+    with stream:
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            capture.feed(chunk)
+
+
+class _OutputEvents:
+    """把脚本输出节流为 ``SCRIPT_OUTPUT`` 事件
+
+    每个流只保留最近 ``preview_bytes`` 字节的待发送内容，距上次发送超过
+    ``interval_sec`` 时发送一次，结束时 ``flush`` 发送剩余内容。
+    """
+
+    def __init__(
+        self,
+        event_stream: EventStream,
+        run_id: str,
+        turn: int,
+        context: Dict[str, Any],
+        interval_sec: float = 0.25,
+        preview_bytes: int = 4096,
+    ) -> None:
+        self.event_stream = event_stream
+        self.run_id = run_id
+        self.turn = turn
+        self.context = context
+        self.interval_sec = interval_sec
+        self.preview_bytes = preview_bytes
+        self._pending: Dict[str, bytearray] = {"stdout": bytearray(), "stderr": bytearray()}
+        self._skipped = {"stdout": 0, "stderr": 0}
+        self._totals = {"stdout": 0, "stderr": 0}
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def listener(self, stream: str) -> Callable[[bytes], None]:
+        return lambda data: self.feed(stream, data)
+
+    def feed(self, stream: str, data: bytes) -> None:
+        with self._lock:
+            pending = self._pending[stream]
+            pending += data
+            overflow = len(pending) - self.preview_bytes
+            if overflow > 0:
+                del pending[:overflow]
+                self._skipped[stream] += overflow
+            self._totals[stream] += len(data)
+            if time.monotonic() - self._last >= self.interval_sec:
+                self._emit_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._emit_locked()
+
+    def _emit_locked(self) -> None:
+        self._last = time.monotonic()
+        for stream, pending in self._pending.items():
+            if not pending:
+                continue
+            data = dict(self.context)
+            data.update({
+                "stream": stream,
+                "text": pending.decode("utf-8", errors="replace"),
+                "skipped_bytes": self._skipped[stream],
+                "total_bytes": self._totals[stream],
+            })
+            pending.clear()
+            self._skipped[stream] = 0
+            self.event_stream.emit(Event(EventType.SCRIPT_OUTPUT, self.run_id, self.turn, data))
+
+
+async def _drain_async(pipe: IO[bytes], capture: _Capture) -> None:
+    loop = asyncio.get_running_loop()
+    stream = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stream), pipe)
+    try:
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                return
+            capture.feed(chunk)
+    finally:
+        transport.close()
+
+
+class _GroupReaper:
+    """在独立线程中回收进程组组长
+
+    先以 ``WNOWAIT`` 等待组长退出但不回收：组长保持僵尸状态期间进程组 ID
+    不会被复用，此时整组 SIGKILL 清理残留的子孙进程，再用 ``wait4`` 回收并
+    获取 CPU 时间与峰值 RSS。组长回收后不再向该进程组发送信号。
+    """
+
+    def __init__(self, pid: int, on_done: Optional[Callable[[], None]] = None) -> None:
+        self.pid = pid
+        self.status: Optional[int] = None
+        self.usage: Any = None
+        self._on_done = on_done
+        self._reaped = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="script-reaper", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """等待回收完成，返回是否已回收"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def kill(self) -> None:
+        """整组 SIGKILL（组长已回收时不发送）"""
+        with self._lock:
+            if not self._reaped:
+                _kill_group(self.pid)
+
+    def _run(self) -> None:
+        try:
+            os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT)
+            with self._lock:
+                _kill_group(self.pid)
+                _, self.status, self.usage = os.wait4(self.pid, 0)
+                self._reaped = True
+        finally:
+            if self._on_done is not None:
+                self._on_done()
+
+
+def _rlimit_preexec(limits: ResourceLimits) -> Optional[Callable[[], None]]:
+    """构造在子进程 exec 前设置 RLIMIT_AS / RLIMIT_CPU 的 preexec_fn"""
+    if resource is None:
+        return None
+    memory = limits.max_memory_mb * 1024 * 1024
+    cpu = max(1, limits.max_script_time_sec)
+
+    def apply() -> None:
+        if limits.max_memory_mb > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        # 软限制触发 SIGXCPU，硬限制再留 1 秒后 SIGKILL
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+    return apply
+
+
+class ScriptExecutor:
+    """技能脚本执行器
+
+    - 全局信号量限制同时运行的脚本总数，技能级信号量按
+      ``ResourceLimits.max_concurrent_scripts`` 限制单个技能的并发
+    - 子进程在独立会话（进程组）中运行，超时后整组 SIGKILL
+    - 通过 ``preexec_fn`` 设置 RLIMIT_AS / RLIMIT_CPU
+    - 用 ``os.wait4`` 回收子进程，获取该次执行的 CPU 时间与峰值 RSS
+    - 环境变量只保留白名单，stdout/stderr 流式读取，只保留首尾各一半字节上限，
+      可选完整落盘到 run 目录，并以 ``SCRIPT_OUTPUT`` 事件增量上报
+    - 可选的预热解释器池：``.py`` 脚本由预热进程 fork 执行，其余脚本
+      （以及预热进程不可用时）走普通子进程
+    - 可选的结果缓存：技能在 ``cacheable-scripts`` 中声明为确定性的脚本，
+      相同脚本内容、参数、环境变量与输入文件的结果直接复用
+    - ``run_script_async`` 的输出管道由事件循环读取，取消时整组杀死子进程
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_output_bytes: int = 64 * 1024,
+        env_allowlist: Sequence[str] = DEFAULT_ENV_ALLOWLIST,
+        warm_pool: Optional["WarmPythonPool"] = None,
+        result_cache: Optional["ScriptResultCache"] = None,
+        count_cache_hits: bool = True,
+        output_event_interval_sec: float = 0.25,
+    ) -> None:
+        """
+        Args:
+            max_concurrent: 全局最大并发脚本数
+            max_output_bytes: stdout/stderr 各自保留的最大字节数
+            env_allowlist: 从当前进程继承的环境变量白名单
+            warm_pool: 可选的预热 Python 解释器池
+            result_cache: 可选的确定性脚本结果缓存
+            count_cache_hits: 缓存命中是否计入脚本执行预算
+            output_event_interval_sec: ``SCRIPT_OUTPUT`` 事件的最小发送间隔
+        """
+        self.max_concurrent = max_concurrent
+        self.max_output_bytes = max_output_bytes
+        self.env_allowlist = tuple(env_allowlist)
+        self.warm_pool = warm_pool
+        self.result_cache = result_cache
+        self.count_cache_hits = count_cache_hits
+        self.output_event_interval_sec = output_event_interval_sec
+        self._global = threading.BoundedSemaphore(max_concurrent)
+        self._per_skill: Dict[str, threading.BoundedSemaphore] = {}
+        # 事件循环 -> (全局信号量, 技能级信号量)，供 asyncio 路径使用
+        self._async_slots_by_loop: "weakref.WeakKeyDictionary[Any, _AsyncSlots]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ScriptExecutor":
+        """根据配置创建执行器
+
+        ``execution.warm_pool.enabled`` 开启预热池，``execution.script_cache.enabled``
+        开启结果缓存。
+        """
+        from src.tools.result_cache import ScriptResultCache
+        warm_pool = None
+        if config.get("execution.warm_pool.enabled", False):
+            from src.tools.warm_pool import WarmPythonPool
+            warm_pool = WarmPythonPool(preload=config.get("execution.warm_pool.preload", []))
+        return cls(
+            max_concurrent=config.get("execution.max_concurrent_scripts", 4),
+            max_output_bytes=config.get("execution.max_script_output_bytes", 64 * 1024),
+            warm_pool=warm_pool,
+            result_cache=ScriptResultCache.from_config(config),
+            count_cache_hits=config.get("execution.script_cache.count_hits", True),
+            output_event_interval_sec=config.get("execution.output_event_interval_sec", 0.25),
+        )
+
+    def run_script(
+        self,
+        skill: SkillMetadata,
+        relative_path: str,
+        args: Sequence[str] = (),
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[Path] = None,
+        turn: int = 0,
+        inputs: Sequence[str] = (),
+        budget: Optional[ToolBudget] = None,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+        spill_dir: Optional[Path] = None,
+    ) -> Observation:
+        """
+        执行技能目录内的脚本并返回 Observation
+
+        路径与参数错误、非零退出码与超时都以失败的 Observation 返回。
+
+        Args:
+            inputs: 额外的输入文件（技能目录内相对路径），与技能声明的
+                ``script-inputs`` 一起参与缓存键
+            budget: 工具预算；实际执行时消耗一次脚本执行，缓存命中时
+                按 ``count_cache_hits`` 决定。需要计数而预算已用尽时不执行，
+                返回 ``BudgetExceeded`` 错误的 Observation
+            event_stream: 可选事件流，运行期间发送 ``SCRIPT_OUTPUT`` 事件
+            run_id: 事件所属的 run ID
+            spill_dir: 完整输出的落盘目录（通常为 run 目录），None 时不落盘
+        """
+        try:
+            script, cache_key, result = self._prepare(skill, relative_path, args, env, inputs)
+            cache_hit = result is not None
+            exhausted = self._budget_exhausted(budget, cache_hit, turn)
+            if exhausted is not None:
+                return exhausted
+            if not cache_hit:
+                result = self.execute(
+                    skill.skill_id, script, args, skill.resource_limits, env, cwd,
+                    events=self._output_events(skill, relative_path, event_stream, run_id, turn),
+                    spill_dir=spill_dir,
+                )
+        except PathTraversalError as e:
+            return Observation("run_script", False, None, f"PathTraversalBlocked: {e}", turn=turn)
+        except (ScriptExecutionError, OSError) as e:
+            return Observation("run_script", False, None, f"IOError: {e}", turn=turn)
+        return self._observe(skill, relative_path, result, cache_key, cache_hit, budget, turn)
+
+    async def run_script_async(
+        self,
+        skill: SkillMetadata,
+        relative_path: str,
+        args: Sequence[str] = (),
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[Path] = None,
+        turn: int = 0,
+        inputs: Sequence[str] = (),
+        budget: Optional[ToolBudget] = None,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+        spill_dir: Optional[Path] = None,
+    ) -> Observation:
+        """
+        ``run_script`` 的 asyncio 版本
+
+        子进程输出由事件循环读取，只占用一个回收线程。
+        协程被取消时整组杀死子进程，发送 ``ERROR_OCCURRED`` 事件后继续抛出
+        ``asyncio.CancelledError``；只有子进程已启动时才扣减脚本执行预算。
+        """
+        spawned: List[int] = []
+        try:
+            script, cache_key, result = await asyncio.to_thread(
+                self._prepare, skill, relative_path, args, env, inputs
+            )
+            cache_hit = result is not None
+            exhausted = self._budget_exhausted(budget, cache_hit, turn)
+            if exhausted is not None:
+                return exhausted
+            if not cache_hit:
+                result = await self.execute_async(
+                    skill.skill_id, script, args, skill.resource_limits, env, cwd,
+                    events=self._output_events(skill, relative_path, event_stream, run_id, turn),
+                    spill_dir=spill_dir,
+                    on_spawn=spawned.append,
+                )
+        except PathTraversalError as e:
+            return Observation("run_script", False, None, f"PathTraversalBlocked: {e}", turn=turn)
+        except (ScriptExecutionError, OSError) as e:
+            return Observation("run_script", False, None, f"IOError: {e}", turn=turn)
+        except asyncio.CancelledError:
+            if budget is not None and spawned:
+                budget.consume_script_execution()
+            if event_stream is not None:
+                event_stream.emit(Event(EventType.ERROR_OCCURRED, run_id, turn, {
+                    "error": "Cancelled: script process group was killed" if spawned
+                             else "Cancelled: script was not started",
+                    "action_type": "run_script",
+                    "skill": skill.name,
+                    "relative_path": relative_path,
+                    "spawned": bool(spawned),
+                }))
+            raise
+        return self._observe(skill, relative_path, result, cache_key, cache_hit, budget, turn)
+
+    def _prepare(
+        self,
+        skill: SkillMetadata,
+        relative_path: str,
+        args: Sequence[str],
+        env: Optional[Dict[str, str]],
+        inputs: Sequence[str],
+    ) -> Tuple[Path, Optional[str], Optional[ScriptResult]]:
+        """校验脚本与参数并查询结果缓存，返回 (脚本路径, 缓存键, 命中的结果)"""
+        script = self.resolve_script(skill.path, relative_path)
+        self._build_argv(script, args)
+        if self.result_cache is None or not skill.is_cacheable_script(relative_path):
+            return script, None, None
+        declared = self.result_cache.resolve_inputs(skill.path, [*skill.script_inputs, *inputs])
+        cache_key = self.result_cache.make_key(script, args, env, declared)
+        return script, cache_key, self.result_cache.get(cache_key)
+
+    def _budget_exhausted(
+        self, budget: Optional[ToolBudget], cache_hit: bool, turn: int
+    ) -> Optional[Observation]:
+        """会计入执行次数的调用在预算用尽时返回失败的 Observation（不启动脚本）"""
+        if budget is None or (cache_hit and not self.count_cache_hits):
+            return None
+        if budget.script_executions_used < budget.max_script_executions:
+            return None
+        return Observation(
+            "run_script", False, None,
+            f"BudgetExceeded: script execution budget exhausted "
+            f"({budget.script_executions_used}/{budget.max_script_executions})",
+            turn=turn,
+        )
+
+    def _output_events(
+        self,
+        skill: SkillMetadata,
+        relative_path: str,
+        event_stream: Optional[EventStream],
+        run_id: str,
+        turn: int,
+    ) -> Optional[_OutputEvents]:
+        if event_stream is None:
+            return None
+        return _OutputEvents(
+            event_stream, run_id, turn,
+            {"skill": skill.name, "relative_path": relative_path},
+            interval_sec=self.output_event_interval_sec,
+        )
+
+    def _observe(
+        self,
+        skill: SkillMetadata,
+        relative_path: str,
+        result: ScriptResult,
+        cache_key: Optional[str],
+        cache_hit: bool,
+        budget: Optional[ToolBudget],
+        turn: int,
+    ) -> Observation:
+        """写入缓存、扣减预算并把执行结果转换为 Observation"""
+        if cache_key is not None and not cache_hit and result.ok:
+            self.result_cache.put(cache_key, result)
+        counts = not cache_hit or self.count_cache_hits
+        if budget is not None and counts:
+            budget.consume_script_execution()
+        metadata = result.to_metadata()
+        metadata.update({
+            "skill": skill.name,
+            "relative_path": relative_path,
+            "cache_hit": cache_hit,
+            "counts_as_execution": counts,
+        })
+        error = None
+        if result.timed_out:
+            error = f"Timeout: exceeded {skill.resource_limits.max_script_time_sec}s"
+        elif result.exit_code != 0:
+            error = f"ExitNonZero: exit code {result.exit_code}"
+        return Observation(
+            action_type="run_script",
+            success=error is None,
+            output={"stdout": result.stdout, "stderr": result.stderr},
+            error=error,
+            metadata=metadata,
+            turn=turn,
+        )
+
+    @staticmethod
+    def resolve_script(skill_dir: Path, relative_path: str) -> Path:
+        """校验并解析技能目录内的脚本路径"""
+        if not validate_relative_path(relative_path):
+            raise PathTraversalError(f"Invalid relative path: {relative_path}")
+        script = validate_path_in_root(skill_dir / relative_path, skill_dir)
+        if not script.is_file():
+            raise ScriptExecutionError(f"Script not found: {relative_path}")
+        return script
+
+    def execute(
+        self,
+        skill_key: str,
+        script: Path,
+        args: Sequence[str],
+        limits: ResourceLimits,
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[Path] = None,
+        events: Optional[_OutputEvents] = None,
+        spill_dir: Optional[Path] = None,
+    ) -> ScriptResult:
+        """
+        在并发配额内执行脚本
+
+        Args:
+            skill_key: 技能级并发计数的键（通常为 skill_id）
+            script: 已校验的脚本绝对路径
+            args: 参数列表（不经过 shell）
+            limits: 资源配额
+            env: 额外环境变量
+            cwd: 工作目录，默认脚本所在目录
+            events: 可选的输出事件节流器
+            spill_dir: 完整输出的落盘目录
+        """
+        argv = self._build_argv(script, args)
+        queued = time.perf_counter()
+        skill_slot = self._skill_semaphore(skill_key, limits.max_concurrent_scripts)
+        with skill_slot, self._global:
+            queue_time = time.perf_counter() - queued
+            out, err = self._captures(script, events, spill_dir)
+            try:
+                result = None
+                if self.warm_pool is not None and script.suffix.lower() == ".py":
+                    result = self._run_warm(
+                        script, args, limits, self._build_env(env), cwd or script.parent, out, err
+                    )
+                if result is None:
+                    result = self._spawn(
+                        argv, limits, self._build_env(env), cwd or script.parent, out, err
+                    )
+            finally:
+                out.close()
+                err.close()
+                if events is not None:
+                    events.flush()
+        result.queue_time_sec = queue_time
+        return result
+
+    def _captures(
+        self, script: Path, events: Optional[_OutputEvents], spill_dir: Optional[Path]
+    ) -> Tuple[_Capture, _Capture]:
+        """创建 stdout/stderr 缓冲；指定 spill_dir 时同时打开落盘文件"""
+        captures = []
+        prefix = f"{script.stem}-{uuid.uuid4().hex[:8]}"
+        for stream in ("stdout", "stderr"):
+            spill = None
+            if spill_dir is not None:
+                Path(spill_dir).mkdir(parents=True, exist_ok=True)
+                spill = open(Path(spill_dir) / f"{prefix}.{stream}.log", "wb")
+            on_chunk = events.listener(stream) if events is not None else None
+            captures.append(_Capture(self.max_output_bytes, spill, on_chunk))
+        return captures[0], captures[1]
+
+    def _run_warm(
+        self, script: Path, args: Sequence[str], limits: ResourceLimits,
+        env: Dict[str, str], cwd: Path, out: _Capture, err: _Capture,
+    ) -> Optional[ScriptResult]:
+        from src.tools.warm_pool import WarmPoolError
+        try:
+            return self.warm_pool.run(script, args, limits, env, cwd, out, err)
+        except WarmPoolError as e:
+            logger.warning("Falling back to subprocess: %s", e)
+            return None
+
+    async def execute_async(
+        self,
+        skill_key: str,
+        script: Path,
+        args: Sequence[str],
+        limits: ResourceLimits,
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[Path] = None,
+        events: Optional[_OutputEvents] = None,
+        spill_dir: Optional[Path] = None,
+        on_spawn: Optional[Callable[[int], None]] = None,
+    ) -> ScriptResult:
+        """
+        ``execute`` 的 asyncio 版本
+
+        并发配额使用当前事件循环上的 ``asyncio.Semaphore``（上限与同步路径
+        相同，但两者不共享计数）。不使用预热池。``on_spawn`` 在子进程启动后
+        以 pid 调用。
+        """
+        argv = self._build_argv(script, args)
+        queued = time.perf_counter()
+        skill_slot, global_slot = self._async_slots(skill_key, limits.max_concurrent_scripts)
+        async with skill_slot, global_slot:
+            queue_time = time.perf_counter() - queued
+            out, err = self._captures(script, events, spill_dir)
+            try:
+                result = await self._spawn_async(
+                    argv, limits, self._build_env(env), cwd or script.parent, out, err, on_spawn
+                )
+            finally:
+                out.close()
+                err.close()
+                if events is not None:
+                    events.flush()
+        result.queue_time_sec = queue_time
+        return result
+
+    def _async_slots(self, key: str, limit: int) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_slots_by_loop.get(loop)
+            if slots is None:
+                slots = (asyncio.Semaphore(self.max_concurrent), {})
+                self._async_slots_by_loop[loop] = slots
+            global_slot, per_skill = slots
+            if key not in per_skill:
+                per_skill[key] = asyncio.Semaphore(max(1, limit))
+            return per_skill[key], global_slot
+
+    async def _spawn_async(
+        self, argv: List[str], limits: ResourceLimits, env: Dict[str, str], cwd: Path,
+        out: _Capture, err: _Capture, on_spawn: Optional[Callable[[int], None]] = None,
+    ) -> ScriptResult:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # 不用 asyncio.create_subprocess_exec：它的子进程监视器会立即回收组长，
+        # 之后无法安全地清理进程组
+        proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(cwd),
+            env=env,
+            start_new_session=True,
+            preexec_fn=_rlimit_preexec(limits),
+        )
+        if on_spawn is not None:
+            on_spawn(proc.pid)
+        exited = loop.create_future()
+
+        def notify() -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: exited.done() or exited.set_result(None))
+            except RuntimeError:  # 事件循环已关闭
+                pass
+
+        reaper = _GroupReaper(proc.pid, notify)
+        readers = [
+            asyncio.ensure_future(_drain_async(proc.stdout, out)),
+            asyncio.ensure_future(_drain_async(proc.stderr, err)),
+        ]
+        timeout = limits.max_script_time_sec
+        timed_out = False
+        try:
+            try:
+                await asyncio.wait_for(asyncio.shield(exited), timeout if timeout > 0 else None)
+            except asyncio.TimeoutError:
+                timed_out = True
+                reaper.kill()
+                await asyncio.shield(exited)
+            wall = time.perf_counter() - start
+            await asyncio.gather(*readers)
+        except asyncio.CancelledError:
+            # 取消时整组杀死并回收子进程，再把取消继续向上传递
+            reaper.kill()
+            for reader in readers:
+                reader.cancel()
+            await asyncio.shield(exited)
+            await asyncio.gather(*readers, return_exceptions=True)
+            raise
+        finally:
+            for pipe in (proc.stdout, proc.stderr):
+                pipe.close()
+        if reaper.status is not None:
+            proc.returncode = os.waitstatus_to_exitcode(reaper.status)
+        usage = reaper.usage
+        return ScriptResult(
+            exit_code=proc.returncode if proc.returncode is not None else -1,
+            stdout=out.text(),
+            stderr=err.text(),
+            timed_out=timed_out,
+            wall_time_sec=wall,
+            cpu_time_sec=(usage.ru_utime + usage.ru_stime) if usage else 0.0,
+            peak_rss_kb=usage.ru_maxrss if usage else 0,
+            stdout_dropped_bytes=out.dropped,
+            stderr_dropped_bytes=err.dropped,
+            stdout_path=out.spill_path,
+            stderr_path=err.spill_path,
+        )
+
+    def _skill_semaphore(self, key: str, limit: int) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._per_skill.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(max(1, limit))
+                self._per_skill[key] = semaphore
+            return semaphore
+
+    def _build_argv(self, script: Path, args: Sequence[str]) -> List[str]:
+        if isinstance(args, (str, bytes)):
+            raise ScriptExecutionError("args must be a list of strings")
+        for arg in args:
+            if not isinstance(arg, str):
+                raise ScriptExecutionError(f"Invalid argument type: {type(arg).__name__}")
+            if len(arg) > MAX_ARG_CHARS:
+                raise ScriptExecutionError(f"Argument exceeds {MAX_ARG_CHARS} chars")
+        interpreter = _INTERPRETERS.get(script.suffix.lower(), ())
+        return [*interpreter, str(script), *args]
+
+    def _build_env(self, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        env = {k: os.environ[k] for k in self.env_allowlist if k in os.environ}
+        env.update(extra or {})
+        return env
+
+    def _spawn(
+        self, argv: List[str], limits: ResourceLimits, env: Dict[str, str], cwd: Path,
+        out: _Capture, err: _Capture,
+    ) -> ScriptResult:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(cwd),
+            env=env,
+            start_new_session=True,
+            preexec_fn=_rlimit_preexec(limits),
+        )
+        readers = [
+            threading.Thread(target=_drain, args=(proc.stdout, out), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stderr, err), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        # 脚本退出时回收线程会清理残留的子孙进程，避免其占用管道
+        status, usage, timed_out = self._wait(proc, limits.max_script_time_sec)
+        wall = time.perf_counter() - start
+        for reader in readers:
+            reader.join()
+
+        return ScriptResult(
+            exit_code=proc.returncode if status is None else os.waitstatus_to_exitcode(status),
+            stdout=out.text(),
+            stderr=err.text(),
+            timed_out=timed_out,
+            wall_time_sec=wall,
+            cpu_time_sec=(usage.ru_utime + usage.ru_stime) if usage else 0.0,
+            peak_rss_kb=usage.ru_maxrss if usage else 0,
+            stdout_dropped_bytes=out.dropped,
+            stderr_dropped_bytes=err.dropped,
+            stdout_path=out.spill_path,
+            stderr_path=err.spill_path,
+        )
+
+    @staticmethod
+    def _wait(proc: subprocess.Popen, timeout: float) -> Tuple[Optional[int], Any, bool]:
+        """等待回收线程回收子进程；超时则整组 SIGKILL"""
+        reaper = _GroupReaper(proc.pid)
+        timed_out = not reaper.join(timeout if timeout > 0 else None)
+        if timed_out:
+            reaper.kill()
+            reaper.join()
+        if reaper.status is not None:
+            # 已由 wait4 回收，告知 Popen 不要再 wait
+            proc.returncode = os.waitstatus_to_exitcode(reaper.status)
+        return reaper.status, reaper.usage, timed_out
+
+
+def _kill_group(pgid: int) -> None:
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
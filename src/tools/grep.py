@@ -0,0 +1,311 @@
+"""grep 工具：基于 mmap 的并行正则搜索"""
+import fnmatch
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.agent.state import Observation
+from src.common.config import Config
+from src.common.ignore import is_ignored
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+
+# 文件开头用于判断二进制的字节数
+BINARY_SNIFF_BYTES = 8192
+
+# 正则元字符：字面前缀在遇到这些字符时结束
+_META = set(".^$*+?{}[]\\|()")
+
+
+class InvalidPatternError(ValueError):
+    """正则表达式无法编译"""
+    pass
+
+
+@dataclass
+class GrepMatch:
+    """单条匹配"""
+    path: str  # 相对搜索根目录的 POSIX 路径
+    line_number: int
+    line: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "line_number": self.line_number, "line": self.line}
+
+
+@dataclass
+class GrepResult:
+    """一次搜索的结果与统计"""
+    matches: List[GrepMatch] = field(default_factory=list)
+    files_scanned: int = 0
+    binary_skipped: int = 0
+    bytes_scanned: int = 0
+    truncated: bool = False  # 达到匹配上限而提前结束
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "matches": [m.to_dict() for m in self.matches],
+            "files_scanned": self.files_scanned,
+            "binary_skipped": self.binary_skipped,
+            "bytes_scanned": self.bytes_scanned,
+            "truncated": self.truncated,
+        }
+
+
+def literal_prefix(pattern: str) -> str:
+    """提取正则的字面前缀：每个匹配都以该前缀开头
+
+    含顶层或分组内 ``|`` 的模式无法保证，返回空串。
+    """
+    if "|" in pattern:
+        return ""
+    prefix = []
+    for char in pattern:
+        if char in _META:
+            # 量词只作用于前一个字符，该字符不再是必需的
+            if char in "*?{" and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return "".join(prefix)
+
+
+def is_binary(head: bytes) -> bool:
+    """文件开头含 NUL 字节视为二进制"""
+    return b"\0" in head
+
+
+class GrepTool:
+    """并行 grep
+
+    - 按路径排序遍历文件，线程池并行扫描；结果按文件顺序合并，
+      因此达到上限时返回的是确定的前 ``max_matches`` 条
+    - 大文件用 ``mmap`` 扫描，避免整文件复制；正则在 bytes 上匹配
+    - 有字面前缀的模式先用 ``find`` 定位候选位置，再在候选处做正则匹配
+    - 达到匹配上限后停止提交新文件，进行中的扫描在下一个候选处退出
+    - 开头含 NUL 的文件视为二进制跳过；忽略规则与技能注册表相同（``is_ignored``）
+    """
+
+    def __init__(
+        self,
+        max_matches: int = 200,
+        max_workers: int = 4,
+        max_line_chars: int = 500,
+        mmap_threshold: int = 64 * 1024,
+    ) -> None:
+        """
+        Args:
+            max_matches: 默认匹配条数上限
+            max_workers: 扫描线程数
+            max_line_chars: 每条匹配保留的最大行长度
+            mmap_threshold: 不小于该大小的文件使用 mmap
+        """
+        self.max_matches = max_matches
+        self.max_workers = max_workers
+        self.max_line_chars = max_line_chars
+        self.mmap_threshold = mmap_threshold
+
+    @classmethod
+    def from_config(cls, config: Config) -> "GrepTool":
+        return cls(
+            max_matches=config.get("execution.grep.max_matches", 200),
+            max_workers=config.get("execution.grep.max_workers", 4),
+        )
+
+    def run(
+        self,
+        root: Path,
+        pattern: str,
+        path: str = ".",
+        glob: Optional[str] = None,
+        ignore_case: bool = False,
+        fixed_string: bool = False,
+        max_matches: Optional[int] = None,
+        turn: int = 0,
+    ) -> Observation:
+        """执行搜索并返回 Observation（路径与模式错误以失败的 Observation 返回）"""
+        try:
+            result = self.search(root, pattern, path, glob, ignore_case, fixed_string, max_matches)
+        except PathTraversalError as e:
+            return Observation("grep", False, None, f"PathTraversalBlocked: {e}", turn=turn)
+        except InvalidPatternError as e:
+            return Observation("grep", False, None, f"InvalidPattern: {e}", turn=turn)
+        except OSError as e:
+            return Observation("grep", False, None, f"IOError: {e}", turn=turn)
+        output = result.to_dict()
+        matches = output.pop("matches")
+        return Observation(
+            action_type="grep",
+            success=True,
+            output={"matches": matches},
+            metadata=dict(output, pattern=pattern, path=path),
+            turn=turn,
+        )
+
+    def search(
+        self,
+        root: Path,
+        pattern: str,
+        path: str = ".",
+        glob: Optional[str] = None,
+        ignore_case: bool = False,
+        fixed_string: bool = False,
+        max_matches: Optional[int] = None,
+    ) -> GrepResult:
+        """
+        在 ``root/path`` 下搜索
+
+        Args:
+            root: 搜索根目录（结果路径相对于它，且不允许越出）
+            pattern: 正则表达式（``fixed_string`` 时按字面匹配）
+            path: 根目录内的相对路径（文件或目录）
+            glob: 文件名过滤，如 ``*.md``
+            ignore_case: 忽略大小写
+            fixed_string: 按字面字符串匹配
+            max_matches: 匹配上限，None 使用默认值
+
+        Raises:
+            PathTraversalError: path 越出根目录
+            InvalidPatternError: 正则无法编译
+        """
+        if not validate_relative_path(path):
+            raise PathTraversalError(f"Invalid relative path: {path}")
+        root = Path(root).resolve()
+        target = validate_path_in_root(root / path, root)
+        limit = self.max_matches if max_matches is None else max_matches
+
+        source = re.escape(pattern) if fixed_string else pattern
+        try:
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            regex = re.compile(source.encode("utf-8"), flags)
+        except re.error as e:
+            raise InvalidPatternError(str(e)) from e
+        prefix = b"" if ignore_case else literal_prefix(source).encode("utf-8")
+
+        result = GrepResult()
+        if limit <= 0:
+            return result
+        stop = threading.Event()
+        pending: Deque[Future] = deque()
+        workers = max(1, self.max_workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grep") as pool:
+            for file in self._iter_files(root, target, glob):
+                if stop.is_set():
+                    break
+                pending.append(pool.submit(self._scan_file, root, file, regex, prefix, limit, stop))
+                # 限制在途任务数，达到上限后不再提交
+                while len(pending) >= 2 * self.max_workers:
+                    self._collect(pending.popleft(), result, limit, stop)
+            while pending:
+                self._collect(pending.popleft(), result, limit, stop)
+        return result
+
+    @staticmethod
+    def _collect(future: Future, result: GrepResult, limit: int, stop: threading.Event) -> None:
+        if stop.is_set() and not future.running() and future.cancel():
+            return
+        matches, size, binary, scanned = future.result()
+        if not scanned:
+            return
+        result.files_scanned += 1
+        result.bytes_scanned += size
+        result.binary_skipped += binary
+        room = limit - len(result.matches)
+        if room <= 0:
+            return
+        result.matches.extend(matches[:room])
+        if len(result.matches) >= limit:
+            result.truncated = True
+            stop.set()
+
+    @staticmethod
+    def _iter_files(root: Path, target: Path, glob: Optional[str]) -> Iterator[Path]:
+        """按路径排序遍历普通文件（不跟随越出根目录的符号链接）"""
+        if target.is_file():
+            yield target
+            return
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames[:] = sorted(d for d in dirnames if not is_ignored(d))
+            for name in sorted(filenames):
+                if is_ignored(name) or (glob and not fnmatch.fnmatch(name, glob)):
+                    continue
+                file = Path(dirpath) / name
+                try:
+                    yield validate_path_in_root(file, root)
+                except PathTraversalError:
+                    continue
+
+    def _scan_file(
+        self,
+        root: Path,
+        file: Path,
+        regex: "re.Pattern[bytes]",
+        prefix: bytes,
+        limit: int,
+        stop: threading.Event,
+    ) -> Tuple[List[GrepMatch], int, int, bool]:
+        """扫描单个文件，返回 (匹配, 文件大小, 是否二进制, 是否实际扫描)"""
+        if stop.is_set():
+            return [], 0, 0, False
+        try:
+            with open(file, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return [], 0, 0, True
+                if is_binary(f.read(BINARY_SNIFF_BYTES)):
+                    return [], size, 1, True
+                if size >= self.mmap_threshold:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        found = self._scan(data, regex, prefix, limit, stop)
+                else:
+                    f.seek(0)
+                    found = self._scan(f.read(), regex, prefix, limit, stop)
+        except OSError:
+            return [], 0, 0, False
+        rel = file.relative_to(root).as_posix()
+        return [GrepMatch(rel, n, line) for n, line in found], size, 0, True
+
+    def _scan(
+        self,
+        data: Any,
+        regex: "re.Pattern[bytes]",
+        prefix: bytes,
+        limit: int,
+        stop: threading.Event,
+    ) -> List[Tuple[int, str]]:
+        """在 bytes 或 mmap 上查找匹配行，每行最多记录一次"""
+        found: List[Tuple[int, str]] = []
+        line_number = 1
+        counted_to = 0
+        pos = 0
+        end = len(data)
+        while pos < end and len(found) < limit and not stop.is_set():
+            if prefix:
+                start = data.find(prefix, pos)
+                if start < 0:
+                    break
+                match = regex.match(data, start)
+                if match is None:
+                    pos = start + 1
+                    continue
+            else:
+                match = regex.search(data, pos)
+                if match is None:
+                    break
+                start = match.start()
+            line_start = data.rfind(b"\n", 0, start) + 1
+            line_end = data.find(b"\n", start)
+            if line_end < 0:
+                line_end = end
+            # 行号只统计上一个匹配行之后的换行数
+            line_number += data[counted_to:line_start].count(b"\n")
+            counted_to = line_start
+            line = data[line_start:min(line_end, line_start + self.max_line_chars)]
+            found.append((line_number, line.decode("utf-8", errors="replace").rstrip("\r")))
+            pos = max(line_end + 1, match.end())
+        return found
@@ -0,0 +1,214 @@
+"""list_dir 工具：基于 os.scandir 的目录列举与 stat 指纹缓存"""
+import os
+import stat
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agent.state import Observation
+from src.common.config import Config
+from src.common.ignore import is_ignored
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+
+# 目录项：(名称, 类型)，类型为 dir / file / symlink / other
+DirEntry = Tuple[str, str]
+
+
+def _entry_kind(entry: os.DirEntry) -> str:
+    # 不跟随符号链接：避免成环，也避免列出根目录外的内容
+    if entry.is_symlink():
+        return "symlink"
+    if entry.is_dir(follow_symlinks=False):
+        return "dir"
+    if entry.is_file(follow_symlinks=False):
+        return "file"
+    return "other"
+
+
+class DirListingCache:
+    """目录内容缓存
+
+    以目录路径为键，``(st_mtime_ns, st_ino)`` 为指纹：目录增删或重命名
+    条目会更新其 mtime，因此指纹不变时缓存的条目列表仍然有效。
+    命中时只需一次 ``stat``。
+    """
+
+    def __init__(self, max_dirs: int = 4096) -> None:
+        self.max_dirs = max_dirs
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], List[DirEntry]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def list(self, directory: Path) -> List[DirEntry]:
+        """返回目录的（已按名称排序、已过滤忽略项的）条目"""
+        st = os.stat(directory)
+        if not stat.S_ISDIR(st.st_mode):
+            raise NotADirectoryError(str(directory))
+        key = str(directory)
+        fingerprint = (st.st_mtime_ns, st.st_ino)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        with os.scandir(directory) as it:
+            entries = sorted(
+                (entry.name, _entry_kind(entry)) for entry in it if not is_ignored(entry.name)
+            )
+        with self._lock:
+            self._entries[key] = (fingerprint, entries)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_dirs:
+                self._entries.popitem(last=False)
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"dirs": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_shared_cache: Optional[DirListingCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_listing_cache() -> DirListingCache:
+    """获取进程级共享的目录内容缓存"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DirListingCache()
+        return _shared_cache
+
+
+@dataclass
+class DirListing:
+    """一次列举的结果"""
+    entries: List[Dict[str, str]] = field(default_factory=list)
+    dirs_listed: int = 0
+    truncated: bool = False  # 达到条目上限
+    depth_limited: bool = False  # 存在未展开的更深目录
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "entry_count": len(self.entries),
+            "dirs_listed": self.dirs_listed,
+            "truncated": self.truncated,
+            "depth_limited": self.depth_limited,
+        }
+
+
+class ListDirTool:
+    """list_dir 工具
+
+    - 条目按名称排序，递归列举为深度优先的前序（目录紧跟其内容）
+    - ``max_depth`` 限制递归深度（1 表示只列直接子项），``max_entries``
+      限制返回条目总数
+    - 忽略规则与技能注册表相同（``is_ignored``），符号链接不展开
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 500,
+        max_depth: int = 4,
+        cache: Optional[DirListingCache] = None,
+    ) -> None:
+        """
+        Args:
+            max_entries: 默认的返回条目上限
+            max_depth: 默认的递归深度上限
+            cache: 目录内容缓存（默认使用进程级共享缓存）
+        """
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.cache = cache if cache is not None else get_shared_listing_cache()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ListDirTool":
+        return cls(
+            max_entries=config.get("execution.list_dir.max_entries", 500),
+            max_depth=config.get("execution.list_dir.max_depth", 4),
+        )
+
+    def run(
+        self,
+        root: Path,
+        path: str = ".",
+        recursive: bool = False,
+        max_depth: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        turn: int = 0,
+    ) -> Observation:
+        """列举目录并返回 Observation（错误以失败的 Observation 返回）"""
+        try:
+            listing = self.list(root, path, recursive, max_depth, max_entries)
+        except PathTraversalError as e:
+            return Observation("list_dir", False, None, f"PathTraversalBlocked: {e}", turn=turn)
+        except OSError as e:
+            return Observation("list_dir", False, None, f"IOError: {e}", turn=turn)
+        metadata = listing.to_metadata()
+        metadata["path"] = path
+        return Observation(
+            action_type="list_dir",
+            success=True,
+            output={"entries": listing.entries},
+            metadata=metadata,
+            turn=turn,
+        )
+
+    def list(
+        self,
+        root: Path,
+        path: str = ".",
+        recursive: bool = False,
+        max_depth: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ) -> DirListing:
+        """
+        列举 ``root/path``
+
+        Returns:
+            条目路径相对于 ``path``（POSIX 形式，目录不带尾部斜杠）
+
+        Raises:
+            PathTraversalError: 路径越出根目录
+            OSError: 目录不存在或不可读
+        """
+        if not validate_relative_path(path):
+            raise PathTraversalError(f"Invalid relative path: {path}")
+        directory = validate_path_in_root(Path(root) / path, Path(root))
+        depth_cap = 1 if not recursive else (self.max_depth if max_depth is None else max_depth)
+        entry_cap = self.max_entries if max_entries is None else max_entries
+
+        listing = DirListing()
+        # 栈帧：(目录, 相对前缀, 深度, 条目列表, 下一个下标)
+        stack = [(directory, "", 1, self.cache.list(directory), 0)]
+        listing.dirs_listed = 1
+        while stack:
+            current, prefix, depth, entries, index = stack.pop()
+            if index >= len(entries):
+                continue
+            stack.append((current, prefix, depth, entries, index + 1))
+            name, kind = entries[index]
+            if len(listing.entries) >= entry_cap:
+                listing.truncated = True
+                break
+            rel = prefix + name
+            listing.entries.append({"path": rel, "type": kind})
+            if kind != "dir":
+                continue
+            if depth >= depth_cap:
+                listing.depth_limited = listing.depth_limited or recursive
+                continue
+            try:
+                children = self.cache.list(current / name)
+            except OSError:
+                continue
+            listing.dirs_listed += 1
+            stack.append((current / name, rel + "/", depth + 1, children, 0))
+        return listing
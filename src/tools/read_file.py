@@ -0,0 +1,334 @@
+"""read_file 工具：按字节或行范围分页读取，超大文件返回首尾摘录"""
+import mmap
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agent.state import Observation
+from src.common.config import Config
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+from src.tools.grep import BINARY_SNIFF_BYTES, is_binary
+
+# 行号检查点间隔（字节）：跳行时按块计数换行，并记录块边界处的行号
+_CHUNK_BYTES = 1024 * 1024
+
+# 行号检查点缓存键：(路径, mtime_ns, 大小, inode)
+_CheckpointKey = Tuple[str, int, int, int]
+
+
+class ReadFileError(Exception):
+    """文件无法按请求读取"""
+    pass
+
+
+@dataclass
+class FileSlice:
+    """一次读取的结果"""
+    content: str
+    size: int  # 文件总字节数
+    offset: int  # 返回内容的起始字节偏移
+    end_offset: int  # 返回内容的结束字节偏移（不含）
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    excerpt: bool = False  # 首尾摘录（中间部分省略）
+    omitted_bytes: int = 0
+
+    @property
+    def eof(self) -> bool:
+        return self.end_offset >= self.size
+
+    def to_metadata(self) -> Dict[str, Any]:
+        """分页游标：``next_offset`` / ``next_line`` 可直接用于下一次读取"""
+        metadata: Dict[str, Any] = {
+            "size": self.size,
+            "offset": self.offset,
+            "end_offset": self.end_offset,
+            "bytes_returned": self.end_offset - self.offset - self.omitted_bytes,
+            "excerpt": self.excerpt,
+            "omitted_bytes": self.omitted_bytes,
+            "eof": self.eof,
+            "next_offset": None if self.eof else self.end_offset,
+        }
+        if self.start_line is not None:
+            metadata.update({
+                "start_line": self.start_line,
+                "end_line": self.end_line,
+                "next_line": None if self.eof else self.end_line + 1,
+            })
+        return metadata
+
+
+@dataclass
+class _LineCheckpoints:
+    """文件中已知的 (行号, 字节偏移) 检查点（行号从 1 开始）"""
+    lines: List[int] = field(default_factory=lambda: [1])
+    offsets: List[int] = field(default_factory=lambda: [0])
+
+    def nearest(self, line: int) -> Tuple[int, int]:
+        i = bisect_right(self.lines, line) - 1
+        return self.lines[i], self.offsets[i]
+
+    def add(self, line: int, offset: int) -> None:
+        if offset > self.offsets[-1]:
+            self.lines.append(line)
+            self.offsets.append(offset)
+
+
+def _utf8_boundary(data: bytes, end: int) -> int:
+    """把 end 向前调整到 UTF-8 字符边界（最多回退 3 字节）"""
+    for back in range(min(3, end)):
+        byte = data[end - 1 - back]
+        if byte & 0xC0 != 0x80:
+            # 起始字节：检查其声明的长度是否完整
+            if byte < 0x80:
+                width = 1
+            elif byte >= 0xF0:
+                width = 4
+            elif byte >= 0xE0:
+                width = 3
+            else:
+                width = 2
+            return end if back + 1 >= width else end - 1 - back
+    return end
+
+
+class ReadFileTool:
+    """分页 read_file
+
+    - 无范围读取：不超过 ``max_bytes`` 的文件整体返回，超过时返回首尾各
+      ``excerpt_bytes`` 的摘录与准确的大小元数据
+    - 字节范围（``offset``/``length``）与行范围（``start_line``/``end_line``）
+      读取，单次返回不超过 ``max_bytes``，元数据给出下一页游标
+    - 不小于 ``mmap_threshold`` 的文件用 mmap 读取，只复制请求的片段
+    - 行范围跳转按块统计换行并缓存行号检查点（按文件 stat 指纹失效），
+      跨 turn 连续翻页无需从头扫描
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 2_000_000,
+        excerpt_bytes: int = 8192,
+        mmap_threshold: int = 256 * 1024,
+        max_cached_files: int = 64,
+    ) -> None:
+        """
+        Args:
+            max_bytes: 单次读取返回的最大字节数
+            excerpt_bytes: 超大文件首尾摘录各自的字节数
+            mmap_threshold: 不小于该大小的文件使用 mmap
+            max_cached_files: 缓存行号检查点的文件数
+        """
+        self.max_bytes = max_bytes
+        self.excerpt_bytes = excerpt_bytes
+        self.mmap_threshold = mmap_threshold
+        self.max_cached_files = max_cached_files
+        self._checkpoints: "OrderedDict[_CheckpointKey, _LineCheckpoints]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ReadFileTool":
+        return cls(
+            max_bytes=config.get("security.max_resource_file_bytes", 2_000_000),
+            excerpt_bytes=config.get("execution.read_file.excerpt_bytes", 8192),
+        )
+
+    def run(
+        self,
+        root: Path,
+        path: str,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        turn: int = 0,
+    ) -> Observation:
+        """读取文件并返回 Observation（错误以失败的 Observation 返回）"""
+        try:
+            result = self.read(root, path, offset, length, start_line, end_line)
+        except PathTraversalError as e:
+            return Observation("read_file", False, None, f"PathTraversalBlocked: {e}", turn=turn)
+        except ReadFileError as e:
+            return Observation("read_file", False, None, f"InvalidRequest: {e}", turn=turn)
+        except OSError as e:
+            return Observation("read_file", False, None, f"IOError: {e}", turn=turn)
+        metadata = result.to_metadata()
+        metadata["path"] = path
+        return Observation(
+            action_type="read_file",
+            success=True,
+            output={"content": result.content},
+            metadata=metadata,
+            turn=turn,
+        )
+
+    def read(
+        self,
+        root: Path,
+        path: str,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+    ) -> FileSlice:
+        """
+        读取 ``root/path``
+
+        Args:
+            offset: 起始字节偏移
+            length: 读取字节数（不超过 ``max_bytes``）
+            start_line: 起始行号（从 1 开始，与字节范围互斥）
+            end_line: 结束行号（含）
+
+        Raises:
+            PathTraversalError: 路径越出根目录
+            ReadFileError: 参数非法、目标不是文件或是二进制文件
+        """
+        if not validate_relative_path(path):
+            raise PathTraversalError(f"Invalid relative path: {path}")
+        file = validate_path_in_root(Path(root) / path, Path(root))
+        line_mode = start_line is not None or end_line is not None
+        if line_mode and (offset is not None or length is not None):
+            raise ReadFileError("Byte range and line range are mutually exclusive")
+        for name, value in (("offset", offset), ("length", length), ("start_line", start_line),
+                            ("end_line", end_line)):
+            if value is not None and value < (1 if name.endswith("line") else 0):
+                raise ReadFileError(f"Invalid {name}: {value}")
+        if start_line is not None and end_line is not None and end_line < start_line:
+            raise ReadFileError(f"end_line {end_line} is before start_line {start_line}")
+        if not file.is_file():
+            raise ReadFileError(f"Not a file: {path}")
+
+        with open(file, "rb") as f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            if is_binary(f.read(BINARY_SNIFF_BYTES)):
+                raise ReadFileError(f"Binary file: {path}")
+            if size == 0:
+                return FileSlice("", 0, 0, 0, 1 if line_mode else None, 0 if line_mode else None)
+            if size >= self.mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self._read(data, size, (str(file), st.st_mtime_ns, size, st.st_ino),
+                                      offset, length, start_line, end_line)
+            f.seek(0)
+            data = f.read()
+        return self._read(data, len(data), None, offset, length, start_line, end_line)
+
+    def _read(
+        self,
+        data: Any,
+        size: int,
+        key: Optional[_CheckpointKey],
+        offset: Optional[int],
+        length: Optional[int],
+        start_line: Optional[int],
+        end_line: Optional[int],
+    ) -> FileSlice:
+        if start_line is not None or end_line is not None:
+            return self._read_lines(data, size, key, start_line or 1, end_line)
+        if offset is None and length is None and size > self.max_bytes:
+            return self._excerpt(data, size)
+        start = min(offset or 0, size)
+        want = self.max_bytes if length is None else min(length, self.max_bytes)
+        end = min(size, start + want)
+        if end < size:
+            end = _utf8_boundary(data, end)
+        return FileSlice(_decode(data[start:end]), size, start, end)
+
+    def _excerpt(self, data: Any, size: int) -> FileSlice:
+        """超大文件的首尾摘录（在行边界处截断）"""
+        excerpt = min(self.excerpt_bytes, self.max_bytes // 2)
+        head_end = data.rfind(b"\n", 0, excerpt) + 1 or _utf8_boundary(data, excerpt)
+        tail_start = data.find(b"\n", size - excerpt) + 1 or size - excerpt
+        omitted = tail_start - head_end
+        content = (
+            _decode(data[:head_end])
+            + f"\n...[{omitted} bytes omitted; read with offset/length or start_line/end_line]...\n"
+            + _decode(data[tail_start:])
+        )
+        return FileSlice(content, size, 0, size, excerpt=True, omitted_bytes=omitted)
+
+    def _read_lines(
+        self,
+        data: Any,
+        size: int,
+        key: Optional[_CheckpointKey],
+        start_line: int,
+        end_line: Optional[int],
+    ) -> FileSlice:
+        checkpoints = self._checkpoints_for(key)
+        start = self._seek_line(data, size, start_line, checkpoints)
+        if start is None:
+            return FileSlice("", size, size, size, start_line, start_line - 1)
+
+        # 在字节上限内向后找 end_line 的行尾
+        limit = min(size, start + self.max_bytes)
+        pos = start
+        line = start_line
+        while pos < limit and (end_line is None or line <= end_line):
+            newline = data.find(b"\n", pos, limit)
+            if newline < 0:
+                if limit == size:
+                    pos, line = size, line + 1
+                break
+            pos, line = newline + 1, line + 1
+        if pos == start:
+            # 单行超过字节上限：按字节截断该行，剩余部分用 next_offset 继续读取
+            pos = _utf8_boundary(data, limit)
+            last_line = start_line
+        else:
+            last_line = line - 1
+            if checkpoints is not None and pos < size:
+                with self._lock:
+                    checkpoints.add(line, pos)
+        return FileSlice(_decode(data[start:pos]), size, start, pos, start_line, last_line)
+
+    def _seek_line(
+        self, data: Any, size: int, target: int, checkpoints: Optional[_LineCheckpoints]
+    ) -> Optional[int]:
+        """返回第 target 行的起始偏移（超出文件末尾时返回 None）"""
+        if checkpoints is not None:
+            with self._lock:
+                line, pos = checkpoints.nearest(target)
+        else:
+            line, pos = 1, 0
+        while line < target:
+            chunk_end = min(size, pos + _CHUNK_BYTES)
+            chunk = data[pos:chunk_end]
+            count = chunk.count(b"\n")
+            if line + count < target:
+                if chunk_end >= size:
+                    return None
+                if checkpoints is not None and count:
+                    # 块边界通常落在行中间，只记录块内最后一个换行之后的真实行首
+                    with self._lock:
+                        checkpoints.add(line + count, pos + chunk.rfind(b"\n") + 1)
+                line, pos = line + count, chunk_end
+                continue
+            for _ in range(target - line):
+                pos = data.find(b"\n", pos) + 1
+            line = target
+        return pos if pos < size or target == 1 else None
+
+    def _checkpoints_for(self, key: Optional[_CheckpointKey]) -> Optional[_LineCheckpoints]:
+        if key is None:
+            return None
+        with self._lock:
+            checkpoints = self._checkpoints.get(key)
+            if checkpoints is None:
+                # 同一路径的旧指纹条目失效
+                for stale in [k for k in self._checkpoints if k[0] == key[0]]:
+                    del self._checkpoints[stale]
+                checkpoints = self._checkpoints[key] = _LineCheckpoints()
+                while len(self._checkpoints) > self.max_cached_files:
+                    self._checkpoints.popitem(last=False)
+            else:
+                self._checkpoints.move_to_end(key)
+            return checkpoints
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
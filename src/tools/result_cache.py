@@ -0,0 +1,162 @@
+"""确定性脚本的执行结果缓存（磁盘存储，按大小与 TTL 淘汰）"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from src.common.config import Config
+from src.common.disk_lru import DiskLRUStore
+from src.common.hash_utils import compute_file_hash, compute_text_hash
+from src.common.security import PathTraversalError, validate_path_in_root, validate_relative_path
+from src.tools.executor import ScriptResult
+
+# 缓存格式版本，结构变化时递增使旧条目失效
+_FORMAT_VERSION = 1
+
+
+class ScriptResultCache:
+    """脚本结果缓存
+
+    键由以下内容的规范化 JSON 的 SHA256 组成：
+    - 脚本文件哈希（``compute_file_hash``）
+    - 参数列表与显式传入的环境变量
+    - 声明的输入文件（相对路径 + 文件哈希）
+
+    每个条目存为 ``<dir>/<key[:2]>/<key>.json``。超时的结果不缓存；超过
+    ``max_entry_bytes`` 的结果不缓存；总量超过 ``max_bytes`` 时按最近
+    使用时间淘汰；读取时丢弃超过 ``ttl_sec`` 的条目。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+        ttl_sec: float = 86400,
+    ) -> None:
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总字节数上限
+            max_entry_bytes: 单个条目字节数上限
+            ttl_sec: 条目有效期（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_sec = ttl_sec
+        self._store = DiskLRUStore(self.cache_dir, max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["ScriptResultCache"]:
+        """根据 ``execution.script_cache`` 配置创建缓存（未启用时返回 None）"""
+        if not config.get("execution.script_cache.enabled", False):
+            return None
+        return cls(
+            cache_dir=Path(config.get("execution.script_cache.dir", ".agent/cache/scripts")),
+            max_bytes=config.get("execution.script_cache.max_bytes", 64 * 1024 * 1024),
+            max_entry_bytes=config.get("execution.script_cache.max_entry_bytes", 1024 * 1024),
+            ttl_sec=config.get("execution.script_cache.ttl_sec", 86400),
+        )
+
+    @staticmethod
+    def make_key(
+        script: Path,
+        args: Sequence[str],
+        env: Optional[Dict[str, str]],
+        inputs: Sequence[Tuple[str, Path]] = (),
+    ) -> str:
+        """
+        计算缓存键
+
+        Args:
+            script: 脚本路径
+            args: 参数列表
+            env: 调用方显式传入的环境变量（白名单继承的变量不参与）
+            inputs: (相对路径, 绝对路径) 形式的输入文件；不存在的文件记为 None
+        """
+        payload = {
+            "v": _FORMAT_VERSION,
+            "script": compute_file_hash(script),
+            "args": list(args),
+            "env": sorted((env or {}).items()),
+            "inputs": [
+                [rel, compute_file_hash(path) if path.is_file() else None]
+                for rel, path in sorted(inputs)
+            ],
+        }
+        return compute_text_hash(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+
+    @staticmethod
+    def resolve_inputs(
+        skill_dir: Path, relative_paths: Sequence[str]
+    ) -> Sequence[Tuple[str, Path]]:
+        """校验技能目录内的输入文件路径"""
+        resolved = []
+        for rel in relative_paths:
+            if not validate_relative_path(rel):
+                raise PathTraversalError(f"Invalid relative path: {rel}")
+            resolved.append((rel, validate_path_in_root(skill_dir / rel, skill_dir)))
+        return resolved
+
+    def get(self, key: str) -> Optional[ScriptResult]:
+        """查询缓存，未命中、过期或损坏时返回 None"""
+        with self._lock:
+            raw = self._store.read(key)
+            try:
+                data = json.loads(raw.decode("utf-8")) if raw is not None else None
+            except ValueError:
+                data = None
+            if data is None or time.time() - data.get("created_at", 0) > self.ttl_sec:
+                if raw is not None:
+                    self._store.drop(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+        result = data["result"]
+        return ScriptResult(
+            exit_code=result["exit_code"],
+            stdout=result["stdout"],
+            stderr=result["stderr"],
+            stdout_dropped_bytes=result.get("stdout_dropped_bytes", 0),
+            stderr_dropped_bytes=result.get("stderr_dropped_bytes", 0),
+        )
+
+    def put(self, key: str, result: ScriptResult) -> bool:
+        """写入缓存，返回是否写入（超时或超过单项上限时不写入）"""
+        if result.timed_out:
+            return False
+        entry = json.dumps({
+            "created_at": time.time(),
+            "result": {
+                "exit_code": result.exit_code,
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+                "stdout_dropped_bytes": result.stdout_dropped_bytes,
+                "stderr_dropped_bytes": result.stderr_dropped_bytes,
+            },
+        }, ensure_ascii=False).encode("utf-8")
+        if len(entry) > self.max_entry_bytes:
+            return False
+
+        with self._lock:
+            self._store.write(key, entry)
+        return True
+
+    def clear(self) -> None:
+        """删除所有缓存条目"""
+        with self._lock:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._store),
+                "bytes": self._store.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,346 @@
+"""工具运行时：把动作分派给具体工具，产出 Observation"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.agent.actions import (
+    READ_ONLY_ACTION_TYPES,
+    Action,
+    BatchAction,
+    GrepAction,
+    ListDirAction,
+    LoadResourceAction,
+    ReadFileAction,
+    RunScriptAction,
+    SkillReference,
+)
+from src.agent.events import Event, EventStream, EventType
+from src.agent.state import Observation, ToolBudget
+from src.common.config import Config
+from src.common.security import PathTraversalError
+from src.skills.dependencies import SkillLookup
+from src.skills.loader import SkillLoadError, SkillLoader
+from src.skills.metadata import SkillMetadata
+from src.tools.executor import ScriptExecutor
+from src.tools.grep import GrepTool
+from src.tools.list_dir import ListDirTool
+from src.tools.read_file import ReadFileTool
+
+# 受 ``execution.allowed_tools`` 与技能 ``allowed-tools`` 约束的动作
+TOOL_ACTION_TYPES = frozenset({"read_file", "list_dir", "grep", "run_script"})
+
+# 工具处理函数：(动作, 技能, 预算, 轮次) -> 观察结果
+_Handler = Callable[[Action, SkillMetadata, Optional[ToolBudget], int], Observation]
+
+
+class ToolsRuntime:
+    """工具运行时
+
+    - ``execute`` 执行单个工具动作，每次消耗一次工具调用预算
+    - ``execute_batch`` 执行批量只读动作：整体校验（动作类型、参数、
+      剩余工具调用预算），通过后在线程池中并发执行，按原顺序返回观察结果；
+      任一项校验失败则整批不执行
+    - ``execute_async`` / ``execute_batch_async`` 是对应的 asyncio 版本，
+      便于在同一进程中运行多个 agent；同步方法保留给 CLI 使用
+    """
+
+    def __init__(
+        self,
+        registry: SkillLookup,
+        loader: SkillLoader,
+        executor: Optional[ScriptExecutor] = None,
+        read_file: Optional[ReadFileTool] = None,
+        list_dir: Optional[ListDirTool] = None,
+        grep: Optional[GrepTool] = None,
+        allowed_tools: Optional[Sequence[str]] = None,
+        max_batch_workers: int = 4,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+    ) -> None:
+        """
+        Args:
+            registry: 技能注册表（解析动作中的技能引用）
+            loader: 技能加载器（load_resource）
+            executor: 脚本执行器（run_script）
+            read_file / list_dir / grep: 文件工具
+            allowed_tools: 允许的工具，None 表示不限制
+            max_batch_workers: 批量动作的并发数
+            event_stream: 可选事件流（发送 RESOURCE_LOADED）
+            run_id: 事件所属的 run ID
+        """
+        self.registry = registry
+        self.loader = loader
+        self.executor = executor or ScriptExecutor()
+        self.read_file = read_file or ReadFileTool()
+        self.list_dir = list_dir or ListDirTool()
+        self.grep = grep or GrepTool()
+        self.allowed_tools = set(allowed_tools) if allowed_tools is not None else None
+        self.max_batch_workers = max_batch_workers
+        self.event_stream = event_stream
+        self.run_id = run_id
+        self._handlers: Dict[str, _Handler] = {
+            "load_resource": self._load_resource,
+            "read_file": self._read_file,
+            "list_dir": self._list_dir,
+            "grep": self._grep,
+            "run_script": self._run_script,
+        }
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Config,
+        registry: SkillLookup,
+        loader: SkillLoader,
+        event_stream: Optional[EventStream] = None,
+        run_id: str = "",
+    ) -> "ToolsRuntime":
+        return cls(
+            registry=registry,
+            loader=loader,
+            executor=ScriptExecutor.from_config(config),
+            read_file=ReadFileTool.from_config(config),
+            list_dir=ListDirTool.from_config(config),
+            grep=GrepTool.from_config(config),
+            allowed_tools=config.get("execution.allowed_tools"),
+            max_batch_workers=config.get("execution.max_batch_workers", 4),
+            event_stream=event_stream,
+            run_id=run_id,
+        )
+
+    def execute(
+        self, action: Action, budget: Optional[ToolBudget] = None, turn: int = 0
+    ) -> Observation:
+        """执行单个工具动作（批量动作请用 ``execute_batch``）"""
+        skill, rejected = self._admit(action, budget, turn)
+        if rejected is not None:
+            return rejected
+        return self._handlers[action.action_type()](action, skill, budget, turn)
+
+    def execute_batch(
+        self, batch: BatchAction, budget: Optional[ToolBudget] = None, turn: int = 0
+    ) -> List[Observation]:
+        """
+        并发执行批量只读动作
+
+        Returns:
+            与 ``batch.actions`` 顺序一致的观察结果；整批被拒绝时返回
+            单个失败的 ``batch`` 观察结果
+        """
+        skills, rejected = self._admit_batch(batch, budget, turn)
+        if rejected is not None:
+            return [rejected]
+        workers = max(1, min(self.max_batch_workers, len(batch.actions)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool-batch") as pool:
+            futures = [
+                pool.submit(self._handlers[a.action_type()], a, skill, None, turn)
+                for a, skill in zip(batch.actions, skills)
+            ]
+            observations = [f.result() for f in futures]
+        return _tag_batch(observations)
+
+    async def execute_async(
+        self, action: Action, budget: Optional[ToolBudget] = None, turn: int = 0
+    ) -> Observation:
+        """
+        ``execute`` 的 asyncio 版本
+
+        run_script 使用 ``ScriptExecutor.run_script_async``；文件工具在线程中
+        执行。协程被取消时发送 ``ERROR_OCCURRED`` 事件并继续抛出
+        ``asyncio.CancelledError``（脚本的子进程组会被杀死）。
+        """
+        skill, rejected = self._admit(action, budget, turn)
+        if rejected is not None:
+            return rejected
+        return await self._dispatch_async(action, skill, budget, turn)
+
+    async def execute_batch_async(
+        self, batch: BatchAction, budget: Optional[ToolBudget] = None, turn: int = 0
+    ) -> List[Observation]:
+        """``execute_batch`` 的 asyncio 版本（并发度同样受 ``max_batch_workers`` 限制）"""
+        skills, rejected = self._admit_batch(batch, budget, turn)
+        if rejected is not None:
+            return [rejected]
+        slots = asyncio.Semaphore(max(1, self.max_batch_workers))
+
+        async def run(action: Action, skill: SkillMetadata) -> Observation:
+            async with slots:
+                return await self._dispatch_async(action, skill, None, turn)
+
+        observations = await asyncio.gather(*(run(a, s) for a, s in zip(batch.actions, skills)))
+        return _tag_batch(list(observations))
+
+    async def _dispatch_async(
+        self, action: Action, skill: SkillMetadata, budget: Optional[ToolBudget], turn: int
+    ) -> Observation:
+        action_type = action.action_type()
+        if isinstance(action, RunScriptAction):
+            return await self.executor.run_script_async(
+                skill, action.relative_path, action.args, action.env or None,
+                turn=turn, budget=budget, event_stream=self.event_stream, run_id=self.run_id,
+            )
+        try:
+            return await asyncio.to_thread(self._handlers[action_type], action, skill, budget, turn)
+        except asyncio.CancelledError:
+            # 线程中的文件读取无法中断，放弃其结果
+            if self.event_stream is not None:
+                self.event_stream.emit(Event(EventType.ERROR_OCCURRED, self.run_id, turn, {
+                    "error": f"Cancelled: {action_type} was cancelled",
+                    "action_type": action_type,
+                    "skill": skill.name,
+                }))
+            raise
+
+    def _admit(
+        self, action: Action, budget: Optional[ToolBudget], turn: int
+    ) -> Tuple[Optional[SkillMetadata], Optional[Observation]]:
+        """校验单个动作并扣减工具调用预算，返回 (技能, 拒绝时的 Observation)"""
+        action_type = action.action_type()
+        if action_type not in self._handlers:
+            return None, Observation(
+                action_type, False, None, f"UnsupportedAction: {action_type}", turn=turn
+            )
+        if not action.validate():
+            return None, Observation(
+                action_type, False, None, "InvalidAction: validation failed", turn=turn
+            )
+        if budget is not None and budget.tool_calls_used >= budget.max_tool_calls:
+            return None, Observation(
+                action_type, False, None,
+                f"BudgetExceeded: tool call budget exhausted "
+                f"({budget.tool_calls_used}/{budget.max_tool_calls})",
+                turn=turn,
+            )
+        skill, error = self._resolve(action)
+        if error is not None:
+            return None, Observation(action_type, False, None, error, turn=turn)
+        if budget is not None:
+            budget.consume_tool_call()
+        return skill, None
+
+    def _admit_batch(
+        self, batch: BatchAction, budget: Optional[ToolBudget], turn: int
+    ) -> Tuple[List[SkillMetadata], Optional[Observation]]:
+        """整体校验批量动作并扣减预算，返回 (各项技能, 拒绝时的 Observation)"""
+        error = self._validate_batch(batch, budget)
+        if error is not None:
+            return [], Observation("batch", False, None, error, turn=turn)
+        skills = []
+        for i, action in enumerate(batch.actions):
+            skill, error = self._resolve(action)
+            if error is not None:
+                return [], Observation("batch", False, None, f"{error} (item {i})", turn=turn)
+            skills.append(skill)
+        if budget is not None:
+            for _ in batch.actions:
+                budget.consume_tool_call()
+        return skills, None
+
+    def _validate_batch(self, batch: BatchAction, budget: Optional[ToolBudget]) -> Optional[str]:
+        if not batch.actions:
+            return "InvalidAction: empty batch"
+        if not batch.validate():
+            for i, action in enumerate(batch.actions):
+                if action.action_type() not in READ_ONLY_ACTION_TYPES:
+                    return (f"InvalidAction: {action.action_type()} "
+                            f"is not allowed in a batch (item {i})")
+                if not action.validate():
+                    return f"InvalidAction: validation failed (item {i})"
+            return f"InvalidAction: batch has {len(batch.actions)} actions"
+        if budget is not None:
+            remaining = budget.max_tool_calls - budget.tool_calls_used
+            if len(batch.actions) > remaining:
+                return (f"BudgetExceeded: batch needs {len(batch.actions)} tool calls, "
+                        f"{remaining} remaining")
+        return None
+
+    def _resolve(self, action: Action) -> Tuple[Optional[SkillMetadata], Optional[str]]:
+        """解析技能引用并检查工具权限，返回 (技能, 错误)"""
+        action_type = action.action_type()
+        ref: SkillReference = action.skill  # type: ignore[attr-defined]
+        skill = self.registry.find_skill(ref.name, ref.source)
+        if skill is None:
+            return None, f"SkillNotFound: {ref.name}"
+        if action_type in TOOL_ACTION_TYPES:
+            if self.allowed_tools is not None and action_type not in self.allowed_tools:
+                return None, f"ToolNotAllowed: {action_type}"
+            if skill.allowed_tools is not None and action_type not in skill.allowed_tools:
+                return None, f"ToolNotAllowed: {action_type} for skill {skill.name}"
+        return skill, None
+
+    def _load_resource(
+        self,
+        action: LoadResourceAction,
+        skill: SkillMetadata,
+        budget: Optional[ToolBudget],
+        turn: int,
+    ) -> Observation:
+        try:
+            excerpt = self.loader.load_resource(
+                skill.path, action.relative_path, action.section_hint
+            )
+        except PathTraversalError as e:
+            return Observation(
+                "load_resource", False, None, f"PathTraversalBlocked: {e}", turn=turn
+            )
+        except SkillLoadError as e:
+            return Observation("load_resource", False, None, f"IOError: {e}", turn=turn)
+        if self.event_stream is not None:
+            self.event_stream.emit(Event(EventType.RESOURCE_LOADED, self.run_id, turn, {
+                "skill": skill.name,
+                "relative_path": action.relative_path,
+                "section": excerpt.section,
+                "bytes_read": excerpt.bytes_read,
+            }))
+        metadata = excerpt.to_dict()
+        metadata["skill"] = skill.name
+        return Observation(
+            action_type="load_resource",
+            success=True,
+            output={"text": excerpt.text},
+            metadata=metadata,
+            turn=turn,
+        )
+
+    def _read_file(
+        self, action: ReadFileAction, skill: SkillMetadata, budget: Optional[ToolBudget], turn: int
+    ) -> Observation:
+        observation = self.read_file.run(
+            skill.path, action.relative_path, action.offset, action.length,
+            action.start_line, action.end_line, turn=turn,
+        )
+        observation.metadata["skill"] = skill.name
+        return observation
+
+    def _list_dir(
+        self, action: ListDirAction, skill: SkillMetadata, budget: Optional[ToolBudget], turn: int
+    ) -> Observation:
+        observation = self.list_dir.run(
+            skill.path, action.relative_path, action.recursive, action.max_depth, turn=turn
+        )
+        observation.metadata["skill"] = skill.name
+        return observation
+
+    def _grep(
+        self, action: GrepAction, skill: SkillMetadata, budget: Optional[ToolBudget], turn: int
+    ) -> Observation:
+        observation = self.grep.run(
+            skill.path, action.pattern, action.relative_path, action.glob,
+            action.ignore_case, action.fixed_string, turn=turn,
+        )
+        observation.metadata["skill"] = skill.name
+        return observation
+
+    def _run_script(
+        self, action: RunScriptAction, skill: SkillMetadata, budget: Optional[ToolBudget], turn: int
+    ) -> Observation:
+        return self.executor.run_script(
+            skill, action.relative_path, action.args, action.env or None,
+            turn=turn, budget=budget, event_stream=self.event_stream, run_id=self.run_id,
+        )
+
+
+def _tag_batch(observations: List[Observation]) -> List[Observation]:
+    for index, observation in enumerate(observations):
+        observation.metadata["batch_index"] = index
+    return observations
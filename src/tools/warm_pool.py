@@ -0,0 +1,392 @@
+"""预热 Python 解释器池（forkserver 风格）
+
+常驻一个已导入预加载模块的 Python 进程（zygote），每次执行脚本时由它
+fork 出全新的子进程，在子进程中隔离 cwd / 环境变量 / argv 后用 ``runpy``
+运行脚本，省去解释器启动与公共模块导入的开销。
+
+父进程与 zygote 通过 UNIX socket 通信：请求为 JSON，stdout/stderr 管道的
+写端以 SCM_RIGHTS 传递；zygote 在子进程退出后、回收之前整组清理残留的
+子孙进程，再用 ``os.wait4`` 回收并回报退出状态与资源用量。超时由父进程请求
+zygote 终止进程组：只有 zygote 知道子进程是否已被回收（回收后进程组 ID
+可能被复用），父进程不直接向进程组发信号。
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from src.common.logging_config import get_logger
+from src.skills.metadata import ResourceLimits
+from src.tools.executor import ScriptResult, _Capture, _drain
+
+logger = get_logger(__name__)
+
+_SOCK_TYPE = getattr(socket, "SOCK_SEQPACKET", socket.SOCK_DGRAM)
+_MAX_MESSAGE = 1024 * 1024
+# 超时后等待 zygote 回报 pid、终止子进程的时间，超过则视为 zygote 无响应
+_ZYGOTE_GRACE_SEC = 1.0
+
+_ZYGOTE_SOURCE = r'''
+# runpy 在调用时才导入 pkgutil，预先导入避免每个子进程重复导入
+import json, os, pkgutil, resource, runpy, selectors, signal, socket, sys, traceback
+
+def _child(req, fds):
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.setsid()
+    memory = req["max_memory_mb"] * 1024 * 1024
+    if memory > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    cpu = max(1, req["max_cpu_sec"])
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(fds[0], 1)
+    os.dup2(fds[1], 2)
+    os.closerange(3, 65536)
+    code = 0
+    try:
+        os.chdir(req["cwd"])
+        os.environ.clear()
+        os.environ.update(req["env"])
+        sys.argv = [req["script"]] + req["args"]
+        sys.path[0] = os.path.dirname(req["script"])
+        runpy.run_path(req["script"], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code & 0xFF)
+
+def main():
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    failed = []
+    for name in json.loads(sys.argv[2]):
+        try:
+            __import__(name)
+        except Exception as e:
+            failed.append(name + ": " + str(e))
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ, "request")
+    sel.register(wake_r, selectors.EVENT_READ, "child")
+    sock.send(json.dumps({"event": "ready", "preload_errors": failed}).encode())
+    pending = {}
+    while True:
+        for key, _ in sel.select():
+            if key.data == "request":
+                msg, fds, _, _ = socket.recv_fds(sock, %(max_message)d, 2)
+                if not msg:
+                    return
+                req = json.loads(msg)
+                if req.get("event") == "kill":
+                    # 仍在 pending 中说明尚未回收，进程组 ID 不会被复用
+                    for pid, rid in pending.items():
+                        if rid == req["id"]:
+                            try:
+                                os.killpg(pid, signal.SIGKILL)
+                            except OSError:
+                                pass
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    sel.close()
+                    sock.close()
+                    _child(req, fds)
+                for fd in fds:
+                    os.close(fd)
+                pending[pid] = req["id"]
+                sock.send(json.dumps({"event": "started", "id": req["id"], "pid": pid}).encode())
+            else:
+                os.read(wake_r, 4096)
+                while pending:
+                    try:
+                        info = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+                    except ChildProcessError:
+                        break
+                    if info is None:
+                        break
+                    # 子进程仍是僵尸时进程组 ID 不会被复用：先清理残留的子孙进程再回收
+                    try:
+                        os.killpg(info.si_pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+                    pid, status, usage = os.wait4(info.si_pid, 0)
+                    sock.send(json.dumps({
+                        "event": "exit", "id": pending.pop(pid, None),
+                        "exit_code": os.waitstatus_to_exitcode(status),
+                        "cpu_time_sec": usage.ru_utime + usage.ru_stime,
+                        "peak_rss_kb": usage.ru_maxrss,
+                    }).encode())
+
+main()
+''' % {"max_message": _MAX_MESSAGE}
+
+
+class WarmPoolError(Exception):
+    """预热进程不可用（脚本尚未启动，可安全退回普通子进程）"""
+    pass
+
+
+class _Request:
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self.pid: Optional[int] = None
+        self.exit: Dict[str, Any] = {}
+        self.sock: Optional[socket.socket] = None
+
+
+class WarmPythonPool:
+    """预热 Python 解释器池
+
+    只有一个常驻 zygote；并发由 ``ScriptExecutor`` 的信号量控制，
+    每个请求 fork 一个子进程。zygote 退出后下次请求时自动重启。
+    """
+
+    def __init__(self, preload: Sequence[str] = (), python: str = sys.executable) -> None:
+        """
+        Args:
+            preload: zygote 启动时预先导入的模块
+            python: Python 解释器路径
+        """
+        self.preload = list(preload)
+        self.python = python
+        self.preload_errors: list = []
+        self._proc: Optional[subprocess.Popen] = None
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[threading.Thread] = None
+        self._requests: Dict[int, _Request] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """启动 zygote（已在运行则直接返回）"""
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                return
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        parent, child = socket.socketpair(socket.AF_UNIX, _SOCK_TYPE)
+        with child:
+            self._proc = subprocess.Popen(
+                [self.python, "-c", _ZYGOTE_SOURCE, str(child.fileno()), json.dumps(self.preload)],
+                pass_fds=(child.fileno(),),
+                stdin=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        ready = parent.recv(_MAX_MESSAGE)
+        if not ready:
+            parent.close()
+            raise WarmPoolError("Warm pool failed to start")
+        self.preload_errors = json.loads(ready).get("preload_errors", [])
+        for error in self.preload_errors:
+            logger.warning("Warm pool preload failed: %s", error)
+        self._sock = parent
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(parent,), name="warm-pool-reader", daemon=True
+        )
+        self._reader.start()
+
+    def run(
+        self,
+        script: Path,
+        args: Sequence[str],
+        limits: ResourceLimits,
+        env: Dict[str, str],
+        cwd: Path,
+        out: _Capture,
+        err: _Capture,
+    ) -> ScriptResult:
+        """
+        在 fork 出的子进程中运行 Python 脚本
+
+        Args:
+            out: stdout 缓冲
+            err: stderr 缓冲
+
+        Raises:
+            WarmPoolError: zygote 不可用且脚本尚未启动
+        """
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        request = _Request()
+        start = time.perf_counter()
+        try:
+            with self._lock:
+                if self._proc is None or self._proc.poll() is not None:
+                    self._start_locked()
+                request_id = self._next_id
+                self._next_id += 1
+                self._requests[request_id] = request
+                request.sock = self._sock
+                payload = json.dumps({
+                    "id": request_id,
+                    "script": str(script),
+                    "args": list(args),
+                    "env": env,
+                    "cwd": str(cwd),
+                    "max_memory_mb": limits.max_memory_mb,
+                    "max_cpu_sec": limits.max_script_time_sec,
+                }).encode()
+                socket.send_fds(self._sock, [payload], [out_w, err_w])
+        except (OSError, WarmPoolError) as e:
+            with self._lock:
+                self._requests = {k: v for k, v in self._requests.items() if v is not request}
+            for fd in (out_r, err_r):
+                os.close(fd)
+            raise WarmPoolError(f"Warm pool unavailable: {e}") from e
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+
+        readers = [
+            threading.Thread(target=_drain, args=(os.fdopen(out_r, "rb"), out), daemon=True),
+            threading.Thread(target=_drain, args=(os.fdopen(err_r, "rb"), err), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        timeout = limits.max_script_time_sec
+        timed_out = not request.finished.wait(timeout if timeout > 0 else None)
+        if timed_out:
+            if request.started.wait(_ZYGOTE_GRACE_SEC):
+                self._send_kill(request.sock, request_id)
+            if not request.finished.wait(_ZYGOTE_GRACE_SEC):
+                # zygote 无响应：回收 zygote，等待中的请求随连接断开而结束
+                self._recycle(request.sock, request.pid)
+                request.finished.wait()
+        wall = time.perf_counter() - start
+        for reader in readers:
+            # zygote 未响应时其持有的管道写端可能不会关闭
+            reader.join(None if request.pid is not None else 1.0)
+
+        exit_info = request.exit
+        return ScriptResult(
+            exit_code=exit_info.get("exit_code", -1),
+            stdout=out.text(),
+            stderr=err.text() + exit_info.get("error", ""),
+            timed_out=timed_out,
+            wall_time_sec=wall,
+            cpu_time_sec=exit_info.get("cpu_time_sec", 0.0),
+            peak_rss_kb=exit_info.get("peak_rss_kb", 0),
+            stdout_dropped_bytes=out.dropped,
+            stderr_dropped_bytes=err.dropped,
+            stdout_path=out.spill_path,
+            stderr_path=err.spill_path,
+        )
+
+    def close(self) -> None:
+        """关闭 zygote（已启动的子进程不受影响）"""
+        with self._lock:
+            sock, self._sock = self._sock, None
+            proc, self._proc = self._proc, None
+        if sock is not None:
+            # shutdown 会唤醒阻塞在 recv 上的读取线程，并让 zygote 读到 EOF
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if proc is not None:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def _send_kill(self, sock: Optional[socket.socket], request_id: int) -> None:
+        """请求 zygote 整组终止子进程（子进程已被回收时 zygote 忽略该请求）"""
+        if sock is None:
+            return
+        try:
+            with self._lock:
+                sock.send(json.dumps({"event": "kill", "id": request_id}).encode())
+        except OSError:
+            pass
+
+    def _recycle(self, sock: Optional[socket.socket], pid: Optional[int] = None) -> None:
+        """
+        终止无响应的 zygote（仅当它仍是当前实例），下次请求时重新启动
+
+        已知子进程 pid 时，先暂停 zygote 并确认其已停止，保证子进程不会在此期间
+        被回收，再整组终止子进程。
+        """
+        with self._lock:
+            if sock is None or sock is not self._sock:
+                return
+            proc, self._proc = self._proc, None
+            self._sock = None
+        logger.warning("Warm pool zygote is unresponsive; restarting it")
+        if proc is not None:
+            if pid is not None:
+                try:
+                    proc.send_signal(signal.SIGSTOP)
+                    info = os.waitid(os.P_PID, proc.pid, os.WSTOPPED | os.WEXITED | os.WNOWAIT)
+                    # zygote 已退出时子进程可能已被回收，不再发信号
+                    if info is not None and info.si_code == os.CLD_STOPPED:
+                        os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            proc.kill()
+            proc.wait()
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        """分发 zygote 的 started / exit 消息；连接断开时结束所有等待中的请求"""
+        while True:
+            try:
+                msg = sock.recv(_MAX_MESSAGE)
+            except OSError:
+                msg = b""
+            if not msg:
+                break
+            data = json.loads(msg)
+            with self._lock:
+                request = self._requests.get(data.get("id"))
+                if data["event"] == "exit":
+                    self._requests.pop(data.get("id"), None)
+            if request is None:
+                continue
+            if data["event"] == "started":
+                request.pid = data["pid"]
+                request.started.set()
+            elif data["event"] == "exit":
+                request.exit = data
+                request.finished.set()
+
+        with self._lock:
+            orphans = [rid for rid, r in self._requests.items() if r.sock is sock]
+            orphans = [self._requests.pop(rid) for rid in orphans]
+        for request in orphans:
+            request.exit = {"exit_code": -1, "error": "\n[warm pool exited unexpectedly]\n"}
+            request.finished.set()
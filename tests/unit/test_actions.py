@@ -6,6 +6,11 @@ from src.agent.actions import (
     RunScriptAction,
     FinalAnswerAction,
     PlanUpdateAction,
+    ReadFileAction,
+    ListDirAction,
+    GrepAction,
+    BatchAction,
+    MAX_BATCH_SIZE,
     parse_action,
 )
 
@@ -261,6 +266,49 @@ def test_plan_update_action_type():
     assert action.action_type() == "plan_update"
 
 
+# ──────────────────────────────────────────
+# 只读工具动作与 BatchAction
+# ──────────────────────────────────────────
+
+def test_read_only_tool_actions_roundtrip():
+    ref = SkillReference(name="s")
+    read = ReadFileAction(skill=ref, relative_path="docs/a.md", start_line=5, end_line=9)
+    restored = parse_action(read.to_dict())
+    assert isinstance(restored, ReadFileAction)
+    assert (restored.start_line, restored.end_line, restored.offset) == (5, 9, None)
+
+    listing = parse_action({"action": "list_dir", "skill": {"name": "s"}, "recursive": True})
+    assert isinstance(listing, ListDirAction) and listing.relative_path == "."
+
+    grep = GrepAction(skill=ref, pattern="TODO", glob="*.py")
+    assert parse_action(grep.to_dict()).glob == "*.py"
+    assert GrepAction(skill=ref, pattern="").validate() is False
+    assert ReadFileAction(skill=ref, relative_path="../x").validate() is False
+
+
+def test_batch_action():
+    ref = SkillReference(name="s")
+    batch = BatchAction(
+        actions=[
+            ReadFileAction(skill=ref, relative_path="a.md"),
+            GrepAction(skill=ref, pattern="x"),
+        ],
+        reason="explore",
+    )
+    assert batch.validate() is True
+    restored = parse_action(batch.to_dict())
+    assert isinstance(restored, BatchAction)
+    assert [a.action_type() for a in restored.actions] == ["read_file", "grep"]
+
+    assert BatchAction(actions=[]).validate() is False
+    too_many = [LoadResourceAction(skill=ref, relative_path="a.md")] * (MAX_BATCH_SIZE + 1)
+    assert BatchAction(actions=too_many).validate() is False
+    script = RunScriptAction(skill=ref, relative_path="r.sh")
+    assert BatchAction(actions=[script]).validate() is False
+    with pytest.raises(ValueError, match="not allowed in batch"):
+        parse_action({"action": "batch", "actions": [{"action": "final_answer", "answer": "x"}]})
+
+
 # ──────────────────────────────────────────
 # parse_action 工厂函数
 # ──────────────────────────────────────────
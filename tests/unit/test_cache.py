@@ -0,0 +1,87 @@
+"""SkillBodyCache 单元测试"""
+import threading
+
+from src.skills.cache import CachedBody, SkillBodyCache, get_shared_body_cache
+
+
+def _entry(text: str, tokens: int = 0) -> CachedBody:
+    return CachedBody(
+        body=text, token_estimate=tokens or len(text) // 4,
+        body_hash="h", size_bytes=len(text),
+    )
+
+
+def test_get_miss_then_hit():
+    cache = SkillBodyCache()
+    key = ("/a/SKILL.md", 1, 10, 500)
+    assert cache.get(key) is None
+    entry = cache.put(key, _entry("body"))
+    assert cache.get(key) is entry
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction_by_bytes():
+    cache = SkillBodyCache(max_bytes=10)
+    cache.put(("a", 1, 4, 500), _entry("aaaa"))
+    cache.put(("b", 1, 4, 500), _entry("bbbb"))
+    cache.get(("a", 1, 4, 500))  # a 变为最近使用
+    cache.put(("c", 1, 4, 500), _entry("cccc"))
+    assert ("b", 1, 4, 500) not in cache
+    assert ("a", 1, 4, 500) in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+def test_eviction_by_tokens():
+    cache = SkillBodyCache(max_bytes=None, max_tokens=5)
+    cache.put(("a", 1, 1, 500), _entry("x", tokens=3))
+    cache.put(("b", 1, 1, 500), _entry("y", tokens=3))
+    assert len(cache) == 1
+    assert cache.stats()["tokens"] == 3
+
+
+def test_oversized_entry_not_cached():
+    cache = SkillBodyCache(max_bytes=3)
+    entry = cache.put(("a", 1, 10, 500), _entry("too long"))
+    assert entry.body == "too long"
+    assert len(cache) == 0
+
+
+def test_new_version_replaces_stale_path():
+    cache = SkillBodyCache()
+    cache.put(("a", 1, 4, 500), _entry("old!"))
+    cache.put(("a", 2, 4, 500), _entry("new!"))
+    assert len(cache) == 1
+    assert cache.get(("a", 2, 4, 500)).body == "new!"
+
+
+def test_put_existing_returns_shared_entry():
+    cache = SkillBodyCache()
+    first = cache.put(("a", 1, 4, 500), _entry("body"))
+    second = cache.put(("a", 1, 4, 500), _entry("body"))
+    assert second is first
+
+
+def test_invalidate_and_clear():
+    cache = SkillBodyCache()
+    cache.put(("a", 1, 4, 500), _entry("aaaa"))
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    cache.put(("b", 1, 4, 500), _entry("bbbb"))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_shared_cache_is_singleton():
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_shared_body_cache()))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(c is results[0] for c in results)
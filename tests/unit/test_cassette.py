@@ -0,0 +1,129 @@
+"""模型适配器与 cassette 录制/回放单元测试"""
+import json
+import time
+
+import pytest
+
+from src.common.config import Config
+from src.model.adapter import ModelRequest, ModelResponse
+from src.model.cassette import Cassette, CassetteMissError, RecordingModel, ReplayModel
+from src.model.factory import create_model_adapter
+from src.model.mock import MockModel
+
+
+def _request(content="hello", **params):
+    return ModelRequest(messages=[{"role": "user", "content": content}], model="m", params=params)
+
+
+def test_fingerprint_is_normalized():
+    base = _request("line one\nline two", temperature=0)
+    assert base.fingerprint() == _request("line one  \r\nline two\n", temperature=0).fingerprint()
+    streamed = _request("line one\nline two", temperature=0, stream=True)
+    assert base.fingerprint() == streamed.fingerprint()
+    assert base.fingerprint() != _request("line one\nline two", temperature=1).fingerprint()
+    assert base.fingerprint() != _request("line one\nline 2", temperature=0).fingerprint()
+
+
+def test_mock_model_streams_same_text():
+    model = MockModel(
+        responses=["abcdefghij", {"action": "final_answer", "answer": "x"}], chunk_size=3
+    )
+    deltas = []
+    first = model.generate_streaming(_request(), deltas.append)
+    assert deltas == ["abc", "def", "ghi", "j"]
+    assert first.text == "abcdefghij"
+    assert json.loads(model.generate(_request()).text)["answer"] == "x"
+    # 用尽后重复最后一个
+    assert model.generate(_request()).text == model.generate(_request()).text
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = tmp_path / "run.json"
+    recorder = RecordingModel(MockModel(responses=["first answer", "second answer"], chunk_size=4),
+                              Cassette(path))
+    recorded = []
+    recorder.generate_streaming(_request("q"), recorded.append)
+    recorder.generate(_request("q"))
+
+    data = json.loads(path.read_text())
+    (key, items), = data["interactions"].items()
+    assert len(items) == 2
+    assert [delta for _, delta in items[0]["stream"]] == recorded
+    assert items[1]["stream"] is None
+    assert "messages" not in items[0]["request"]
+
+    replay = ReplayModel(Cassette(path))
+    replayed = []
+    response = replay.generate_streaming(_request("q  "), replayed.append)
+    assert replayed == recorded
+    assert response.text == "first answer"
+    assert response.metadata["replayed"] is True
+    # 第二条是非流式录制：流式回放为单个 delta
+    replayed.clear()
+    assert replay.generate_streaming(_request("q"), replayed.append).text == "second answer"
+    assert replayed == ["second answer"]
+    # 用尽后重复最后一条
+    assert replay.generate(_request("q")).text == "second answer"
+
+
+def test_replay_miss_raises(tmp_path):
+    replay = ReplayModel(Cassette(tmp_path / "empty.json"))
+    with pytest.raises(CassetteMissError):
+        replay.generate(_request())
+
+
+def test_cassette_store_prompts_and_version(tmp_path):
+    path = tmp_path / "c.json"
+    cassette = Cassette(path, store_prompts=True)
+    cassette.record(_request("secret"), ModelResponse("ok"), 0.01)
+    cassette.save()
+    item = next(iter(json.loads(path.read_text())["interactions"].values()))[0]
+    assert item["request"]["messages"][0]["content"] == "secret"
+    assert len(Cassette(path)) == 1
+
+    path.write_text(json.dumps({"version": 99, "interactions": {}}))
+    with pytest.raises(ValueError):
+        Cassette(path)
+
+
+def test_realtime_replay_follows_recorded_timing(tmp_path):
+    cassette = Cassette(tmp_path / "c.json")
+    cassette.record(_request(), ModelResponse("ab"), 0.05, chunks=[(0.0, "a"), (0.05, "b")])
+    start = time.perf_counter()
+    ReplayModel(cassette, realtime=True).generate_streaming(_request())
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_factory_modes(tmp_path):
+    cassette_path = tmp_path / "c.json"
+    config_path = tmp_path / "config.json"
+
+    def config(mode):
+        config_path.write_text(json.dumps({"model": {
+            "params": {"responses": ["hi"]},
+            "cassette": {"mode": mode, "path": str(cassette_path)},
+        }}))
+        return Config(config_path)
+
+    assert isinstance(create_model_adapter(config("off")), MockModel)
+    recorder = create_model_adapter(config("record"))
+    assert isinstance(recorder, RecordingModel)
+    recorder.generate(_request())
+    replay = create_model_adapter(config("replay"))
+    assert replay.generate(_request()).text == "hi"
+
+    # 回放按 provider 配置补全请求，与录制时的指纹一致
+    config_path.write_text(json.dumps({"model": {
+        "provider": "openai_compat",
+        "params": {"temperature": 0.2},
+        "openai_compat": {"base_url": "http://127.0.0.1:9/v1", "model": "gpt-x"},
+        "cassette": {"mode": "replay", "path": str(cassette_path)},
+    }}))
+    cassette = Cassette(cassette_path)
+    request = ModelRequest(messages=[{"role": "user", "content": "q"}])
+    resolved = ModelRequest(request.messages, model="gpt-x", params={"temperature": 0.2})
+    cassette.record(resolved, ModelResponse("recorded"), 0.01)
+    cassette.save()
+    assert create_model_adapter(Config(config_path)).generate(request).text == "recorded"
+    with pytest.raises(ValueError):
+        create_model_adapter(config("sometimes"))
@@ -0,0 +1,148 @@
+"""工具输出压缩层单元测试"""
+import json
+
+import pytest
+
+from src.agent.state import Observation, RunState
+from src.common.config import Config
+from src.tools.compaction import (
+    OutputCompactor,
+    collapse_whitespace,
+    dedupe_lines,
+    prune_json,
+    truncate_middle,
+    truncate_tail,
+)
+from src.tools.read_file import ReadFileTool
+
+
+def test_text_strategies():
+    assert dedupe_lines("a\nb\nb\nb\nb\nc") == "a\nb\n[previous line repeated 3 more times]\nc"
+    assert dedupe_lines("a\na\nb") == "a\na\nb"
+    assert collapse_whitespace("x  \n\n\n\ny\t") == "x\n\ny"
+    short = truncate_middle("0123456789", 20)
+    assert short == "0123456789"
+    cut = truncate_middle("a" * 50 + "b" * 50, 20)
+    assert cut.startswith("a" * 10) and cut.endswith("b" * 10)
+    assert "[80 chars omitted]" in cut
+
+
+def test_prune_json_limits_lists_and_strings():
+    value = {"matches": [{"line": "x" * 100} for _ in range(5)], "n": 5}
+    pruned = prune_json(value, max_items=2, max_string_chars=10)
+    assert len(pruned["matches"]) == 3
+    assert pruned["matches"][-1] == "...[3 more items omitted]"
+    assert "chars omitted" in pruned["matches"][0]["line"]
+    assert pruned["n"] == 5
+
+
+def test_script_output_compaction_and_retrieval(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path / "outputs", max_chars=200)
+    stdout = "progress\n" * 500 + "done\n"
+    obs = Observation("run_script", True, {"stdout": stdout, "stderr": "", "exit_code": 0},
+                      metadata={"skill": "s"})
+
+    compacted = compactor.compact(obs)
+
+    assert "[previous line repeated 499 more times]" in compacted.output["stdout"]
+    assert compacted.output["exit_code"] == 0
+    info = compacted.metadata["compaction"]
+    assert info["strategies"] == ["dedupe_lines"]
+    assert info["bytes_saved"] == info["original_bytes"] - info["compacted_bytes"] > 0
+    assert compacted.metadata["skill"] == "s"
+    assert obs.output["stdout"] == stdout  # 原 Observation 不被修改
+    assert compactor.load_original(info["original_ref"]) == obs.output
+
+
+def test_small_output_is_untouched(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path)
+    obs = Observation("read_file", True, {"content": "short\n"})
+    assert compactor.compact(obs) is obs
+    failed = Observation("grep", False, None, "InvalidPattern: x")
+    assert compactor.compact(failed) is failed
+    assert not any(tmp_path.iterdir())
+
+
+def test_structured_outputs_are_pruned(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path, max_items=3)
+    entries = [{"path": f"f{i}.py", "type": "file"} for i in range(10)]
+    compacted = compactor.compact(Observation("list_dir", True, {"entries": entries}))
+    assert compacted.output["entries"][:3] == entries[:3]
+    assert compacted.metadata["compaction"]["strategies"] == ["prune_json"]
+
+
+def test_read_file_keeps_whitespace(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path, max_chars=10_000)
+    content = "def f():   \n\n\n\n    return 1\n"
+    obs = Observation("read_file", True, {"content": content})
+    assert compactor.compact(obs) is obs
+
+
+def test_read_file_pages_stay_contiguous(tmp_path):
+    """截尾后的分页游标指向保留内容之后，按游标续读不会漏掉内容"""
+    assert truncate_tail("ab\ncd\nef", 7) == "ab\ncd\n"
+    assert truncate_tail("abcdef", 4) == "abcd"
+    text = "".join(f"第{i}行 {'x' * (i % 7)}\n" for i in range(500))
+    (tmp_path / "f.txt").write_text(text, encoding="utf-8")
+    tool = ReadFileTool()
+    compactor = OutputCompactor(max_chars=300)
+
+    pieces, offset = [], 0
+    while offset is not None:
+        obs = compactor.compact(tool.run(tmp_path, "f.txt", offset=offset))
+        pieces.append(obs.output["content"])
+        assert len(obs.output["content"]) <= 300
+        offset = obs.metadata["next_offset"]
+    assert "".join(pieces) == text
+
+    lines, line = [], 1
+    while line is not None:
+        obs = compactor.compact(tool.run(tmp_path, "f.txt", start_line=line))
+        line_count = obs.metadata["end_line"] - obs.metadata["start_line"] + 1
+        assert line_count == obs.output["content"].count("\n")
+        lines.append(obs.output["content"])
+        line = obs.metadata["next_line"]
+    assert "".join(lines) == text
+
+
+def test_record_accumulates_run_metrics(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path, max_chars=100)
+    state = RunState(run_id="r", request="q")
+    big = Observation("load_resource", True, {"text": "x" * 1000})
+    small = Observation("load_resource", True, {"text": "ok"})
+
+    compactor.record(state, big)
+    compactor.record(state, small)
+    compactor.record(state, big)
+
+    metrics = state.metrics["compaction"]
+    assert metrics["observations"] == 3
+    assert metrics["compacted"] == 2
+    saved = state.observations[0].metadata["compaction"]
+    assert metrics["bytes_saved"] == 2 * saved["bytes_saved"]
+    assert metrics["tokens_saved"] == 2 * saved["tokens_saved"] > 0
+    assert len(state.observations) == 3
+    # 相同内容只存一份
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+
+
+def test_load_original_rejects_unknown_refs(tmp_path):
+    compactor = OutputCompactor(store_dir=tmp_path)
+    with pytest.raises(KeyError):
+        compactor.load_original("../../etc/passwd")
+    with pytest.raises(KeyError):
+        compactor.load_original("0" * 64)
+    with pytest.raises(KeyError):
+        OutputCompactor().load_original("0" * 64)
+
+
+def test_from_config(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"execution": {"compaction": {
+        "dir": str(tmp_path / "out"), "max_chars": 123}}}))
+    compactor = OutputCompactor.from_config(Config(path))
+    assert compactor.max_chars == 123
+    assert compactor.store_dir == tmp_path / "out"
+
+    path.write_text(json.dumps({"execution": {"compaction": {"enabled": False}}}))
+    assert OutputCompactor.from_config(Config(path)) is None
@@ -0,0 +1,105 @@
+"""技能依赖解析单元测试"""
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from src.skills.cache import SkillBodyCache
+from src.skills.dependencies import (
+    DependencyCycleError,
+    DependencyResolver,
+    MissingDependencyError,
+)
+from src.skills.loader import SkillLoader
+from src.skills.metadata import SkillMetadata
+
+
+class _Registry:
+    """最小注册表：name -> SkillMetadata"""
+
+    def __init__(self, graph: Dict[str, List[str]], root: Path = Path("/skills")) -> None:
+        self.version = 0
+        self.lookups = 0
+        self.skills = {
+            name: SkillMetadata(
+                skill_id=f"project:{name}:unversioned", name=name, description="d",
+                source="project", path=root / name, requires=list(requires),
+            )
+            for name, requires in graph.items()
+        }
+
+    def find_skill(self, name: str, source: Optional[str] = None) -> Optional[SkillMetadata]:
+        self.lookups += 1
+        return self.skills.get(name)
+
+
+def _names(skills: List[SkillMetadata]) -> List[str]:
+    return [s.name for s in skills]
+
+
+def test_resolve_topological_order():
+    registry = _Registry({"app": ["db", "web"], "web": ["http"], "db": ["http"], "http": []})
+    order = _names(DependencyResolver(registry).resolve("app"))
+    assert order == ["http", "db", "web", "app"]
+
+
+def test_resolve_is_memoized_per_version():
+    registry = _Registry({"a": ["b"], "b": ["c"], "c": []})
+    resolver = DependencyResolver(registry)
+    resolver.resolve("a")
+    lookups = registry.lookups
+    assert _names(resolver.resolve("a")) == ["c", "b", "a"]
+    assert registry.lookups == lookups
+
+    registry.skills["c"].requires.append("d")
+    registry.skills["d"] = SkillMetadata(
+        skill_id="project:d:unversioned", name="d", description="d", source="project",
+        path=Path("/skills/d"),
+    )
+    registry.version += 1
+    assert _names(resolver.resolve("a")) == ["d", "c", "b", "a"]
+
+
+def test_resolve_many_merges_without_duplicates():
+    registry = _Registry({"a": ["c"], "b": ["c"], "c": []})
+    resolver = DependencyResolver(registry)
+    resolver.resolve("a")
+    assert _names(resolver.resolve_many(["a", "b"])) == ["c", "a", "b"]
+
+
+def test_cycle_detected():
+    registry = _Registry({"a": ["b"], "b": ["c"], "c": ["a"]})
+    with pytest.raises(DependencyCycleError) as excinfo:
+        DependencyResolver(registry).resolve("a")
+    assert excinfo.value.cycle == ["a", "b", "c", "a"]
+
+
+def test_missing_dependency():
+    registry = _Registry({"a": ["ghost"]})
+    with pytest.raises(MissingDependencyError) as excinfo:
+        DependencyResolver(registry).resolve("a")
+    assert excinfo.value.skill == "a" and excinfo.value.missing == "ghost"
+
+
+def test_deep_chain_does_not_recurse():
+    depth = 5000
+    graph = {f"s{i}": [f"s{i + 1}"] for i in range(depth)}
+    graph[f"s{depth}"] = []
+    order = DependencyResolver(_Registry(graph)).resolve("s0")
+    assert len(order) == depth + 1 and order[0].name == f"s{depth}"
+
+
+def test_prefetch_warms_loader_cache(tmp_path):
+    registry = _Registry({"app": ["lib"], "lib": []}, root=tmp_path)
+    for name in ("app", "lib"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "SKILL.md").write_text(
+            f"---\nname: {name}\ndescription: d\n---\n{name} body\n", encoding="utf-8"
+        )
+    cache = SkillBodyCache()
+    resolver = DependencyResolver(registry, loader=SkillLoader(cache=cache))
+    loaded = resolver.prefetch("app").result(timeout=5)
+    resolver.shutdown()
+    assert _names([s.metadata for s in loaded]) == ["lib"]
+    assert len(cache) == 1
+    assert DependencyResolver(registry).prefetch("app") is None
@@ -0,0 +1,41 @@
+"""DiskLRUStore 单元测试"""
+import os
+
+from src.common.disk_lru import DiskLRUStore
+
+
+def _key(i: int) -> str:
+    return f"{i:02d}" + "a" * 62
+
+
+def test_write_read_and_evict_least_recently_used(tmp_path):
+    store = DiskLRUStore(tmp_path, max_bytes=25)
+    for i in range(3):
+        store.write(_key(i), b"x" * 10)
+    # 写入第三个后超限，最久未使用的第一个被淘汰
+    assert _key(0) not in store and len(store) == 2
+    assert store.total_bytes == 20
+
+    assert store.read(_key(1)) == b"x" * 10
+    store.write(_key(3), b"y" * 10)
+    assert list(store) == [_key(1), _key(3)]
+    assert store.read(_key(2)) is None
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_index_is_rebuilt_from_mtimes(tmp_path):
+    store = DiskLRUStore(tmp_path, max_bytes=1000)
+    for i in range(3):
+        store.write(_key(i), b"z")
+        os.utime(store.path(_key(i)), ns=(i * 10**9, i * 10**9))
+    os.utime(store.path(_key(0)), ns=(10**10, 10**10))
+
+    reopened = DiskLRUStore(tmp_path, max_bytes=1000)
+    assert list(reopened) == [_key(1), _key(2), _key(0)]
+    assert reopened.total_bytes == 3
+
+    store.path(_key(1)).unlink()
+    assert reopened.read(_key(1)) is None
+    assert len(reopened) == 2
+    reopened.clear()
+    assert len(reopened) == 0 and not list(tmp_path.rglob("*.json"))
@@ -0,0 +1,258 @@
+"""脚本执行器单元测试"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.agent.events import EventStream, EventType
+from src.agent.state import ToolBudget
+from src.common.config import Config
+from src.skills.metadata import ResourceLimits, SkillMetadata
+from src.tools.executor import ScriptExecutor, _Capture
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+
+def _skill(tmp_path: Path, scripts: dict, limits: ResourceLimits = None) -> SkillMetadata:
+    skill_dir = tmp_path / "demo"
+    (skill_dir / "scripts").mkdir(parents=True, exist_ok=True)
+    for name, code in scripts.items():
+        (skill_dir / "scripts" / name).write_text(code, encoding="utf-8")
+    return SkillMetadata(
+        skill_id="project:demo:unversioned", name="demo", description="d",
+        source="project", path=skill_dir, resource_limits=limits or ResourceLimits(),
+    )
+
+
+def test_run_script_success_reports_metrics(tmp_path):
+    skill = _skill(tmp_path, {"echo.py": "import sys\nprint('hi', *sys.argv[1:])\n"})
+    obs = ScriptExecutor().run_script(skill, "scripts/echo.py", ["a", "b"], turn=3)
+    assert obs.success
+    assert obs.output["stdout"] == "hi a b\n"
+    assert obs.turn == 3
+    for key in ("wall_time_sec", "cpu_time_sec", "peak_rss_kb", "exit_code"):
+        assert key in obs.metadata
+    assert obs.metadata["peak_rss_kb"] > 0
+
+
+def test_nonzero_exit_is_error(tmp_path):
+    skill = _skill(tmp_path, {"fail.py": "import sys\nsys.stderr.write('bad')\nsys.exit(3)\n"})
+    obs = ScriptExecutor().run_script(skill, "scripts/fail.py")
+    assert not obs.success
+    assert obs.error.startswith("ExitNonZero")
+    assert obs.metadata["exit_code"] == 3
+    assert obs.output["stderr"] == "bad"
+
+
+def test_timeout_kills_process_group(tmp_path):
+    marker = tmp_path / "grandchild-alive"
+    child = f"import time; time.sleep(2); open({str(marker)!r}, 'w')"
+    code = (
+        "import subprocess, sys, time\n"
+        f"subprocess.Popen([sys.executable, '-c', {child!r}])\n"
+        "time.sleep(30)\n"
+    )
+    skill = _skill(tmp_path, {"hang.py": code}, ResourceLimits(max_script_time_sec=1))
+    start = time.perf_counter()
+    obs = ScriptExecutor().run_script(skill, "scripts/hang.py")
+    assert time.perf_counter() - start < 5
+    assert obs.error.startswith("Timeout")
+    assert obs.metadata["timed_out"]
+    time.sleep(2.5)
+    assert not marker.exists()
+
+
+def test_group_is_signalled_only_before_leader_is_reaped(tmp_path, monkeypatch):
+    marker = tmp_path / "grandchild-alive"
+    child = f"import time; time.sleep(1); open({str(marker)!r}, 'w')"
+    code = f"import subprocess, sys\nsubprocess.Popen([sys.executable, '-c', {child!r}])\n"
+    skill = _skill(tmp_path, {"spawn.py": code})
+    signalled = []
+    killpg = os.killpg
+
+    def checked_killpg(pgid, sig):
+        # 组长尚未回收时 waitid 能查到它；回收后进程组 ID 可能已被复用
+        try:
+            os.waitid(os.P_PID, pgid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            signalled.append(True)
+        except ChildProcessError:
+            signalled.append(False)
+        killpg(pgid, sig)
+
+    monkeypatch.setattr(os, "killpg", checked_killpg)
+    executor = ScriptExecutor()
+    assert executor.run_script(skill, "scripts/spawn.py").success
+    assert asyncio.run(executor.run_script_async(skill, "scripts/spawn.py")).success
+    assert signalled and all(signalled)
+    time.sleep(1.5)
+    # 组长退出后残留的子孙进程被整组清理
+    assert not marker.exists()
+
+
+def test_memory_limit_enforced(tmp_path):
+    skill = _skill(
+        tmp_path, {"hog.py": "x = bytearray(512 * 1024 * 1024)\n"},
+        ResourceLimits(max_memory_mb=128),
+    )
+    obs = ScriptExecutor().run_script(skill, "scripts/hog.py")
+    assert not obs.success
+    assert "MemoryError" in obs.output["stderr"]
+
+
+def test_output_keeps_head_and_tail(tmp_path):
+    code = "import sys\nsys.stdout.write('H' * 600 + 'x' * 100000 + 'T' * 600)\n"
+    skill = _skill(tmp_path, {"spam.py": code})
+    obs = ScriptExecutor(max_output_bytes=1000).run_script(skill, "scripts/spam.py")
+    stdout = obs.output["stdout"]
+    assert stdout.startswith("H" * 500)
+    assert stdout.endswith("T" * 500)
+    assert "[100200 bytes truncated]" in stdout
+    assert obs.metadata["stdout_dropped_bytes"] == 100200
+
+
+def test_capture_memory_is_bounded():
+    capture = _Capture(100)
+    for i in range(1000):
+        capture.feed(bytes([65 + i % 26]) * 1000)
+    assert len(capture.head) == 50 and len(capture.tail) == 50
+    assert capture.dropped == 1000 * 1000 - 100
+    assert capture.tail == bytes([65 + 999 % 26]) * 50
+
+    capture = _Capture(4)
+    capture.feed("é".encode() * 10)
+    assert "\ufffd" not in capture.text()
+
+
+def test_output_spill_and_events(tmp_path):
+    code = (
+        "import sys, time\n"
+        "for i in range(3):\n"
+        "    print('line', i, flush=True)\n"
+        "    time.sleep(0.1)\n"
+    )
+    skill = _skill(tmp_path, {"chatty.py": code})
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+    executor = ScriptExecutor(max_output_bytes=8, output_event_interval_sec=0.05)
+    obs = executor.run_script(
+        skill, "scripts/chatty.py", event_stream=stream, run_id="r1", spill_dir=tmp_path / "run"
+    )
+    assert obs.success
+    spilled = Path(obs.metadata["stdout_path"]).read_text()
+    assert spilled == "line 0\nline 1\nline 2\n"
+    assert obs.metadata["stdout_dropped_bytes"] == len(spilled) - 8
+
+    output = [e for e in events if e.type == EventType.SCRIPT_OUTPUT]
+    assert len(output) >= 2
+    assert "".join(e.data["text"] for e in output) == spilled
+    assert output[-1].data["total_bytes"] == len(spilled)
+    assert output[0].data["skill"] == "demo" and output[0].run_id == "r1"
+
+
+def test_env_is_scrubbed(tmp_path, monkeypatch):
+    monkeypatch.setenv("SECRET_TOKEN", "s3cret")
+    skill = _skill(tmp_path, {"env.py": "import os\nprint(sorted(os.environ))\n"})
+    obs = ScriptExecutor().run_script(skill, "scripts/env.py", env={"EXTRA": "1"})
+    assert "SECRET_TOKEN" not in obs.output["stdout"]
+    assert "EXTRA" in obs.output["stdout"]
+
+
+def test_path_traversal_blocked(tmp_path):
+    skill = _skill(tmp_path, {})
+    obs = ScriptExecutor().run_script(skill, "../outside.py")
+    assert obs.error.startswith("PathTraversalBlocked")
+    assert ScriptExecutor().run_script(skill, "scripts/missing.py").error.startswith("IOError")
+
+
+def test_per_skill_concurrency_cap(tmp_path):
+    skill = _skill(
+        tmp_path, {"sleep.py": "import time\ntime.sleep(0.3)\n"},
+        ResourceLimits(max_concurrent_scripts=1),
+    )
+    executor = ScriptExecutor(max_concurrent=4)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(executor.run_script(skill, "scripts/sleep.py"))
+        )
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    queue_times = sorted(obs.metadata["queue_time_sec"] for obs in results)
+    assert all(obs.success for obs in results)
+    assert queue_times[-1] >= 0.5
+
+
+def test_from_config():
+    executor = ScriptExecutor.from_config(Config())
+    assert executor.max_concurrent == 4
+    assert executor.max_output_bytes == 65536
+
+
+def test_run_script_async_matches_sync(tmp_path):
+    skill = _skill(tmp_path, {"echo.py": "import sys\nprint('hi', *sys.argv[1:])\n"})
+    executor = ScriptExecutor()
+
+    async def main():
+        return await asyncio.gather(*(
+            executor.run_script_async(skill, "scripts/echo.py", [str(i)], turn=1) for i in range(3)
+        ))
+
+    results = asyncio.run(main())
+    assert [obs.output["stdout"] for obs in results] == ["hi 0\n", "hi 1\n", "hi 2\n"]
+    assert all(obs.success and obs.turn == 1 for obs in results)
+    blocked = asyncio.run(executor.run_script_async(skill, "../x.py"))
+    assert blocked.error.startswith("PathTraversalBlocked")
+
+
+def test_run_script_async_timeout_and_cancel_kill_group(tmp_path):
+    marker = tmp_path / "grandchild-alive"
+    child = f"import time; time.sleep(1.5); open({str(marker)!r}, 'w')"
+    code = (
+        "import subprocess, sys, time\n"
+        f"subprocess.Popen([sys.executable, '-c', {child!r}])\n"
+        "print('started', flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    skill = _skill(tmp_path, {"hang.py": code}, ResourceLimits(max_script_time_sec=1))
+    executor = ScriptExecutor()
+    obs = asyncio.run(executor.run_script_async(skill, "scripts/hang.py"))
+    assert obs.error.startswith("Timeout")
+
+    skill.resource_limits = ResourceLimits(max_script_time_sec=30)
+    budget = ToolBudget()
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+
+    async def cancel_after(delay):
+        task = asyncio.ensure_future(executor.run_script_async(
+            skill, "scripts/hang.py", budget=budget, event_stream=stream, run_id="r1",
+        ))
+        await asyncio.sleep(delay)
+        task.cancel()
+        return await task
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_after(0.5))
+    assert time.perf_counter() - start < 3
+    assert budget.script_executions_used == 1
+    errors = [e for e in events if e.type == EventType.ERROR_OCCURRED]
+    assert errors[-1].data["spawned"] and errors[-1].data["error"].startswith("Cancelled")
+    time.sleep(2)
+    assert not marker.exists()
+
+    # 子进程启动前取消：不扣减脚本预算
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_after(0))
+    assert budget.script_executions_used == 1
+    assert not [e for e in events if e.type == EventType.ERROR_OCCURRED][-1].data["spawned"]
@@ -0,0 +1,174 @@
+"""YAML 前言解析器单元测试"""
+from pathlib import Path
+
+import pytest
+
+from src.common.hash_utils import compute_text_hash
+from src.skills.frontmatter import (
+    FrontmatterParseError,
+    build_metadata,
+    load_skill_metadata,
+    parse_frontmatter,
+    read_frontmatter,
+    split_frontmatter,
+)
+
+
+VALID = """---
+name: test-skill
+description: A test skill
+version: 1.0.0
+allowed-tools:
+  - read_file
+  - grep
+---
+# Skill Body
+
+This is the skill body.
+"""
+
+
+def test_parse_valid_frontmatter():
+    """测试解析有效前言"""
+    frontmatter, body = parse_frontmatter(VALID)
+    assert frontmatter["name"] == "test-skill"
+    assert frontmatter["description"] == "A test skill"
+    assert frontmatter["version"] == "1.0.0"
+    assert frontmatter["allowed-tools"] == ["read_file", "grep"]
+    assert "# Skill Body" in body
+
+
+def test_parse_frontmatter_with_injection():
+    """测试注入防护"""
+    content = "---\nname: evil<script>alert(1)</script>\ndescription: Test\n---\nBody\n"
+    with pytest.raises(FrontmatterParseError, match="Angle brackets"):
+        parse_frontmatter(content)
+
+
+def test_parse_frontmatter_missing_required():
+    with pytest.raises(FrontmatterParseError, match="description"):
+        parse_frontmatter("---\nname: x\n---\nBody\n")
+
+
+def test_parse_frontmatter_no_frontmatter():
+    with pytest.raises(FrontmatterParseError, match="No frontmatter"):
+        parse_frontmatter("# Just markdown\n")
+
+
+def test_parse_booleans_and_inline_list():
+    content = (
+        "---\nname: s\ndescription: d\ndisable-model-invocation: true\n"
+        "user-invocable: False\nrequires: [a, b]\n---\n"
+    )
+    frontmatter, body = parse_frontmatter(content)
+    assert frontmatter["disable-model-invocation"] is True
+    assert frontmatter["user-invocable"] is False
+    assert frontmatter["requires"] == ["a", "b"]
+    assert body == ""
+
+
+def test_split_frontmatter_returns_raw_text():
+    yaml_text, body = split_frontmatter(VALID)
+    assert yaml_text.startswith("name: test-skill")
+    assert body.startswith("# Skill Body")
+
+
+def test_build_metadata_maps_fields():
+    frontmatter, _ = parse_frontmatter(
+        "---\nname: s\ndescription: d\nversion: 2\nallowed-tools: read_file, grep\n"
+        "load-priority: high\n---\n"
+    )
+    meta = build_metadata(frontmatter, "user", Path("/skills/s"), "abc")
+    assert meta.skill_id == "user:s:2"
+    assert meta.version == "2"
+    assert meta.allowed_tools == ["read_file", "grep"]
+    assert meta.load_priority == "high"
+    assert meta.frontmatter_hash == "abc"
+    assert meta.scanned_at is not None
+
+
+def test_load_skill_metadata(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_text(VALID, encoding="utf-8")
+    meta = load_skill_metadata(skill_file, "project")
+    assert meta.name == "test-skill"
+    assert meta.path == tmp_path
+    assert meta.frontmatter_hash is not None and len(meta.frontmatter_hash) == 64
+
+
+# ──────────────────────────────────────────
+# 流式头部读取
+# ──────────────────────────────────────────
+
+def test_read_frontmatter_matches_full_parse(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_text(VALID, encoding="utf-8")
+    head = read_frontmatter(skill_file)
+    frontmatter, body = parse_frontmatter(VALID)
+    yaml_text, _ = split_frontmatter(VALID)
+    assert head.frontmatter == frontmatter
+    assert head.frontmatter_hash == compute_text_hash(yaml_text)
+    assert skill_file.read_bytes()[head.body_offset:].decode("utf-8") == body
+
+
+def test_read_frontmatter_does_not_decode_body(tmp_path):
+    """正文不是合法 UTF-8 也不影响前言读取"""
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_bytes(b"---\nname: s\ndescription: d\n---\n" + b"\xff\xfe" * 100000)
+    head = read_frontmatter(skill_file)
+    assert head.frontmatter["name"] == "s"
+
+
+def test_read_frontmatter_crlf(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_bytes(b"---\r\nname: s\r\ndescription: d\r\n---\r\nBody")
+    head = read_frontmatter(skill_file)
+    assert head.frontmatter == {"name": "s", "description": "d"}
+
+
+def test_read_frontmatter_size_limits(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_text(
+        "---\nname: s\ndescription: " + "x" * 500 + "\n---\n", encoding="utf-8"
+    )
+    with pytest.raises(FrontmatterParseError, match="bytes"):
+        read_frontmatter(skill_file, max_bytes=100)
+    with pytest.raises(FrontmatterParseError, match="lines"):
+        read_frontmatter(skill_file, max_lines=1)
+    assert read_frontmatter(skill_file).frontmatter["name"] == "s"
+
+
+def test_read_frontmatter_exactly_at_byte_limit(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    content = "name: s\ndescription: " + "x" * 80 + "\n"
+    skill_file.write_text(f"---\n{content}---\nbody\n", encoding="utf-8")
+    limit = len(content.encode("utf-8"))
+    head = read_frontmatter(skill_file, max_bytes=limit)
+    assert head.frontmatter["description"] == "x" * 80
+    assert skill_file.read_bytes()[head.body_offset:] == b"body\n"
+    with pytest.raises(FrontmatterParseError, match="bytes"):
+        read_frontmatter(skill_file, max_bytes=limit - 1)
+
+
+def test_read_frontmatter_unterminated_and_missing(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_text("---\nname: s\ndescription: d\n", encoding="utf-8")
+    with pytest.raises(FrontmatterParseError, match="Unterminated"):
+        read_frontmatter(skill_file)
+    skill_file.write_text("# no frontmatter\n", encoding="utf-8")
+    with pytest.raises(FrontmatterParseError, match="No frontmatter"):
+        read_frontmatter(skill_file)
+    skill_file.write_text("---\nname: s\n---\n", encoding="utf-8")
+    with pytest.raises(FrontmatterParseError, match="description"):
+        read_frontmatter(skill_file)
+
+
+def test_read_frontmatter_strict_and_lenient(tmp_path):
+    skill_file = tmp_path / "SKILL.md"
+    skill_file.write_text(
+        "---\nname: s\ndescription: <b>bold</b>\n---\n", encoding="utf-8"
+    )
+    with pytest.raises(FrontmatterParseError, match="Angle brackets"):
+        read_frontmatter(skill_file)
+    head = read_frontmatter(skill_file, strict=False)
+    assert head.frontmatter["description"] == "bbold/b"
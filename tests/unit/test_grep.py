@@ -0,0 +1,85 @@
+"""grep 工具单元测试"""
+from pathlib import Path
+
+import pytest
+
+from src.common.config import Config
+from src.common.security import PathTraversalError
+from src.tools.grep import GrepTool, InvalidPatternError, literal_prefix
+
+
+def _tree(tmp_path: Path) -> Path:
+    root = tmp_path / "skill"
+    (root / "docs").mkdir(parents=True)
+    (root / ".hidden").mkdir()
+    (root / "docs" / "a.md").write_text("alpha\nfoo12 bar\nbeta\nfoo34\n", encoding="utf-8")
+    (root / "docs" / "b.txt").write_text("nothing here\nFOO99\n", encoding="utf-8")
+    (root / "blob.bin").write_bytes(b"foo1\0\x01\x02")
+    (root / ".hidden" / "c.md").write_text("foo56\n", encoding="utf-8")
+    return root
+
+
+def test_literal_prefix():
+    assert literal_prefix("foo\\d+") == "foo"
+    assert literal_prefix("abc*") == "ab"
+    assert literal_prefix("a|b") == ""
+    assert literal_prefix("^foo") == ""
+    assert literal_prefix("plain") == "plain"
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 1 << 30])
+def test_search_matches_lines_and_skips_binary(tmp_path, mmap_threshold):
+    root = _tree(tmp_path)
+    result = GrepTool(mmap_threshold=mmap_threshold).search(root, r"foo\d+")
+    assert [(m.path, m.line_number, m.line) for m in result.matches] == [
+        ("docs/a.md", 2, "foo12 bar"),
+        ("docs/a.md", 4, "foo34"),
+    ]
+    assert result.binary_skipped == 1
+    assert not result.truncated
+
+
+def test_options(tmp_path):
+    root = _tree(tmp_path)
+    tool = GrepTool()
+    assert len(tool.search(root, "foo", ignore_case=True).matches) == 3
+    result = tool.search(root, "foo", glob="*.txt", ignore_case=True)
+    assert [m.path for m in result.matches] == ["docs/b.txt"]
+    assert tool.search(root, "a.m", fixed_string=True).matches == []
+    assert len(tool.search(root, "o", path="docs/a.md").matches) == 2
+    # 无字面前缀的模式走 regex.search 路径
+    assert [m.line_number for m in tool.search(root, r"^\w+\d\d$").matches] == [4, 2]
+
+
+def test_match_cap_stops_early(tmp_path):
+    root = tmp_path / "big"
+    root.mkdir()
+    for i in range(20):
+        (root / f"f{i:02d}.txt").write_text("hit\n" * 100, encoding="utf-8")
+    result = GrepTool(max_matches=150, max_workers=2).search(root, "hit")
+    assert len(result.matches) == 150
+    assert result.truncated
+    assert [m.path for m in result.matches[99:101]] == ["f00.txt", "f01.txt"]
+    assert result.files_scanned < 20
+
+
+def test_errors(tmp_path):
+    root = _tree(tmp_path)
+    tool = GrepTool()
+    with pytest.raises(PathTraversalError):
+        tool.search(root, "x", path="../")
+    with pytest.raises(InvalidPatternError):
+        tool.search(root, "(")
+    assert tool.run(root, "(").error.startswith("InvalidPattern")
+    assert tool.run(root, "x", path="/etc").error.startswith("PathTraversalBlocked")
+
+    obs = tool.run(root, "beta", turn=2)
+    assert obs.success and obs.turn == 2
+    assert obs.output["matches"][0]["line_number"] == 3
+    assert obs.metadata["files_scanned"] >= 2
+
+
+def test_from_config():
+    tool = GrepTool.from_config(Config())
+    assert tool.max_matches == 200
+    assert tool.max_workers == 4
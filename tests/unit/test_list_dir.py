@@ -0,0 +1,98 @@
+"""list_dir 工具单元测试"""
+import os
+from pathlib import Path
+
+import pytest
+
+from src.common.config import Config
+from src.common.security import PathTraversalError
+from src.tools.list_dir import DirListingCache, ListDirTool
+
+
+def _tree(tmp_path: Path) -> Path:
+    root = tmp_path / "skill"
+    (root / "scripts" / "lib").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / ".git").mkdir()
+    (root / "scripts" / "__pycache__").mkdir()
+    (root / "SKILL.md").write_text("x")
+    (root / "docs" / "guide.md").write_text("x")
+    (root / "scripts" / "run.py").write_text("x")
+    (root / "scripts" / "lib" / "util.py").write_text("x")
+    return root
+
+
+def _paths(listing):
+    return [e["path"] for e in listing.entries]
+
+
+def test_flat_listing_skips_ignored(tmp_path):
+    root = _tree(tmp_path)
+    listing = ListDirTool(cache=DirListingCache()).list(root)
+    assert listing.entries == [
+        {"path": "SKILL.md", "type": "file"},
+        {"path": "docs", "type": "dir"},
+        {"path": "scripts", "type": "dir"},
+    ]
+    assert not listing.depth_limited
+
+
+def test_recursive_listing_with_depth_and_entry_caps(tmp_path):
+    root = _tree(tmp_path)
+    tool = ListDirTool(cache=DirListingCache())
+    assert _paths(tool.list(root, recursive=True)) == [
+        "SKILL.md", "docs", "docs/guide.md", "scripts", "scripts/lib", "scripts/lib/util.py",
+        "scripts/run.py",
+    ]
+    shallow = tool.list(root, recursive=True, max_depth=2)
+    assert "scripts/lib" in _paths(shallow) and "scripts/lib/util.py" not in _paths(shallow)
+    assert shallow.depth_limited
+
+    capped = tool.list(root, recursive=True, max_entries=3)
+    assert _paths(capped) == ["SKILL.md", "docs", "docs/guide.md"]
+    assert capped.truncated
+    assert _paths(tool.list(root, "scripts", recursive=True)) == ["lib", "lib/util.py", "run.py"]
+
+
+def test_unchanged_directories_hit_cache(tmp_path):
+    root = _tree(tmp_path)
+    cache = DirListingCache()
+    tool = ListDirTool(cache=cache)
+    tool.list(root, recursive=True)
+    assert cache.stats()["misses"] == 4
+    tool.list(root, recursive=True)
+    assert cache.stats()["hits"] == 4
+
+    (root / "docs" / "new.md").write_text("x")
+    # 确保 mtime 变化可被观测
+    st = os.stat(root / "docs")
+    os.utime(root / "docs", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert "docs/new.md" in _paths(tool.list(root, recursive=True))
+    assert cache.stats()["misses"] == 5
+
+
+def test_symlinks_are_not_followed(tmp_path):
+    root = _tree(tmp_path)
+    (tmp_path / "outside").mkdir()
+    (tmp_path / "outside" / "secret.txt").write_text("x")
+    (root / "link").symlink_to(tmp_path / "outside")
+    listing = ListDirTool(cache=DirListingCache()).list(root, recursive=True)
+    assert {"path": "link", "type": "symlink"} in listing.entries
+    assert not any("secret" in p for p in _paths(listing))
+
+
+def test_errors(tmp_path):
+    root = _tree(tmp_path)
+    tool = ListDirTool(cache=DirListingCache())
+    with pytest.raises(PathTraversalError):
+        tool.list(root, "../")
+    assert tool.run(root, "missing").error.startswith("IOError")
+    assert tool.run(root, "SKILL.md").error.startswith("IOError")
+    obs = tool.run(root, "docs", turn=1)
+    assert obs.success and obs.output["entries"] == [{"path": "guide.md", "type": "file"}]
+    assert obs.metadata["entry_count"] == 1
+
+
+def test_from_config():
+    tool = ListDirTool.from_config(Config())
+    assert (tool.max_entries, tool.max_depth) == (500, 4)
@@ -0,0 +1,157 @@
+"""Skill Loader 单元测试"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.agent.actions import SkillReference
+from src.agent.events import EventStream, EventType
+from src.common.config import Config
+from src.skills.cache import SkillBodyCache
+from src.skills.loader import SkillLoader, SkillLoadError, SkillNotFoundError
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import SkillRegistry
+
+
+def _write_skill(tmp_path: Path, body: str, name: str = "demo") -> Path:
+    skill_dir = tmp_path / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: Demo skill\n---\n{body}", encoding="utf-8"
+    )
+    return skill_dir
+
+
+def _metadata(skill_dir: Path, name: str = "demo") -> SkillMetadata:
+    return SkillMetadata(
+        skill_id=f"project:{name}:unversioned", name=name, description="Demo skill",
+        source="project", path=skill_dir,
+    )
+
+
+@pytest.fixture
+def loader():
+    return SkillLoader(cache=SkillBodyCache())
+
+
+# ──────────────────────────────────────────
+# 正文加载
+# ──────────────────────────────────────────
+
+def test_load_body_strips_frontmatter(tmp_path, loader):
+    skill_dir = _write_skill(tmp_path, "# Title\n\nStep 1\n")
+    body, tokens = loader.load_body(skill_dir)
+    assert body == "# Title\n\nStep 1\n"
+    assert tokens == len(body) // 4
+
+
+def test_load_body_truncates_lines(tmp_path):
+    skill_dir = _write_skill(tmp_path, "".join(f"line {i}\n" for i in range(10)))
+    loader = SkillLoader(max_body_lines=3, cache=SkillBodyCache())
+    body, _ = loader.load_body(skill_dir)
+    assert body == "line 0\nline 1\nline 2\n"
+
+
+def test_load_skill_builds_loaded_skill(tmp_path, loader):
+    skill_dir = _write_skill(tmp_path, "Body text\n")
+    loaded = loader.load_skill(_metadata(skill_dir), turn=3)
+    assert loaded.body == "Body text\n"
+    assert loaded.loaded_at_turn == 3
+    assert loaded.body_hash is not None and len(loaded.body_hash) == 64
+
+
+def test_load_missing_skill(tmp_path, loader):
+    with pytest.raises(SkillNotFoundError):
+        loader.load_body(tmp_path / "missing")
+
+
+def test_load_invalid_frontmatter(tmp_path, loader):
+    skill_dir = tmp_path / "bad"
+    skill_dir.mkdir()
+    (skill_dir / "SKILL.md").write_text("no frontmatter", encoding="utf-8")
+    with pytest.raises(SkillLoadError):
+        loader.load_body(skill_dir)
+
+
+def test_from_config_uses_security_limit(tmp_path):
+    loader = SkillLoader.from_config(Config(), cache=SkillBodyCache())
+    assert loader.max_body_lines == 500
+    assert loader.max_frontmatter_bytes == 16384
+
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"security": {"max_frontmatter_bytes": 10}}))
+    strict = SkillLoader.from_config(Config(path), cache=SkillBodyCache())
+    with pytest.raises(SkillLoadError, match="exceeds 10 bytes"):
+        strict.load_body(_write_skill(tmp_path, "Body\n"))
+
+
+# ──────────────────────────────────────────
+# 正文缓存
+# ──────────────────────────────────────────
+
+def test_runs_share_cached_body(tmp_path):
+    cache = SkillBodyCache()
+    skill_dir = _write_skill(tmp_path, "Shared body\n")
+    first = SkillLoader(cache=cache).load_skill(_metadata(skill_dir), turn=1)
+    second = SkillLoader(cache=cache).load_skill(_metadata(skill_dir), turn=2)
+    assert second.body is first.body
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_modified_file_is_reloaded(tmp_path, loader):
+    skill_dir = _write_skill(tmp_path, "v1\n")
+    assert loader.load_body(skill_dir)[0] == "v1\n"
+    _write_skill(tmp_path, "version 2\n")
+    skill_file = skill_dir / "SKILL.md"
+    st = skill_file.stat()
+    os.utime(skill_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert loader.load_body(skill_dir)[0] == "version 2\n"
+    assert len(loader.cache) == 1
+
+
+# ──────────────────────────────────────────
+# 并发加载
+# ──────────────────────────────────────────
+
+def test_load_skills_preserves_order_and_emits_events(tmp_path):
+    loader = SkillLoader(max_body_lines=2, cache=SkillBodyCache(), max_workers=4)
+    names = [f"skill-{i}" for i in range(8)]
+    metas = [_metadata(_write_skill(tmp_path, f"{n} a\nb\nc\n", name=n), n) for n in names]
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+
+    loaded = loader.load_skills(metas, turn=2, event_stream=stream, run_id="r1")
+
+    assert [s.metadata.name for s in loaded] == names
+    assert all(s.body.count("\n") == 2 for s in loaded)
+    assert [e.type for e in events] == [EventType.SKILL_LOADED] * len(names)
+    assert [e.data["name"] for e in events] == names
+    assert events[0].run_id == "r1" and events[0].turn == 2
+
+
+def test_load_skills_raises_first_error_in_order(tmp_path, loader):
+    good = _metadata(_write_skill(tmp_path, "ok\n", name="good"), "good")
+    missing = _metadata(tmp_path / "missing", "missing")
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+    with pytest.raises(SkillNotFoundError):
+        loader.load_skills([good, missing, good], event_stream=stream)
+    assert len(events) == 1
+
+
+def test_load_selection_resolves_references(tmp_path, loader):
+    _write_skill(tmp_path, "alpha body\n", name="alpha")
+    _write_skill(tmp_path, "beta body\n", name="beta")
+    registry = SkillRegistry([{"source": "project", "path": str(tmp_path), "priority": 0}])
+    registry.scan_all()
+
+    loaded = loader.load_selection(
+        [SkillReference("beta"), SkillReference("alpha", "project")], registry
+    )
+    assert [s.body for s in loaded] == ["beta body\n", "alpha body\n"]
+    with pytest.raises(SkillNotFoundError):
+        loader.load_selection([SkillReference("nope")], registry)
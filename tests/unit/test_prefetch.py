@@ -0,0 +1,110 @@
+"""推测式预取单元测试"""
+from pathlib import Path
+
+import pytest
+
+from src.agent.events import Event, EventStream, EventType
+from src.agent.state import RunState
+from src.skills.cache import SkillBodyCache
+from src.skills.loader import SkillLoadError, SkillLoader
+from src.skills.prefetch import CooccurrenceStats, SkillPrefetcher
+from src.skills.registry import SkillRegistry
+from src.skills.search import SkillSearchIndex
+from src.skills.sections import SectionIndexCache
+
+
+def _write_skill(root: Path, name: str, description: str, body: str = "body\n") -> Path:
+    skill_dir = root / name
+    skill_dir.mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {description}\n---\n{body}", encoding="utf-8"
+    )
+    return skill_dir
+
+
+@pytest.fixture
+def env(tmp_path):
+    _write_skill(tmp_path, "pdf-filler", "Fill pdf form fields")
+    _write_skill(tmp_path, "excel-report", "Build excel report")
+    ref = _write_skill(tmp_path, "chart", "Draw chart images") / "reference.md"
+    ref.write_text("# Colors\nred\n", encoding="utf-8")
+    registry = SkillRegistry([{"source": "project", "path": str(tmp_path)}])
+    index = SkillSearchIndex()
+    for metadata in registry.scan_all():
+        index.add(metadata)
+    loader = SkillLoader(cache=SkillBodyCache(), section_cache=SectionIndexCache())
+    return registry, index, loader
+
+
+def test_cooccurrence_from_run_logs(tmp_path):
+    log = tmp_path / "run.jsonl"
+    stream = EventStream(log)
+    for run_id, names in (("r1", ["a", "b"]), ("r2", ["a", "b", "c"]), ("r3", ["a", "c"])):
+        for name in names:
+            stream.emit(Event(EventType.SKILL_LOADED, run_id, 1, {"name": name}))
+    stream.emit(Event(EventType.RESOURCE_LOADED, "r1", 2,
+                      {"skill": "a", "relative_path": "ref.md"}))
+    stats = CooccurrenceStats.from_run_logs([log])
+    assert stats.runs == 3
+    assert stats.related(["a"]) == ["b", "c"]
+    assert stats.related(["a", "b"]) == ["c"]
+    assert stats.resources("a") == ["ref.md"]
+
+
+def test_prefetch_warms_bodies_and_reports_hit_rate(env):
+    registry, index, loader = env
+    cooccurrence = CooccurrenceStats()
+    cooccurrence.add_run(["pdf-filler", "chart"], [("chart", "reference.md")])
+    prefetcher = SkillPrefetcher(registry, loader, index, cooccurrence, top_k=1)
+
+    assert [m.name for m in prefetcher.candidates(["excel report"], ["pdf-filler"])] == [
+        "excel-report", "chart",
+    ]
+    prefetcher.start(["excel report"], selected=["pdf-filler"]).wait(timeout=5)
+    assert len(loader.cache) == 2
+    assert loader.section_cache.stats()["entries"] == 1
+
+    assert prefetcher.record_skill_use("excel-report")
+    assert prefetcher.record_resource_use("chart", "reference.md")
+    assert not prefetcher.record_skill_use("pdf-filler")
+    state = RunState(run_id="r", request="q")
+    prefetcher.report(state)
+    prefetcher.shutdown()
+    assert state.metrics["prefetch"]["hits"] == 2
+    assert state.metrics["prefetch"]["hit_rate"] == round(2 / 3, 4)
+    assert state.to_dict()["metrics"]["prefetch"]["prefetched"] == 3
+
+
+def test_prefetch_respects_byte_budget(env):
+    registry, index, loader = env
+    prefetcher = SkillPrefetcher(registry, loader, index, max_bytes=10)
+    prefetcher.start(["pdf form"]).wait(timeout=5)
+    prefetcher.shutdown()
+    assert len(loader.cache) == 0
+    assert prefetcher.stats()["prefetched"] == 0
+
+
+def test_cancelled_prefetch_loads_nothing(env):
+    registry, index, loader = env
+    prefetcher = SkillPrefetcher(registry, loader, index)
+    task = prefetcher.start(["pdf form"])
+    task.cancel()
+    task.wait(timeout=5)
+    prefetcher.shutdown()
+    assert task.cancelled
+    assert prefetcher.stats()["hits"] == 0
+
+
+def test_failed_load_is_not_counted(env, monkeypatch):
+    registry, index, loader = env
+
+    def broken(*args, **kwargs):
+        raise SkillLoadError("disk error")
+
+    monkeypatch.setattr(loader, "load_body", broken)
+    prefetcher = SkillPrefetcher(registry, loader, index, top_k=1)
+    prefetcher.start(["pdf form"]).wait(timeout=5)
+    prefetcher.shutdown()
+    stats = prefetcher.stats()
+    assert stats["prefetched"] == 0 and stats["bytes"] == 0
+    assert not prefetcher.record_skill_use("pdf-filler")
@@ -0,0 +1,89 @@
+"""前缀稳定提示词构建器单元测试"""
+from pathlib import Path
+
+from src.agent.plan import Plan, PlanStep, StepStatus
+from src.agent.prompt_builder import PromptBuilder, canonical_json, common_prefix_length
+from src.agent.state import Observation, RunState
+from src.skills.metadata import LoadedSkill, SkillMetadata
+
+
+def _skill(name, source="project"):
+    return SkillMetadata(
+        skill_id=f"{source}:{name}:unversioned", name=name, description=f"{name} skill",
+        source=source, path=Path(f"/skills/{name}"), scanned_at="2024-01-01T00:00:00",
+    )
+
+
+def _state(skills):
+    return RunState(run_id="r", request="fill the form", skill_index=list(skills))
+
+
+def test_canonical_json_and_prefix_length():
+    assert canonical_json({"b": 1, "a": "é"}) == '{"a":"é","b":1}'
+    assert common_prefix_length("abc", "abd") == 2
+    long = "x" * 10000
+    assert common_prefix_length(long + "a", long + "b") == 10000
+    assert common_prefix_length(long, long) == 10000
+
+
+def test_index_order_does_not_depend_on_registry_order():
+    skills = [_skill("b"), _skill("a"), _skill("c", "user")]
+    first = PromptBuilder("rules").build(_state(skills))
+    second = PromptBuilder("rules").build(_state(reversed(skills)))
+    assert first.text == second.text
+    assert "scanned_at" not in first.text
+    assert first.messages[0]["role"] == "system"
+    assert first.messages[0]["content"].startswith("rules")
+    assert "fill the form" in first.messages[1]["content"]
+    assert first.text == "\n\n".join(m["content"] for m in first.messages)
+
+
+def test_segments_follow_stability_order():
+    state = _state([_skill("a")])
+    state.loaded_skills["a"] = LoadedSkill(
+        _skill("a"), "body of a", loaded_at_turn=1, token_estimate=3
+    )
+    state.plan = Plan(goal="g", steps=[PlanStep("s1", "step")])
+    state.add_observation(Observation("read_file", True, {"content": "x"}))
+    built = PromptBuilder("rules").build(state)
+    assert [s.kind for s in built.segments] == [
+        "system", "skill_index", "request", "skill_bodies", "plan", "observations", "budget",
+    ]
+    assert '"timestamp"' not in built.text
+
+
+def test_prefix_is_reused_across_turns():
+    builder = PromptBuilder("rules " * 200)
+    state = _state([_skill(f"s{i}") for i in range(20)])
+    builder.build(state)
+
+    state.loaded_skills["s3"] = LoadedSkill(_skill("s3"), "step one\nstep two", 1, 4)
+    state.budget.consume_turn()
+    second = builder.build(state)
+    assert second.first_changed_segment == "skill_bodies"
+    request_end = second.text.index("fill the form") + len("fill the form")
+    assert request_end < second.shared_prefix_chars < second.text.index("step one")
+
+    state.add_observation(Observation("run_script", True, {"stdout": "ok"}, turn=2))
+    state.budget.consume_turn()
+    third = builder.build(state)
+    assert third.first_changed_segment == "observations"
+    # 已加载的技能正文整体位于公共前缀内
+    assert third.shared_prefix_chars > third.text.index("step two")
+    assert state.metrics["prompt"]["shared_prefix_chars"] == third.shared_prefix_chars
+    assert 0 < builder.overall_reuse < 1
+
+    # 计划状态变化只影响计划及之后的分区
+    state.plan = Plan(goal="g", steps=[PlanStep("s1", "step")])
+    builder.build(state)
+    state.plan.update_step_status("s1", StepStatus.COMPLETED)
+    assert builder.build(state).first_changed_segment == "plan"
+
+
+def test_reset_starts_new_run():
+    builder = PromptBuilder("rules")
+    builder.build(_state([]))
+    builder.reset()
+    built = builder.build(_state([]))
+    assert built.shared_prefix_chars == 0 and built.first_changed_segment is None
+    assert builder.turns == 1
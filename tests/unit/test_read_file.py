@@ -0,0 +1,130 @@
+"""read_file 工具单元测试"""
+from pathlib import Path
+
+import pytest
+
+from src.common.config import Config
+from src.common.security import PathTraversalError
+from src.tools.read_file import ReadFileError, ReadFileTool
+
+
+def _write(tmp_path: Path, name: str, text: str) -> Path:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_small_file_is_returned_whole(tmp_path):
+    _write(tmp_path, "a.md", "hello\nworld\n")
+    result = ReadFileTool().read(tmp_path, "a.md")
+    assert result.content == "hello\nworld\n"
+    assert result.eof and not result.excerpt
+    assert result.to_metadata()["next_offset"] is None
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 1 << 30])
+def test_oversized_file_returns_head_tail_excerpt(tmp_path, mmap_threshold):
+    lines = "".join(f"line {i}\n" for i in range(10000))
+    _write(tmp_path, "big.txt", lines)
+    tool = ReadFileTool(max_bytes=4096, excerpt_bytes=100, mmap_threshold=mmap_threshold)
+    result = tool.read(tmp_path, "big.txt")
+    assert result.excerpt
+    assert result.size == len(lines)
+    assert result.content.startswith("line 0\n")
+    assert result.content.endswith("line 9999\n")
+    head, _, tail = result.content.partition("bytes omitted")
+    assert len(head) < 200 and len(tail) < 200
+    assert result.omitted_bytes > len(lines) - 300
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 1 << 30])
+def test_byte_ranges_page_through_file(tmp_path, mmap_threshold):
+    text = "αβγ" * 1000
+    _write(tmp_path, "u.txt", text)
+    tool = ReadFileTool(max_bytes=1001, mmap_threshold=mmap_threshold)
+    pieces, offset = [], 0
+    while offset is not None:
+        result = tool.read(tmp_path, "u.txt", offset=offset)
+        assert "�" not in result.content
+        assert result.end_offset - result.offset <= 1001
+        pieces.append(result.content)
+        offset = result.to_metadata()["next_offset"]
+    assert "".join(pieces) == text
+    assert tool.read(tmp_path, "u.txt", offset=2, length=4).content == "βγ"
+
+
+@pytest.mark.parametrize("mmap_threshold", [1, 1 << 30])
+def test_line_ranges_and_paging(tmp_path, mmap_threshold):
+    _write(tmp_path, "l.txt", "".join(f"row {i}\n" for i in range(1, 3001)))
+    tool = ReadFileTool(mmap_threshold=mmap_threshold)
+    result = tool.read(tmp_path, "l.txt", start_line=10, end_line=12)
+    assert result.content == "row 10\nrow 11\nrow 12\n"
+    metadata = result.to_metadata()
+    assert (metadata["end_line"], metadata["next_line"]) == (12, 13)
+    assert tool.read(tmp_path, "l.txt", start_line=2999).content == "row 2999\nrow 3000\n"
+    past = tool.read(tmp_path, "l.txt", start_line=5000)
+    assert past.content == "" and past.eof
+
+    capped_tool = ReadFileTool(max_bytes=20, mmap_threshold=mmap_threshold)
+    capped = capped_tool.read(tmp_path, "l.txt", start_line=1)
+    assert capped.content == "row 1\nrow 2\nrow 3\n"
+    assert capped.to_metadata()["next_line"] == 4
+
+
+def test_line_checkpoints_are_reused_and_invalidated(tmp_path):
+    path = _write(tmp_path, "c.txt", "x" * 50 + "\n" + "".join(f"{i}\n" for i in range(200000)))
+    tool = ReadFileTool(mmap_threshold=1)
+    assert tool.read(tmp_path, "c.txt", start_line=150000, end_line=150000).content == "149998\n"
+    assert len(tool._checkpoints) == 1
+    checkpoints = next(iter(tool._checkpoints.values()))
+    assert max(checkpoints.lines) > 100000
+    assert tool.read(tmp_path, "c.txt", start_line=150001, end_line=150001).content == "149999\n"
+
+    path.write_text("new\n" * 300000, encoding="utf-8")
+    assert tool.read(tmp_path, "c.txt", start_line=150000, end_line=150000).content == "new\n"
+    assert len(tool._checkpoints) == 1
+
+
+def test_far_then_earlier_line_reads_on_same_instance(tmp_path):
+    """跨块跳行记录的检查点必须是真实行首，之后读取更靠前的行仍然正确"""
+    _write(tmp_path, "w.txt", "".join(f"line{i:06d}-" + "x" * 89 + "\n" for i in range(30000)))
+    tool = ReadFileTool(mmap_threshold=1)
+    last = tool.read(tmp_path, "w.txt", start_line=20000, end_line=20000)
+    assert last.content.startswith("line019999-")
+    # 第 10382 行跨越 1 MiB 块边界
+    for target in (10382, 10383, 15000, 5):
+        expected = f"line{target - 1:06d}-" + "x" * 89 + "\n"
+        assert tool.read(tmp_path, "w.txt", start_line=target, end_line=target).content == expected
+        assert ReadFileTool(mmap_threshold=1).read(
+            tmp_path, "w.txt", start_line=target, end_line=target).content == expected
+
+
+def test_long_single_line_is_cut_at_cap(tmp_path):
+    _write(tmp_path, "one.txt", "y" * 100)
+    result = ReadFileTool(max_bytes=30).read(tmp_path, "one.txt", start_line=1)
+    assert result.content == "y" * 30
+    assert result.to_metadata()["next_offset"] == 30
+
+
+def test_errors(tmp_path):
+    (tmp_path / "bin.dat").write_bytes(b"\0\1\2")
+    tool = ReadFileTool()
+    with pytest.raises(PathTraversalError):
+        tool.read(tmp_path, "../x")
+    with pytest.raises(ReadFileError):
+        tool.read(tmp_path, "bin.dat")
+    with pytest.raises(ReadFileError):
+        tool.read(tmp_path, "bin.dat", offset=0, start_line=1)
+    assert tool.run(tmp_path, "missing.txt").error.startswith("InvalidRequest")
+    assert tool.run(tmp_path, "/etc/passwd").error.startswith("PathTraversalBlocked")
+
+    _write(tmp_path, "ok.txt", "fine\n")
+    obs = tool.run(tmp_path, "ok.txt", turn=4)
+    assert obs.success and obs.output["content"] == "fine\n"
+    assert obs.metadata["size"] == 5 and obs.turn == 4
+
+
+def test_from_config():
+    tool = ReadFileTool.from_config(Config())
+    assert tool.max_bytes == 2_000_000
+    assert tool.excerpt_bytes == 8192
@@ -0,0 +1,309 @@
+"""Skill Registry 单元测试"""
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.agent.events import EventStream, EventType
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import SkillRegistry, resolve_conflicts, version_rank
+from src.skills.watcher import SkillWatcher
+
+
+def _write_skill(root: Path, dirname: str, name: str, description: str = "desc",
+                 extra: str = "") -> Path:
+    skill_dir = root / dirname
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {description}\n{extra}---\n# Body\n",
+        encoding="utf-8",
+    )
+    return skill_dir
+
+
+def _bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def roots(tmp_path):
+    project = tmp_path / "project"
+    user = tmp_path / "user"
+    project.mkdir()
+    user.mkdir()
+    return project, user
+
+
+def _registry(project: Path, user: Path) -> SkillRegistry:
+    return SkillRegistry([
+        {"source": "user", "path": str(user), "priority": 1},
+        {"source": "project", "path": str(project), "priority": 0},
+    ])
+
+
+# ──────────────────────────────────────────
+# 全量扫描
+# ──────────────────────────────────────────
+
+def test_scan_multiple_roots(roots):
+    project, user = roots
+    _write_skill(project, "a", "alpha")
+    _write_skill(user, "b", "beta")
+    registry = _registry(project, user)
+    skills = registry.scan_all()
+    assert [s.name for s in skills] == ["alpha", "beta"]
+    assert registry.find_skill("beta").source == "user"
+
+
+def test_scan_ignores_hidden_and_missing_skill_file(roots):
+    project, user = roots
+    _write_skill(project, ".hidden", "hidden")
+    (project / "empty").mkdir()
+    (project / "file.txt").write_text("x")
+    registry = _registry(project, user)
+    assert registry.scan_all() == []
+
+
+def test_scan_records_invalid_frontmatter(roots):
+    project, user = roots
+    bad = project / "bad"
+    bad.mkdir()
+    (bad / "SKILL.md").write_text("no frontmatter", encoding="utf-8")
+    registry = _registry(project, user)
+    registry.scan_all()
+    report = registry.get_scan_report()
+    assert report["discovered"] == 1
+    assert report["valid"] == 0
+    assert report["ignored"][0]["path"] == str(bad)
+
+
+def test_conflict_resolved_by_root_priority(roots):
+    project, user = roots
+    _write_skill(project, "dup", "dup", "project version")
+    _write_skill(user, "dup", "dup", "user version")
+    registry = _registry(project, user)
+    skills = registry.scan_all()
+    assert len(skills) == 1
+    assert skills[0].source == "project"
+    assert registry.find_skill("dup", source="user").description == "user version"
+    assert len(registry.get_scan_report()["conflicts"]) == 1
+
+
+def _meta(name: str, source: str, version=None, load_priority="normal") -> SkillMetadata:
+    return SkillMetadata(
+        skill_id=SkillMetadata.generate_skill_id(source, name, version), name=name,
+        description="d", source=source, path=Path(f"/{source}/{name}-{version}"),
+        version=version, load_priority=load_priority,
+    )
+
+
+def test_resolve_conflicts_tie_breakers():
+    resolution = resolve_conflicts([
+        (_meta("a", "user", "9.0"), 1),
+        (_meta("a", "project", "1.0", "low"), 0),
+        (_meta("a", "project", "2.0", "high"), 0),
+        (_meta("b", "project", "1.0.0-beta"), 0),
+        (_meta("b", "project", "1.0.0"), 0),
+        (_meta("b", "project", "1.10.0"), 0),
+        (_meta("b", "project"), 0),
+    ])
+    assert resolution.winners["a"].version == "2.0"
+    assert resolution.winners["b"].version == "1.10.0"
+    reasons = [(item["shadowed"], item["reason"]) for item in resolution.shadowed]
+    assert reasons == [
+        ("project:a:1.0", "load_priority"),
+        ("user:a:9.0", "root_priority"),
+        ("project:b:1.0.0", "version"),
+        ("project:b:1.0.0-beta", "version"),
+        ("project:b:unversioned", "version"),
+    ]
+
+
+def test_version_rank_pads_release_segments():
+    assert version_rank("1.0") == version_rank("1.0.0") == version_rank("v1")
+    assert version_rank("1.0.1") < version_rank("1.0.0") < version_rank("0.9.9")
+    assert version_rank("1.0.0") < version_rank("1.0.0-rc1") < version_rank("0.9")
+    assert version_rank("1.0") < version_rank("1.0-rc1")
+    assert version_rank("0.1") < version_rank(None)
+
+    resolution = resolve_conflicts([
+        (_meta("c", "project", "1.0.1"), 0),
+        (_meta("c", "project", "1.0"), 0),
+    ])
+    assert resolution.winners["c"].version == "1.0.1"
+
+
+def test_shadowed_report_follows_incremental_refresh(roots):
+    project, user = roots
+    _write_skill(user, "dup", "dup")
+    registry = _registry(project, user)
+    registry.scan_all()
+    assert registry.get_shadowed() == []
+
+    _write_skill(project, "dup", "dup")
+    registry.refresh_changes()
+    assert registry.find_skill("dup").source == "project"
+    assert [item["reason"] for item in registry.get_scan_report()["conflicts"]] == ["root_priority"]
+
+
+def test_missing_root_is_skipped(tmp_path):
+    registry = SkillRegistry([{"source": "project", "path": str(tmp_path / "nope")}])
+    assert registry.scan_all() == []
+
+
+# ──────────────────────────────────────────
+# 增量刷新
+# ──────────────────────────────────────────
+
+def test_refresh_changes_no_change(roots):
+    project, user = roots
+    _write_skill(project, "a", "alpha")
+    registry = _registry(project, user)
+    registry.scan_all()
+    version = registry.version
+    assert registry.refresh_changes().is_empty()
+    assert registry.version == version
+
+
+def test_refresh_changes_detects_added_removed_modified(roots):
+    project, user = roots
+    _write_skill(project, "a", "alpha")
+    removed_dir = _write_skill(project, "b", "beta")
+    registry = _registry(project, user)
+    registry.scan_all()
+    version = registry.version
+
+    _write_skill(project, "c", "gamma")
+    modified = _write_skill(project, "a", "alpha", "new description")
+    _bump_mtime(modified / "SKILL.md")
+    (removed_dir / "SKILL.md").unlink()
+
+    changes = registry.refresh_changes()
+    assert [m.name for m in changes.added] == ["gamma"]
+    assert [m.name for m in changes.removed] == ["beta"]
+    assert [m.name for m in changes.modified] == ["alpha"]
+    assert [m.description for m in changes.previous] == ["desc"]
+    assert changes.resolved["beta"] is None
+    assert changes.resolved["alpha"].description == "new description"
+    assert registry.version == version + 1
+    assert registry.find_skill("alpha").description == "new description"
+    assert registry.find_skill("beta") is None
+    assert registry.find_skill("gamma") is not None
+
+
+def test_refresh_changes_reresolves_conflicts(roots):
+    project, user = roots
+    _write_skill(user, "dup", "dup", "user version")
+    registry = _registry(project, user)
+    registry.scan_all()
+    assert registry.find_skill("dup").source == "user"
+
+    project_dir = _write_skill(project, "dup", "dup", "project version")
+    registry.refresh_changes()
+    assert registry.find_skill("dup").source == "project"
+
+    (project_dir / "SKILL.md").unlink()
+    registry.refresh_changes()
+    assert registry.find_skill("dup").source == "user"
+
+
+def test_refresh_changes_broken_skill_is_removed(roots):
+    project, user = roots
+    skill_dir = _write_skill(project, "a", "alpha")
+    registry = _registry(project, user)
+    registry.scan_all()
+    (skill_dir / "SKILL.md").write_text("broken", encoding="utf-8")
+    _bump_mtime(skill_dir / "SKILL.md")
+    changes = registry.refresh_changes()
+    assert [m.name for m in changes.removed] == ["alpha"]
+    assert registry.find_skill("alpha") is None
+
+
+# ──────────────────────────────────────────
+# Level 1 索引片段
+# ──────────────────────────────────────────
+
+def test_render_index_reuses_fragment_until_change(roots):
+    project, user = roots
+    _write_skill(project, "b", "beta", "Beta skill")
+    _write_skill(user, "a", "alpha", "Alpha skill")
+    registry = _registry(project, user)
+    registry.scan_all()
+
+    fragment = registry.render_index()
+    assert fragment.text == (
+        "Available Skills:\n"
+        "- name=alpha | source=user | description=Alpha skill\n"
+        "- name=beta | source=project | description=Beta skill\n"
+    )
+    assert fragment.skill_count == 2
+    assert fragment.token_estimate == len(fragment.text) // 4
+    registry.refresh_changes()
+    assert registry.render_index() is fragment
+
+    _write_skill(project, "c", "gamma")
+    registry.refresh_changes()
+    updated = registry.render_index()
+    assert updated is not fragment and updated.version == registry.version
+    assert "gamma" in updated.text
+
+
+def test_render_index_filters(roots):
+    project, user = roots
+    _write_skill(project, "a", "alpha")
+    _write_skill(project, "h", "hidden", extra="disable-model-invocation: true\n")
+    _write_skill(user, "m", "manual", extra="user-invocable: false\n")
+    registry = _registry(project, user)
+    registry.scan_all()
+
+    assert "hidden" not in registry.render_index().text
+    assert "hidden" in registry.render_index(disable_model_invocation=None).text
+    assert registry.render_index(source="user").skill_count == 1
+    assert registry.render_index(user_invocable=True).skill_count == 1
+
+
+# ──────────────────────────────────────────
+# SkillWatcher
+# ──────────────────────────────────────────
+
+def test_watcher_poll_emits_events(roots):
+    project, user = roots
+    registry = _registry(project, user)
+    registry.scan_all()
+    stream = EventStream()
+    received = []
+    stream.add_handler(received.append)
+    watcher = SkillWatcher(registry, event_stream=stream)
+    diffs = []
+    watcher.add_listener(diffs.append)
+
+    _write_skill(project, "a", "alpha")
+    changes = watcher.poll()
+
+    assert [m.name for m in changes.added] == ["alpha"]
+    assert [e.type for e in received] == [EventType.SKILL_ADDED]
+    assert received[0].data["name"] == "alpha"
+    assert received[0].data["index_version"] == registry.version
+    assert diffs == [changes]
+
+    received.clear()
+    assert watcher.poll().is_empty()
+    assert received == []
+
+
+def test_watcher_background_thread(roots):
+    project, user = roots
+    registry = _registry(project, user)
+    registry.scan_all()
+    watcher = SkillWatcher(registry, interval=0.01)
+    seen = threading.Event()
+    watcher.add_listener(lambda changes: seen.set())
+    watcher.start()
+    try:
+        _write_skill(project, "a", "alpha")
+        assert seen.wait(2.0)
+    finally:
+        watcher.stop(timeout=2.0)
+    assert registry.find_skill("alpha") is not None
@@ -0,0 +1,121 @@
+"""模型响应缓存单元测试"""
+import json
+
+from src.agent.events import EventStream, EventType
+from src.common.config import Config
+from src.model.adapter import ModelRequest, ModelResponse
+from src.model.factory import create_model_adapter
+from src.model.mock import MockModel
+from src.model.openai_compat import OpenAICompatModel
+from src.model.response_cache import CachingModel, ModelResponseCache
+from src.model.stub_server import StubModelServer
+
+
+def _request(content="hello", **params):
+    return ModelRequest(messages=[{"role": "user", "content": content}], model="m", params=params)
+
+
+def test_miss_then_hit_skips_inner_model(tmp_path):
+    inner = MockModel(responses=["one", "two"])
+    model = CachingModel(inner, ModelResponseCache(tmp_path))
+
+    first = model.generate(_request(temperature=0))
+    second = model.generate(_request(temperature=0))
+    assert first.text == second.text == "one"
+    assert second.metadata["cache_hit"] is True
+    assert inner.calls == 1
+    # 参数不同是不同的键
+    assert model.generate(_request(temperature=1)).text == "two"
+    assert model.cache.stats()["hits"] == 1
+
+
+def test_streamed_response_replays_as_stream(tmp_path):
+    inner = MockModel(responses=["abcdefgh"], chunk_size=3)
+    model = CachingModel(inner, ModelResponseCache(tmp_path))
+    live, replayed = [], []
+    model.generate_streaming(_request(), live.append)
+    response = model.generate_streaming(_request(), replayed.append)
+    assert replayed == live == ["abc", "def", "gh"]
+    assert response.text == "abcdefgh"
+    assert inner.calls == 1
+
+    # 非流式写入的条目作为单个 delta 回放
+    model.generate(_request("other"))
+    single = []
+    model.generate_streaming(_request("other"), single.append)
+    assert single == ["abcdefgh"]
+
+
+def test_disk_store_survives_new_instance(tmp_path):
+    first = CachingModel(MockModel(responses=["persisted"]), ModelResponseCache(tmp_path))
+    first.generate(_request())
+    inner = MockModel(responses=["fresh"])
+    cache = ModelResponseCache(tmp_path)
+    assert CachingModel(inner, cache).generate(_request()).text == "persisted"
+    assert inner.calls == 0
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_key_includes_adapter_model_and_params(tmp_path):
+    with StubModelServer(MockModel(responses=["first", "second"])) as stub:
+        cold = CachingModel(
+            OpenAICompatModel(stub.base_url, model="m1", params={"temperature": 0}),
+            ModelResponseCache(tmp_path),
+        )
+        hot = CachingModel(
+            OpenAICompatModel(stub.base_url, model="m2", params={"temperature": 1.0}),
+            ModelResponseCache(tmp_path),
+        )
+        request = ModelRequest(messages=[{"role": "user", "content": "hi"}])
+        assert cold.generate(request).text == "first"
+        response = hot.generate(request)
+        assert response.text == "second"
+        assert "cache_hit" not in response.metadata
+        assert cold.generate(request).metadata["cache_hit"] is True
+
+
+def test_memory_lru_and_ttl(tmp_path):
+    cache = ModelResponseCache(max_memory_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, ModelResponse(key))
+    assert cache.get("a") is None
+    assert cache.get("c").response.text == "c"
+
+    expired = ModelResponseCache(tmp_path, ttl_sec=-1)
+    expired.put("k", ModelResponse("x"))
+    assert expired.get("k") is None
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_size_caps(tmp_path):
+    cache = ModelResponseCache(tmp_path, max_bytes=600, max_entry_bytes=400)
+    assert cache.put("big", ModelResponse("x" * 1000)) is False
+    assert cache.put("err", ModelResponse("", finish_reason="error")) is False
+    for key in ("k1", "k2", "k3"):
+        assert cache.put(key, ModelResponse("y" * 100))
+    assert cache.stats()["disk_bytes"] <= 600
+    assert not (tmp_path / "k1"[:2] / "k1.json").exists()
+
+
+def test_hit_and_miss_events():
+    events = []
+    stream = EventStream()
+    stream.add_handler(events.append)
+    model = CachingModel(MockModel(), ModelResponseCache(), event_stream=stream, run_id="run-1")
+    request = _request()
+    request.telemetry = {"turn": 3}
+    model.generate(request)
+    model.generate(request)
+    assert [e.type for e in events] == [EventType.MODEL_CACHE_MISS, EventType.MODEL_CACHE_HIT]
+    assert events[1].run_id == "run-1" and events[1].turn == 3
+    assert events[1].data["hits"] == 1 and events[1].data["misses"] == 1
+
+
+def test_factory_wraps_cache(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"model": {
+        "response_cache": {"enabled": True, "dir": str(tmp_path / "c")},
+    }}))
+    assert isinstance(create_model_adapter(Config(path)), CachingModel)
+    path.write_text(json.dumps({}))
+    assert isinstance(create_model_adapter(Config(path)), MockModel)
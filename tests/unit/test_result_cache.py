@@ -0,0 +1,169 @@
+"""脚本结果缓存单元测试"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.agent.state import ToolBudget
+from src.common.config import Config
+from src.skills.frontmatter import build_metadata
+from src.skills.metadata import SkillMetadata
+from src.tools.executor import ScriptExecutor, ScriptResult
+from src.tools.result_cache import ScriptResultCache
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+
+# 每次执行向计数文件追加一行，用于判断脚本是否真的运行
+_COUNTING_SCRIPT = (
+    "import sys\n"
+    "open('runs.log', 'a').write('x')\n"
+    "print(open('data.txt').read().strip(), *sys.argv[1:])\n"
+)
+
+
+def _skill(tmp_path: Path, cacheable=("scripts/run.py",), inputs=("data.txt",)) -> SkillMetadata:
+    skill_dir = tmp_path / "demo"
+    (skill_dir / "scripts").mkdir(parents=True, exist_ok=True)
+    (skill_dir / "scripts" / "run.py").write_text(_COUNTING_SCRIPT, encoding="utf-8")
+    (skill_dir / "data.txt").write_text("v1", encoding="utf-8")
+    return SkillMetadata(
+        skill_id="project:demo:unversioned", name="demo", description="d",
+        source="project", path=skill_dir,
+        cacheable_scripts=list(cacheable), script_inputs=list(inputs),
+    )
+
+
+def _runs(skill: SkillMetadata) -> int:
+    log = skill.path / "runs.log"
+    return len(log.read_text()) if log.exists() else 0
+
+
+def _executor(tmp_path: Path, **kwargs) -> ScriptExecutor:
+    cache = ScriptResultCache(tmp_path / "cache", **kwargs)
+    return ScriptExecutor(result_cache=cache)
+
+
+def test_hit_skips_execution_and_is_marked(tmp_path):
+    skill = _skill(tmp_path)
+    executor = _executor(tmp_path)
+    first = executor.run_script(skill, "scripts/run.py", ["a"], cwd=skill.path)
+    second = executor.run_script(skill, "scripts/run.py", ["a"], cwd=skill.path)
+    assert first.output == second.output
+    assert not first.metadata["cache_hit"]
+    assert second.metadata["cache_hit"]
+    assert _runs(skill) == 1
+
+
+def test_key_covers_args_script_and_inputs(tmp_path):
+    skill = _skill(tmp_path)
+    executor = _executor(tmp_path)
+    executor.run_script(skill, "scripts/run.py", ["a"], cwd=skill.path)
+    executor.run_script(skill, "scripts/run.py", ["b"], cwd=skill.path)
+    assert _runs(skill) == 2
+
+    (skill.path / "data.txt").write_text("v2", encoding="utf-8")
+    obs = executor.run_script(skill, "scripts/run.py", ["a"], cwd=skill.path)
+    assert obs.output["stdout"] == "v2 a\n"
+    assert _runs(skill) == 3
+
+    with open(skill.path / "scripts" / "run.py", "a") as f:
+        f.write("# changed\n")
+    executor.run_script(skill, "scripts/run.py", ["a"], cwd=skill.path)
+    assert _runs(skill) == 4
+
+
+def test_undeclared_scripts_and_failures_are_not_cached(tmp_path):
+    skill = _skill(tmp_path, cacheable=())
+    executor = _executor(tmp_path)
+    executor.run_script(skill, "scripts/run.py", cwd=skill.path)
+    obs = executor.run_script(skill, "scripts/run.py", cwd=skill.path)
+    assert not obs.metadata["cache_hit"]
+    assert _runs(skill) == 2
+
+    skill = _skill(tmp_path)
+    (skill.path / "scripts" / "run.py").write_text("import sys\nsys.exit(2)\n")
+    executor.run_script(skill, "scripts/run.py", cwd=skill.path)
+    assert not executor.run_script(skill, "scripts/run.py", cwd=skill.path).metadata["cache_hit"]
+
+
+def test_budget_policy_for_hits(tmp_path):
+    skill = _skill(tmp_path)
+    budget = ToolBudget()
+    executor = _executor(tmp_path)
+    executor.count_cache_hits = False
+    executor.run_script(skill, "scripts/run.py", cwd=skill.path, budget=budget)
+    obs = executor.run_script(skill, "scripts/run.py", cwd=skill.path, budget=budget)
+    assert obs.metadata["cache_hit"] and not obs.metadata["counts_as_execution"]
+    assert budget.script_executions_used == 1
+
+    executor.count_cache_hits = True
+    executor.run_script(skill, "scripts/run.py", cwd=skill.path, budget=budget)
+    assert budget.script_executions_used == 2
+
+
+def test_exhausted_budget_blocks_execution(tmp_path):
+    skill = _skill(tmp_path, cacheable=())
+    budget = ToolBudget(max_script_executions=1)
+    executor = _executor(tmp_path)
+    assert executor.run_script(skill, "scripts/run.py", cwd=skill.path, budget=budget).success
+    obs = executor.run_script(skill, "scripts/run.py", cwd=skill.path, budget=budget)
+    assert not obs.success and obs.error.startswith("BudgetExceeded")
+    assert _runs(skill) == 1 and budget.script_executions_used == 1
+
+    cached = _skill(tmp_path / "c")
+    budget = ToolBudget(max_script_executions=1)
+    executor = _executor(tmp_path / "c")
+    executor.count_cache_hits = False
+    executor.run_script(cached, "scripts/run.py", cwd=cached.path, budget=budget)
+    # 不计数的缓存命中仍然可用，需要真正执行的调用被拒绝
+    assert executor.run_script(cached, "scripts/run.py", cwd=cached.path, budget=budget).success
+    blocked = asyncio.run(executor.run_script_async(
+        cached, "scripts/run.py", ["new"], cwd=cached.path, budget=budget,
+    ))
+    assert blocked.error.startswith("BudgetExceeded")
+    assert _runs(cached) == 1
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = ScriptResultCache(tmp_path / "cache", max_bytes=600, max_entry_bytes=400, ttl_sec=60)
+    result = ScriptResult(exit_code=0, stdout="x" * 100, stderr="")
+    for key in ("aa1", "bb2", "cc3"):
+        assert cache.put(key, result)
+    assert cache.get("aa1") is None  # 超过总量上限，最早的被淘汰
+    assert cache.get("cc3").stdout == "x" * 100
+    assert not cache.put("dd4", ScriptResult(exit_code=0, stdout="y" * 500, stderr=""))
+    assert not cache.put("ee5", ScriptResult(exit_code=0, stdout="", stderr="", timed_out=True))
+
+    cache.ttl_sec = 0
+    time.sleep(0.01)
+    assert cache.get("cc3") is None
+    assert not (tmp_path / "cache" / "cc" / "cc3.json").exists()
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    ScriptResultCache(tmp_path / "cache").put("ab12", ScriptResult(0, "out", ""))
+    reopened = ScriptResultCache(tmp_path / "cache")
+    assert reopened.get("ab12").stdout == "out"
+    assert reopened.stats()["entries"] == 1
+
+
+def test_frontmatter_and_config(tmp_path):
+    metadata = build_metadata(
+        {"name": "demo", "description": "d",
+         "cacheable-scripts": ["scripts/run.py"], "script-inputs": "data.txt"},
+        "project", tmp_path,
+    )
+    assert metadata.is_cacheable_script("./scripts/run.py")
+    assert metadata.script_inputs == ["data.txt"]
+    assert SkillMetadata.from_dict(metadata.to_dict()).cacheable_scripts == ["scripts/run.py"]
+
+    assert ScriptExecutor.from_config(Config()).result_cache is None
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(
+        {"execution": {"script_cache": {"enabled": True, "dir": str(tmp_path / "c")}}}
+    ))
+    config = Config(config_file)
+    assert ScriptExecutor.from_config(config).result_cache.cache_dir == tmp_path / "c"
@@ -0,0 +1,205 @@
+"""工具运行时单元测试"""
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.agent.actions import (
+    BatchAction,
+    GrepAction,
+    ListDirAction,
+    LoadResourceAction,
+    ReadFileAction,
+    RunScriptAction,
+    SkillReference,
+    parse_action,
+)
+from src.agent.events import EventStream, EventType
+from src.agent.state import ToolBudget
+from src.skills.loader import SkillLoader
+from src.skills.registry import SkillRegistry
+from src.tools.list_dir import DirListingCache, ListDirTool
+from src.tools.runtime import ToolsRuntime
+
+
+def _registry(tmp_path: Path, allowed_tools: str = "") -> SkillRegistry:
+    skill_dir = tmp_path / "skills" / "demo"
+    (skill_dir / "docs").mkdir(parents=True)
+    (skill_dir / "scripts").mkdir()
+    header = "---\nname: demo\ndescription: Demo skill\n"
+    if allowed_tools:
+        header += f"allowed-tools: {allowed_tools}\n"
+    (skill_dir / "SKILL.md").write_text(header + "---\nBody\n", encoding="utf-8")
+    (skill_dir / "docs" / "guide.md").write_text(
+        "# Guide\nalpha\n## Usage\nbeta\n", encoding="utf-8"
+    )
+    (skill_dir / "docs" / "notes.txt").write_text("one\ntwo\nthree\n", encoding="utf-8")
+    (skill_dir / "scripts" / "hi.py").write_text("print('hi')\n", encoding="utf-8")
+    registry = SkillRegistry([
+        {"source": "project", "path": str(tmp_path / "skills"), "priority": 0},
+    ])
+    registry.scan_all()
+    return registry
+
+
+def _runtime(tmp_path: Path, **kwargs) -> ToolsRuntime:
+    if "registry" not in kwargs:
+        kwargs["registry"] = _registry(tmp_path)
+    return ToolsRuntime(
+        loader=SkillLoader(), list_dir=ListDirTool(cache=DirListingCache()), **kwargs
+    )
+
+
+DEMO = SkillReference(name="demo")
+
+
+def test_single_actions_dispatch_and_consume_budget(tmp_path):
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+    runtime = _runtime(tmp_path, event_stream=stream, run_id="r1")
+    budget = ToolBudget()
+
+    read = ReadFileAction(DEMO, "docs/notes.txt", start_line=2, end_line=2)
+    obs = runtime.execute(read, budget, turn=1)
+    assert obs.success and obs.output["content"] == "two\n"
+    assert obs.metadata["skill"] == "demo"
+    listing = runtime.execute(ListDirAction(DEMO, "docs"), budget)
+    assert listing.output["entries"][0]["path"] == "guide.md"
+    found = runtime.execute(GrepAction(DEMO, "beta"), budget)
+    assert found.output["matches"][0]["path"] == "docs/guide.md"
+    obs = runtime.execute(LoadResourceAction(DEMO, "docs/guide.md", "## Usage"), budget)
+    assert obs.success and "beta" in obs.output["text"]
+    script = runtime.execute(RunScriptAction(DEMO, "scripts/hi.py"), budget)
+    assert script.output["stdout"] == "hi\n"
+    assert budget.tool_calls_used == 5
+    assert budget.script_executions_used == 1
+    loaded = [e.data["relative_path"] for e in events if e.type == EventType.RESOURCE_LOADED]
+    assert loaded == ["docs/guide.md"]
+
+
+def test_errors_and_permissions(tmp_path):
+    runtime = _runtime(tmp_path, allowed_tools=["read_file", "grep"])
+    missing = runtime.execute(ReadFileAction(SkillReference("ghost"), "a"))
+    assert missing.error.startswith("SkillNotFound")
+    assert runtime.execute(ListDirAction(DEMO)).error == "ToolNotAllowed: list_dir"
+    assert runtime.execute(ReadFileAction(DEMO, "../x")).error.startswith("InvalidAction")
+
+    runtime = _runtime(tmp_path / "b", registry=_registry(tmp_path / "b", "read_file"))
+    assert runtime.execute(GrepAction(DEMO, "x")).error.startswith("ToolNotAllowed: grep for skill")
+
+
+def test_batch_runs_concurrently_in_order(tmp_path):
+    runtime = _runtime(tmp_path)
+
+    # 三个 read_file 必须同时进行才能都通过屏障，串行执行时会超时失败
+    barrier = threading.Barrier(3)
+
+    def slow_read(action, skill, budget, turn, _orig=runtime._handlers["read_file"]):
+        barrier.wait(timeout=10)
+        return _orig(action, skill, budget, turn)
+
+    runtime._handlers["read_file"] = slow_read
+    batch = parse_action({
+        "action": "batch",
+        "reason": "explore",
+        "actions": [
+            ReadFileAction(DEMO, "docs/notes.txt").to_dict(),
+            ListDirAction(DEMO, recursive=True).to_dict(),
+            ReadFileAction(DEMO, "docs/guide.md").to_dict(),
+            GrepAction(DEMO, "alpha").to_dict(),
+            ReadFileAction(DEMO, "docs/notes.txt", start_line=3).to_dict(),
+        ],
+    })
+    assert isinstance(batch, BatchAction) and batch.validate()
+    budget = ToolBudget()
+    observations = runtime.execute_batch(batch, budget, turn=2)
+    assert [o.action_type for o in observations] == [
+        "read_file", "list_dir", "read_file", "grep", "read_file",
+    ]
+    assert [o.metadata["batch_index"] for o in observations] == [0, 1, 2, 3, 4]
+    assert observations[4].output["content"] == "three\n"
+    assert all(o.success and o.turn == 2 for o in observations)
+    assert budget.tool_calls_used == 5 and budget.turns_used == 0
+
+
+def test_single_action_is_rejected_when_budget_exhausted(tmp_path):
+    runtime = _runtime(tmp_path)
+    budget = ToolBudget(max_tool_calls=1)
+    assert runtime.execute(ReadFileAction(DEMO, "docs/notes.txt"), budget).success
+    for _ in range(2):
+        obs = runtime.execute(ReadFileAction(DEMO, "docs/notes.txt"), budget)
+        assert not obs.success
+        assert obs.error == "BudgetExceeded: tool call budget exhausted (1/1)"
+    obs = asyncio.run(runtime.execute_async(RunScriptAction(DEMO, "scripts/hi.py"), budget))
+    assert obs.error.startswith("BudgetExceeded")
+    assert budget.tool_calls_used == 1 and budget.script_executions_used == 0
+
+
+def test_batch_is_rejected_as_a_whole(tmp_path):
+    runtime = _runtime(tmp_path)
+    budget = ToolBudget(max_tool_calls=3)
+    reads = [ReadFileAction(DEMO, "docs/notes.txt") for _ in range(4)]
+    obs = runtime.execute_batch(BatchAction(reads), budget)
+    assert len(obs) == 1 and obs[0].error.startswith("BudgetExceeded")
+    assert budget.tool_calls_used == 0
+
+    mixed = BatchAction([reads[0], RunScriptAction(DEMO, "scripts/hi.py")])
+    assert not mixed.validate()
+    assert "run_script is not allowed" in runtime.execute_batch(mixed)[0].error
+    missing = BatchAction([reads[0], ReadFileAction(SkillReference("ghost"), "a")])
+    assert runtime.execute_batch(missing)[0].error == "SkillNotFound: ghost (item 1)"
+
+
+def test_async_variants(tmp_path):
+    runtime = _runtime(tmp_path)
+    budget = ToolBudget()
+    batch = BatchAction([
+        ReadFileAction(DEMO, "docs/notes.txt", start_line=2, end_line=2),
+        GrepAction(DEMO, "alpha"),
+        ListDirAction(DEMO, "docs"),
+    ])
+
+    async def main():
+        script = await runtime.execute_async(RunScriptAction(DEMO, "scripts/hi.py"), budget)
+        observations = await runtime.execute_batch_async(batch, budget, turn=3)
+        return script, observations
+
+    script, observations = asyncio.run(main())
+    assert script.output["stdout"] == "hi\n"
+    assert observations[0].output["content"] == "two\n"
+    assert [o.action_type for o in observations] == ["read_file", "grep", "list_dir"]
+    assert [o.metadata["batch_index"] for o in observations] == [0, 1, 2]
+    assert budget.tool_calls_used == 4 and budget.script_executions_used == 1
+
+
+def test_async_cancellation_propagates(tmp_path):
+    stream = EventStream()
+    events = []
+    stream.add_handler(events.append)
+    runtime = _runtime(tmp_path, event_stream=stream, run_id="r1")
+
+    def slow_read(action, skill, budget, turn):
+        time.sleep(0.3)
+
+    runtime._handlers["read_file"] = slow_read
+
+    async def main():
+        task = asyncio.ensure_future(runtime.execute_async(ReadFileAction(DEMO, "docs/notes.txt")))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(main())
+    error = [e for e in events if e.type == EventType.ERROR_OCCURRED][-1]
+    assert error.data["action_type"] == "read_file"
+    assert error.data["error"].startswith("Cancelled")
+
+    async def with_timeout():
+        await asyncio.wait_for(runtime.execute_async(ReadFileAction(DEMO, "docs/notes.txt")), 0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(with_timeout())
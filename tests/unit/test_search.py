@@ -0,0 +1,197 @@
+"""SkillSearchIndex 单元测试"""
+import math
+import os
+import random
+from pathlib import Path
+
+from src.skills.metadata import SkillMetadata
+from src.skills.registry import SkillChanges, SkillRegistry
+from src.skills.search import SkillSearchIndex, tokenize
+
+
+def _meta(name: str, description: str, source: str = "project") -> SkillMetadata:
+    return SkillMetadata(
+        skill_id=SkillMetadata.generate_skill_id(source, name),
+        name=name,
+        description=description,
+        source=source,
+        path=Path(f"/skills/{name}"),
+    )
+
+
+def _brute_force(index: SkillSearchIndex, skills, query: str, k: int):
+    """朴素 BM25 实现，作为对照"""
+    docs = []
+    for skill in skills:
+        terms = {}
+        for t in tokenize(skill.name):
+            terms[t] = terms.get(t, 0) + index.name_weight
+        for t in tokenize(skill.description):
+            terms[t] = terms.get(t, 0) + 1
+        docs.append((skill, terms, sum(terms.values())))
+    n = len(docs)
+    avgdl = sum(length for _, _, length in docs) / n
+    scored = []
+    for skill, terms, length in docs:
+        score = 0.0
+        for t in set(tokenize(query)):
+            tf = terms.get(t)
+            if not tf:
+                continue
+            df = sum(1 for _, other, _ in docs if t in other)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = index.k1 * (1 - index.b + index.b * length / avgdl)
+            score += idf * tf * (index.k1 + 1) / (tf + norm)
+        if score > 0:
+            scored.append((skill.skill_id, score))
+    scored.sort(key=lambda item: -item[1])
+    return scored[:k]
+
+
+# ──────────────────────────────────────────
+# 分词
+# ──────────────────────────────────────────
+
+def test_tokenize_english():
+    assert tokenize("PDF-Form_filler v2") == ["pdf", "form", "filler", "v2"]
+
+
+def test_tokenize_chinese_bigrams():
+    assert tokenize("填写表单") == ["填写", "写表", "表单"]
+    assert tokenize("表") == ["表"]
+
+
+def test_tokenize_mixed():
+    assert tokenize("生成PDF报告") == ["生成", "pdf", "报告"]
+
+
+# ──────────────────────────────────────────
+# 检索
+# ──────────────────────────────────────────
+
+def test_search_ranks_relevant_first():
+    index = SkillSearchIndex()
+    index.add(_meta("pdf-form-filler", "Extract and fill PDF form fields"))
+    index.add(_meta("code-review", "Review a Python codebase"))
+    index.add(_meta("excel-report", "生成 Excel 报告"))
+    results = index.search("fill a pdf form")
+    assert results[0][0].name == "pdf-form-filler"
+    assert index.search("生成报告")[0][0].name == "excel-report"
+
+
+def test_search_name_weighted_higher():
+    index = SkillSearchIndex()
+    index.add(_meta("translate", "Convert text between languages"))
+    index.add(_meta("helper", "Can translate short snippets among many other things"))
+    assert index.search("translate")[0][0].name == "translate"
+
+
+def test_search_empty_and_no_match():
+    index = SkillSearchIndex()
+    assert index.search("anything") == []
+    index.add(_meta("a", "alpha"))
+    assert index.search("zzz") == []
+    assert index.search("alpha", k=0) == []
+
+
+def test_search_source_filter():
+    index = SkillSearchIndex()
+    index.add(_meta("pdf", "pdf tool", source="project"))
+    index.add(_meta("pdf", "pdf tool", source="user"))
+    results = index.search("pdf", source="user")
+    assert [m.source for m, _ in results] == ["user"]
+
+
+def test_add_replaces_and_remove():
+    index = SkillSearchIndex()
+    index.add(_meta("a", "alpha"))
+    index.add(_meta("a", "beta"))
+    assert len(index) == 1
+    assert index.search("alpha") == []
+    assert index.search("beta")[0][0].name == "a"
+    assert index.remove("project:a:unversioned") is True
+    assert index.remove("project:a:unversioned") is False
+    assert len(index) == 0
+
+
+def test_apply_changes():
+    index = SkillSearchIndex()
+    old = _meta("old", "legacy tool")
+    index.add(old)
+    index.apply_changes(SkillChanges(
+        added=[_meta("new", "fresh tool")],
+        removed=[old],
+    ))
+    assert "project:old:unversioned" not in index
+    assert "project:new:unversioned" in index
+
+
+def _write_skill(root: Path, name: str, description: str, version: str) -> Path:
+    skill_file = root / name / "SKILL.md"
+    skill_file.parent.mkdir(parents=True, exist_ok=True)
+    skill_file.write_text(
+        f"---\nname: {name}\ndescription: {description}\nversion: {version}\n---\n",
+        encoding="utf-8",
+    )
+    st = skill_file.stat()
+    os.utime(skill_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    return skill_file
+
+
+def test_apply_registry_changes_version_bump_and_shadowing(tmp_path):
+    project, user = tmp_path / "project", tmp_path / "user"
+    _write_skill(project, "pdf", "fill pdf forms", "1.0")
+    registry = SkillRegistry([
+        {"source": "project", "path": str(project), "priority": 0},
+        {"source": "user", "path": str(user), "priority": 1},
+    ])
+    index = SkillSearchIndex()
+    for metadata in registry.scan_all():
+        index.add(metadata)
+
+    _write_skill(project, "pdf", "fill pdf forms", "1.1")
+    index.apply_changes(registry.refresh_changes())
+    assert [m.skill_id for m, _ in index.search("pdf")] == ["project:pdf:1.1"]
+
+    # 被覆盖的同名条目不进入索引
+    _write_skill(user, "pdf", "merge pdf files", "2.0")
+    index.apply_changes(registry.refresh_changes())
+    assert [m.skill_id for m, _ in index.search("pdf")] == ["project:pdf:1.1"]
+
+    # 胜出条目删除后由被覆盖的条目接替
+    (project / "pdf" / "SKILL.md").unlink()
+    index.apply_changes(registry.refresh_changes())
+    assert [m.skill_id for m, _ in index.search("pdf")] == ["user:pdf:2.0"]
+    assert len(index) == 1
+
+
+def test_search_matches_brute_force():
+    """分层 + 阈值算法的 top-k 与朴素 BM25 一致"""
+    rng = random.Random(7)
+    vocab = ["pdf", "form", "excel", "report", "review", "code", "python", "image",
+             "resize", "sql", "报告", "生成", "数据"] + [f"w{i}" for i in range(40)]
+    skills = [
+        _meta(f"s{i}-{rng.choice(vocab)}", " ".join(rng.choices(vocab, k=rng.randint(3, 12))))
+        for i in range(400)
+    ]
+    for tier_budget in (0, 16, 10_000):
+        index = SkillSearchIndex(avgdl_tolerance=0.0, tier_budget=tier_budget)
+        for skill in skills:
+            index.add(skill)
+        for query in ["pdf form", "review python code", "生成报告", "w1 w2 w3 sql", "image"]:
+            expected = _brute_force(index, skills, query, 10)
+            actual = index.search(query, k=10)
+            assert [round(s, 9) for _, s in actual] == [round(s, 9) for _, s in expected]
+
+
+def test_search_disjoint_terms_no_duplicates():
+    """每个技能只命中一个查询词时，多词查询不会重复返回同一技能"""
+    index = SkillSearchIndex()
+    words = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    for word in words:
+        index.add(_meta(f"{word}-tool", f"{word} helper"))
+    for count in (3, 4, 5):
+        results = index.search(" ".join(words[:count]), k=10)
+        ids = [skill.skill_id for skill, _ in results]
+        assert len(ids) == len(set(ids)) == count
+    assert list(SkillSearchIndex._tiers([0b11, 0b1100, 0b110000])) == []
@@ -0,0 +1,118 @@
+"""资源章节索引与片段加载单元测试"""
+from pathlib import Path
+
+import pytest
+
+from src.common.security import PathTraversalError
+from src.skills.cache import SkillBodyCache
+from src.skills.loader import SkillLoader, SkillLoadError
+from src.skills.sections import SectionIndexCache, build_section_index
+
+_DOC = (
+    "# Reference\n"
+    "intro\n"
+    "## 指标定义\n"
+    "metric body\n"
+    "```\n"
+    "# not a heading\n"
+    "```\n"
+    "### Details\n"
+    "detail body\n"
+    "## Usage\n"
+    "usage body\n"
+)
+
+
+def _write(path: Path, content: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content.encode("utf-8"))
+    return path
+
+
+@pytest.fixture
+def loader():
+    return SkillLoader(cache=SkillBodyCache(), section_cache=SectionIndexCache())
+
+
+# ──────────────────────────────────────────
+# 章节索引
+# ──────────────────────────────────────────
+
+def test_markdown_index_skips_fenced_code(tmp_path):
+    index = build_section_index(_write(tmp_path / "ref.md", _DOC))
+    assert index.titles() == ["Reference", "指标定义", "Details", "Usage"]
+    assert index.size == len(_DOC.encode("utf-8"))
+
+
+def test_section_ends_at_same_or_higher_level(tmp_path):
+    data = _DOC.encode("utf-8")
+    index = build_section_index(_write(tmp_path / "ref.md", _DOC))
+    metric = index.find("## 指标定义")
+    assert data[metric.start:metric.end].decode("utf-8").endswith("detail body\n")
+    assert metric.end == data.index(b"## Usage")
+    assert index.sections[0].end == len(data)
+
+
+def test_find_prefers_exact_then_prefix(tmp_path):
+    index = build_section_index(_write(tmp_path / "ref.md", "# Use\n## Usage\n"))
+    assert index.find("use").title == "Use"
+    assert index.find("usa").title == "Usage"
+    assert index.find("missing") is None
+
+
+def test_non_markdown_anchors(tmp_path):
+    toml = build_section_index(_write(tmp_path / "a.toml", "[tool]\nx = 1\n[build]\n"))
+    assert toml.titles() == ["tool", "build"]
+    source = "import os\ndef run():\n    pass\nclass A:\n"
+    py = build_section_index(_write(tmp_path / "a.py", source))
+    assert py.titles() == ["run", "A"]
+
+
+def test_cache_reuses_index_until_file_changes(tmp_path):
+    path = _write(tmp_path / "ref.md", _DOC)
+    cache = SectionIndexCache()
+    first = cache.get_index(path)
+    assert cache.get_index(path) is first
+    _write(path, _DOC + "## Extra\n")
+    assert cache.get_index(path).titles()[-1] == "Extra"
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_separates_same_content_with_different_suffixes(tmp_path):
+    text = "# Title\nkey: 1\n"
+    md = _write(tmp_path / "same.md", text)
+    yaml = _write(tmp_path / "same.yaml", text)
+    cache = SectionIndexCache()
+    assert cache.get_index(md).titles() == ["Title"]
+    assert cache.get_index(yaml).titles() == ["key"]
+    assert cache.get_index(md).titles() == ["Title"]
+    assert cache.stats()["entries"] == 2
+
+
+# ──────────────────────────────────────────
+# 片段加载
+# ──────────────────────────────────────────
+
+def test_load_resource_returns_only_section(tmp_path, loader):
+    _write(tmp_path / "references" / "ref.md", _DOC)
+    excerpt = loader.load_resource(tmp_path, "references/ref.md", section_hint="Usage")
+    assert excerpt.text == "## Usage\nusage body\n"
+    assert excerpt.section_found
+    assert excerpt.bytes_read == len(excerpt.text)
+    assert excerpt.file_bytes == len(_DOC.encode("utf-8"))
+
+
+def test_load_resource_falls_back_to_head(tmp_path, loader):
+    _write(tmp_path / "ref.md", _DOC)
+    excerpt = loader.load_resource(tmp_path, "ref.md", section_hint="nope", max_chars=10)
+    assert excerpt.text == _DOC[:10]
+    assert excerpt.truncated
+    assert not excerpt.section_found
+    assert "Usage" in excerpt.to_dict()["available_sections"]
+
+
+def test_load_resource_rejects_traversal(tmp_path, loader):
+    with pytest.raises(PathTraversalError):
+        loader.load_resource(tmp_path, "../secret.md")
+    with pytest.raises(SkillLoadError):
+        loader.load_resource(tmp_path, "missing.md")
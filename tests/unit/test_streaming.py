@@ -0,0 +1,121 @@
+"""流式 JSON 动作解析器单元测试"""
+import json
+
+import pytest
+
+from src.agent.actions import FinalAnswerAction, SelectSkillsAction
+from src.model.streaming import (
+    StreamingActionParser,
+    StreamingJSONParser,
+    StreamingParseError,
+    compile_path,
+)
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_roundtrip_matches_json_loads_for_any_chunking():
+    doc = {
+        "a": [1, -2.5e3, True, False, None, {"b": []}, {}],
+        "s": "quote \" backslash \\ tab \t unicode é 😀 \u0001",
+        "nested": {"x": {"y": [[], [1, [2]]]}},
+    }
+    text = json.dumps(doc)
+    for size in (1, 2, 3, 7, len(text)):
+        parser = StreamingJSONParser()
+        for chunk in _chunks(text, size):
+            parser.feed(chunk)
+        assert parser.close() == doc
+
+
+def test_value_callbacks_fire_with_paths_as_soon_as_known():
+    text = (
+        '{"action": "select_skills", '
+        '"skills": [{"name": "pdf", "source": "project"}, {"name": "csv"}]}'
+    )
+    parser = StreamingJSONParser()
+    seen = []
+    parser.on_value("action", lambda p, v: seen.append((p, v)))
+    parser.on_value("skills[*].name", lambda p, v: seen.append((p, v)))
+
+    # skills[0].name 在第二个技能到达之前就已回调
+    cut = text.index('{"name": "csv"')
+    parser.feed(text[:cut])
+    assert seen == [("action", "select_skills"), ("skills[0].name", "pdf")]
+    parser.feed(text[cut:])
+    assert seen[-1] == ("skills[1].name", "csv")
+    assert parser.done
+
+
+def test_delta_callbacks_stream_string_content():
+    text = json.dumps({"action": "final_answer", "answer": "line1\nline2 — done"})
+    parser = StreamingJSONParser()
+    deltas = []
+    parser.on_delta("answer", lambda p, d: deltas.append(d))
+    for chunk in _chunks(text, 4):
+        parser.feed(chunk)
+    assert "".join(deltas) == "line1\nline2 — done"
+    assert len(deltas) > 1
+
+
+def test_surrogate_pairs_split_across_chunks():
+    text = '{"s": "\\ud83d\\ude00 \\ud83d x"}'
+    for size in (1, 5, len(text)):
+        parser = StreamingJSONParser()
+        for chunk in _chunks(text, size):
+            parser.feed(chunk)
+        assert parser.close() == json.loads(text)
+
+
+def test_compile_path_wildcards():
+    pattern = compile_path("skills[*].name")
+    assert pattern.match("skills[12].name")
+    assert not pattern.match("skills[0].source")
+    assert not pattern.match("skills[0].name.x")
+    assert compile_path("*.name").match("skill.name")
+
+
+def test_action_parser_tolerates_prose_and_fences():
+    output = (
+        "Sure, here is the next action:\n```json\n"
+        '{"action": "select_skills", "skills": [{"name": "pdf"}], "reason": "needs pdf"}\n'
+        "```\nLet me know."
+    )
+    prefetched = []
+    parser = StreamingActionParser()
+    parser.on_value("skills[*].name", lambda p, v: prefetched.append(v))
+    for chunk in _chunks(output, 3):
+        parser.feed(chunk)
+    action = parser.finish()
+    assert isinstance(action, SelectSkillsAction)
+    assert action.skills[0].name == "pdf"
+    assert prefetched == ["pdf"]
+
+
+def test_action_parser_parse_helper():
+    action = StreamingActionParser.parse(['{"action": "final_', 'answer", "answer": "42"}'])
+    assert isinstance(action, FinalAnswerAction)
+    assert action.answer == "42"
+
+
+@pytest.mark.parametrize("chunks, message", [
+    (['{"action": "final_answer", "answer": "x"'], "Incomplete JSON"),
+    (["no json here"], "Incomplete JSON"),
+    (['{"action": "fly"}'], "Unknown action type"),
+    (['{"action": "final_answer"}'], "Missing field"),
+    (['{"action": "final_answer", "answer": ""}'], "Invalid action"),
+    (['{"action" "x"}'], "Expected ':'"),
+    (['{"a": tru}'], "Invalid literal"),
+])
+def test_action_parser_errors(chunks, message):
+    with pytest.raises(StreamingParseError, match=message):
+        StreamingActionParser.parse(chunks)
+
+
+def test_invalid_json_raises_immediately():
+    parser = StreamingJSONParser()
+    with pytest.raises(StreamingParseError):
+        parser.feed('{"a": 1 "b": 2}')
+    assert isinstance(StreamingParseError("x"), ValueError)
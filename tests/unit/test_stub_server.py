@@ -0,0 +1,162 @@
+"""本地桩模型服务与 OpenAI-compatible 适配器单元测试"""
+import json
+import socket
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.common.config import Config
+from src.model.adapter import ModelRequest, ModelResponse
+from src.model.cassette import Cassette, RecordingModel, ReplayModel
+from src.model.factory import create_model_adapter
+from src.model.mock import MockModel
+from src.model.openai_compat import ModelAPIError, OpenAICompatModel
+from src.model.streaming import StreamingActionParser
+from src.model.stub_server import StubModelServer
+
+_ACTION = {"action": "final_answer", "answer": "all done here", "completed": True}
+
+
+def _request(content="hi"):
+    return ModelRequest(messages=[{"role": "user", "content": content}])
+
+
+@pytest.fixture
+def server():
+    with StubModelServer(MockModel(responses=[_ACTION]), seed=1) as stub:
+        yield stub
+
+
+def test_generate_and_stream(server):
+    model = OpenAICompatModel(server.base_url, model="stub")
+    response = model.generate(_request())
+    assert json.loads(response.text) == _ACTION
+    assert response.usage["completion_tokens"] > 0
+
+    parser = StreamingActionParser()
+    deltas = []
+
+    def on_delta(delta):
+        deltas.append(delta)
+        parser.feed(delta)
+
+    streamed = model.generate_streaming(_request(), on_delta)
+    assert len(deltas) > 1
+    assert streamed.text == response.text
+    assert streamed.finish_reason == "stop"
+    assert parser.finish().answer == "all done here"
+    assert server.stats()["streamed"] == 1
+
+
+def test_health_models_and_not_found(server):
+    with urllib.request.urlopen(server.base_url.replace("/v1", "/health")) as resp:
+        assert json.loads(resp.read()) == {"status": "ok"}
+    with urllib.request.urlopen(f"{server.base_url}/models") as resp:
+        assert json.loads(resp.read())["data"][0]["id"] == "stub"
+    with pytest.raises(urllib.error.HTTPError) as info:
+        urllib.request.urlopen(f"{server.base_url}/nope")
+    assert info.value.code == 404
+
+
+def test_invalid_body_is_rejected(server):
+    request = urllib.request.Request(
+        f"{server.base_url}/chat/completions", data=b"{", method="POST"
+    )
+    with pytest.raises(urllib.error.HTTPError) as info:
+        urllib.request.urlopen(request)
+    assert info.value.code == 400
+
+
+def test_error_injection():
+    with StubModelServer(MockModel(), error_rate=1.0, error_status=429, seed=0) as stub:
+        model = OpenAICompatModel(stub.base_url)
+        with pytest.raises(ModelAPIError) as info:
+            model.generate_streaming(_request())
+        assert info.value.status == 429
+        assert stub.stats()["errors"] == 1
+
+
+def test_latency_and_token_rate():
+    with StubModelServer(MockModel(responses=["a b c d e f g h i j"]), latency_sec=0.05,
+                         tokens_per_sec=100) as stub:
+        model = OpenAICompatModel(stub.base_url)
+        arrivals = []
+        start = time.perf_counter()
+        model.generate_streaming(_request(), lambda d: arrivals.append(time.perf_counter() - start))
+        assert arrivals[0] >= 0.05
+        assert arrivals[-1] - arrivals[0] >= 0.08
+
+
+def test_replays_cassette(tmp_path):
+    cassette = Cassette(tmp_path / "c.json")
+    cassette.record(_request("question"), ModelResponse("recorded reply"), 0.01)
+    with StubModelServer(ReplayModel(cassette)) as stub:
+        model = OpenAICompatModel(stub.base_url)
+        assert model.generate(_request("question")).text == "recorded reply"
+        with pytest.raises(ModelAPIError) as info:
+            model.generate(_request("unknown"))
+        assert info.value.status == 500
+
+
+def test_blocking_adapter_does_not_stall_other_connections():
+    class BlockingModel(MockModel):
+        """每个请求都等到三个请求同时在处理中才返回"""
+
+        def __init__(self):
+            super().__init__(responses=["together"])
+            self.barrier = threading.Barrier(3)
+
+        def generate(self, request):
+            self.barrier.wait(timeout=10)
+            return super().generate(request)
+
+    with StubModelServer(BlockingModel()) as stub:
+        model = OpenAICompatModel(stub.base_url)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            texts = list(pool.map(lambda _: model.generate(_request()).text, range(3)))
+    assert texts == ["together"] * 3
+
+
+def test_cassette_recorded_via_client_replays_via_stub(tmp_path):
+    path = tmp_path / "c.json"
+    with StubModelServer(MockModel(responses=["live reply"])) as live:
+        recorder = RecordingModel(
+            OpenAICompatModel(live.base_url, model="gpt-x", params={"temperature": 0.2}),
+            Cassette(path),
+        )
+        assert recorder.generate(_request("question")).text == "live reply"
+
+    with StubModelServer(ReplayModel(Cassette(path))) as stub:
+        model = OpenAICompatModel(stub.base_url, model="gpt-x", params={"temperature": 0.2})
+        assert model.generate(_request("question")).text == "live reply"
+        assert model.generate_streaming(_request("question")).text == "live reply"
+
+
+def test_concurrent_streams(server):
+    model = OpenAICompatModel(server.base_url)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        texts = list(pool.map(lambda _: model.generate_streaming(_request()).text, range(64)))
+    assert all(json.loads(t) == _ACTION for t in texts)
+    assert server.stats()["requests"] == 64
+
+
+def test_connection_refused_and_factory(tmp_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(ModelAPIError):
+        OpenAICompatModel(f"http://127.0.0.1:{port}/v1", timeout_sec=2).generate(_request())
+
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"model": {
+        "provider": "openai_compat",
+        "params": {"temperature": 0},
+        "openai_compat": {"base_url": "http://127.0.0.1:9/v1/", "model": "m"},
+    }}))
+    model = create_model_adapter(Config(path))
+    assert isinstance(model, OpenAICompatModel)
+    assert model.base_url == "http://127.0.0.1:9/v1"
+    assert model.params == {"temperature": 0}
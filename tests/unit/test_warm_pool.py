@@ -0,0 +1,149 @@
+"""预热 Python 解释器池单元测试"""
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.skills.metadata import ResourceLimits, SkillMetadata
+from src.tools.executor import ScriptExecutor
+from src.tools.warm_pool import WarmPythonPool
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not hasattr(__import__("socket"), "send_fds"),
+    reason="requires fork and SCM_RIGHTS",
+)
+
+
+@pytest.fixture
+def executor():
+    pool = WarmPythonPool(preload=["json", "definitely_missing_module"])
+    yield ScriptExecutor(warm_pool=pool)
+    pool.close()
+
+
+def _skill(tmp_path: Path, scripts: dict, limits: ResourceLimits = None) -> SkillMetadata:
+    skill_dir = tmp_path / "demo"
+    (skill_dir / "scripts").mkdir(parents=True, exist_ok=True)
+    for name, code in scripts.items():
+        (skill_dir / "scripts" / name).write_text(code, encoding="utf-8")
+    return SkillMetadata(
+        skill_id="project:demo:unversioned", name="demo", description="d",
+        source="project", path=skill_dir, resource_limits=limits or ResourceLimits(),
+    )
+
+
+def test_warm_run_isolates_argv_cwd_env(tmp_path, executor, monkeypatch):
+    monkeypatch.setenv("SECRET_TOKEN", "x")
+    code = (
+        "import os, sys\n"
+        "print(sys.argv[1:], os.getcwd(), os.environ.get('EXTRA'), 'SECRET_TOKEN' in os.environ)\n"
+        "print(__name__)\n"
+    )
+    skill = _skill(tmp_path, {"show.py": code})
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    obs = executor.run_script(skill, "scripts/show.py", ["a"], env={"EXTRA": "1"}, cwd=workdir)
+    assert obs.success, obs.output
+    assert obs.output["stdout"] == f"['a'] {workdir} 1 False\n__main__\n"
+    assert obs.metadata["peak_rss_kb"] > 0
+    assert executor.warm_pool.preload_errors[0].startswith("definitely_missing_module")
+
+
+def test_warm_run_exit_codes_and_exceptions(tmp_path, executor):
+    skill = _skill(tmp_path, {
+        "exit.py": "import sys\nsys.exit(4)\n",
+        "boom.py": "raise ValueError('boom')\n",
+    })
+    assert executor.run_script(skill, "scripts/exit.py").metadata["exit_code"] == 4
+    obs = executor.run_script(skill, "scripts/boom.py")
+    assert obs.metadata["exit_code"] == 1
+    assert "ValueError: boom" in obs.output["stderr"]
+
+
+def test_warm_run_timeout_and_memory_limit(tmp_path, executor):
+    skill = _skill(
+        tmp_path,
+        {"hang.py": "import time\ntime.sleep(30)\n", "hog.py": "x = bytearray(1 << 30)\n"},
+        ResourceLimits(max_script_time_sec=1, max_memory_mb=256),
+    )
+    start = time.perf_counter()
+    obs = executor.run_script(skill, "scripts/hang.py")
+    assert obs.metadata["timed_out"]
+    assert time.perf_counter() - start < 5
+    assert "MemoryError" in executor.run_script(skill, "scripts/hog.py").output["stderr"]
+
+
+def test_zygote_cleans_up_group_before_reaping(tmp_path, executor, monkeypatch):
+    marker = tmp_path / "grandchild-alive"
+    child = f"import time; time.sleep(1); open({str(marker)!r}, 'w')"
+    spawn = f"import subprocess, sys\nsubprocess.Popen([sys.executable, '-c', {child!r}])\n"
+    skill = _skill(tmp_path, {
+        "spawn.py": spawn,
+        "hang.py": "import time\ntime.sleep(30)\n",
+    }, ResourceLimits(max_script_time_sec=1))
+    # 父进程不知道子进程何时被回收，不应直接向进程组发信号
+    signalled = []
+    monkeypatch.setattr(os, "killpg", lambda *args: signalled.append(args))
+    assert executor.run_script(skill, "scripts/spawn.py").success
+    assert executor.run_script(skill, "scripts/hang.py").metadata["timed_out"]
+    assert signalled == []
+    time.sleep(1.5)
+    assert not marker.exists()
+
+
+def test_non_python_falls_back_to_subprocess(tmp_path, executor):
+    skill = _skill(tmp_path, {"hello.sh": "echo shell $1\n"})
+    obs = executor.run_script(skill, "scripts/hello.sh", ["ok"])
+    assert obs.output["stdout"] == "shell ok\n"
+
+
+def test_zygote_restarts_after_exit(tmp_path, executor):
+    skill = _skill(tmp_path, {"ok.py": "print('ok')\n"})
+    assert executor.run_script(skill, "scripts/ok.py").success
+    executor.warm_pool._proc.kill()
+    executor.warm_pool._proc.wait()
+    assert executor.run_script(skill, "scripts/ok.py").output["stdout"] == "ok\n"
+
+
+def test_unresponsive_zygote_is_recycled_on_timeout(tmp_path, executor):
+    skill = _skill(tmp_path, {"ok.py": "print('ok')\n"}, ResourceLimits(max_script_time_sec=1))
+    assert executor.run_script(skill, "scripts/ok.py").success
+    stuck = executor.warm_pool._proc
+    os.kill(stuck.pid, signal.SIGSTOP)
+    try:
+        start = time.perf_counter()
+        obs = executor.run_script(skill, "scripts/ok.py")
+        assert obs.metadata["timed_out"]
+        assert time.perf_counter() - start < 5
+        assert stuck.poll() is not None
+    finally:
+        if stuck.poll() is None:
+            stuck.kill()
+    assert executor.run_script(skill, "scripts/ok.py").output["stdout"] == "ok\n"
+
+
+def test_stopped_zygote_child_is_killed_on_recycle(tmp_path, executor):
+    marker = tmp_path / "still-running"
+    skill = _skill(
+        tmp_path,
+        {"slow.py": f"import time\ntime.sleep(2.5)\nopen({str(marker)!r}, 'w')\n"},
+        ResourceLimits(max_script_time_sec=1),
+    )
+    pool = executor.warm_pool
+    pool.start()
+    stuck = pool._proc
+    # 子进程已启动（pid 已回报）后 zygote 停止响应
+    threading.Timer(0.3, os.kill, (stuck.pid, signal.SIGSTOP)).start()
+    try:
+        obs = executor.run_script(skill, "scripts/slow.py")
+        assert obs.metadata["timed_out"]
+        assert stuck.poll() is not None
+    finally:
+        if stuck.poll() is None:
+            stuck.kill()
+    time.sleep(2)
+    assert not marker.exists()